@@ -1,3 +1,5 @@
+import io
+import logging
 import os
 import sys
 from pathlib import Path
@@ -8,6 +10,7 @@ sys.path.insert(0, str(project_root))
 from logging.config import fileConfig
 
 from alembic import context
+from alembic.runtime.migration import MigrationContext
 from sqlalchemy import engine_from_config, pool
 
 # this is the Alembic Config object, which provides
@@ -16,7 +19,10 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-fileConfig(config.config_file_name)
+# Skipped when called programmatically (app/startup.py), which keeps the
+# application's own logging configuration.
+if config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -26,9 +32,12 @@ fileConfig(config.config_file_name)
 
 from app.models import SQLModel  # noqa
 from app.core.config import settings # noqa
+from app.alembic import online  # noqa
 
 target_metadata = SQLModel.metadata
 
+logger = logging.getLogger("alembic.env")
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -60,6 +69,36 @@ def run_migrations_offline():
         context.run_migrations()
 
 
+def run_dry_run(connection):
+    """Plan the pending migrations without changing the database.
+
+    The migrations run in offline (SQL generating) mode from the revision
+    the database is at, so plain op.* calls only render their SQL and take
+    no locks, and the online helpers record what they would do. The live
+    connection is used read-only, for the current revision and the helpers'
+    row estimates.
+
+    """
+    heads = MigrationContext.configure(connection).get_current_heads()
+    connection.exec_driver_sql("SET default_transaction_read_only = on")
+    connection.commit()
+    online.start_dry_run(connection)
+
+    sql = io.StringIO()
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        as_sql=True,
+        starting_rev=list(heads) or None,
+        output_buffer=sql,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+    logger.info("SQL the upgrade would run:\n%s", sql.getvalue())
+    logger.info(online.report())
+
+
 def run_migrations_online():
     """Run migrations in 'online' mode.
 
@@ -79,6 +118,20 @@ def run_migrations_online():
         context.configure(
             connection=connection, target_metadata=target_metadata, compare_type=True
         )
+        # Fail fast instead of queueing application queries behind a lock
+        # request that is itself waiting on a long running transaction.
+        online.set_timeouts(
+            connection,
+            lock_timeout=settings.MIGRATION_LOCK_TIMEOUT,
+            statement_timeout=settings.MIGRATION_STATEMENT_TIMEOUT,
+        )
+        # SET is session level; end the implicit transaction it opened so the
+        # migration transaction below starts cleanly.
+        connection.commit()
+
+        if online.dry_run_enabled():
+            run_dry_run(connection)
+            return
 
         with context.begin_transaction():
             context.run_migrations()
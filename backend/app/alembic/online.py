@@ -0,0 +1,353 @@
+"""Helpers for migrations that must run against a live database.
+
+Plain ``op.*`` calls run inside the single transaction Alembic opens for the
+whole upgrade, so a large ``UPDATE`` or a regular ``CREATE INDEX`` keeps the
+table locked until every migration has finished. The helpers below split that
+work into short, separately committed steps and take the weakest lock that
+PostgreSQL allows for each operation.
+
+Usage inside a revision::
+
+    from app.alembic import online
+
+    def upgrade():
+        op.add_column("user", sa.Column("nickname", sa.String(), nullable=True))
+        online.batched_backfill("user", "nickname = name", "nickname IS NULL")
+        online.create_index_concurrently("ix_user_nickname", "user", ["nickname"])
+
+Run ``alembic -x dry_run=true upgrade head`` to get a report of what each
+helper would do (estimated rows touched and lock level) without changing the
+database. A dry run generates SQL instead of executing it, so plain ``op.*``
+calls are only rendered and logged; the database is read, on a read-only
+connection, for the current revision and the row estimates.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from alembic import context, op
+
+logger = logging.getLogger("alembic.online")
+
+# Lock taken by each kind of operation, see
+# https://www.postgresql.org/docs/current/explicit-locking.html
+LOCK_ROW_EXCLUSIVE = "ROW EXCLUSIVE"
+LOCK_SHARE_UPDATE_EXCLUSIVE = "SHARE UPDATE EXCLUSIVE"
+LOCK_SHARE_ROW_EXCLUSIVE = "SHARE ROW EXCLUSIVE"
+LOCK_ACCESS_EXCLUSIVE = "ACCESS EXCLUSIVE"
+
+
+@dataclass
+class PlannedOperation:
+    description: str
+    table: str
+    lock: str
+    estimated_rows: int | None
+
+
+_planned: list[PlannedOperation] = []
+# Live connection for row estimates during a dry run, when op.get_bind()
+# only renders SQL.
+_estimate_bind = None
+
+
+def dry_run_enabled() -> bool:
+    """
+    True when the upgrade was started with ``-x dry_run=true``.
+    """
+    value = context.get_x_argument(as_dictionary=True).get("dry_run", "")
+    return value.lower() in ("1", "true", "yes")
+
+
+def start_dry_run(bind) -> None:
+    """
+    Forget earlier plans and estimate rows through ``bind`` from now on.
+    """
+    global _estimate_bind
+    _planned.clear()
+    _estimate_bind = bind
+
+
+def planned_operations() -> list[PlannedOperation]:
+    return list(_planned)
+
+
+def report() -> str:
+    """
+    Human readable summary of the operations recorded during a dry run.
+    """
+    if not _planned:
+        return "No online migration operations planned."
+    lines = ["Planned online migration operations:"]
+    for planned in _planned:
+        rows = "unknown" if planned.estimated_rows is None else f"~{planned.estimated_rows}"
+        lines.append(
+            f"  - {planned.description} on {planned.table!r}: "
+            f"{rows} rows, lock {planned.lock}"
+        )
+    return "\n".join(lines)
+
+
+def _quote(table: str) -> str:
+    return ".".join(f'"{part}"' for part in table.split("."))
+
+
+def _estimate_rows(table: str, where: str | None = None) -> int | None:
+    """
+    Planner estimate of the rows matching ``where`` (or the whole table),
+    which is cheap even on large tables, unlike ``count(*)``.
+    """
+    sql = f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {_quote(table)}"
+    if where:
+        sql += f" WHERE {where}"
+    try:
+        plan = (_estimate_bind or op.get_bind()).exec_driver_sql(sql).scalar()
+    except Exception as e:
+        logger.warning("Could not estimate rows for %s: %s", table, e)
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _plan(description: str, table: str, lock: str, where: str | None = None) -> bool:
+    """
+    Record the operation. Returns True if the caller should skip executing it
+    because this is a dry run.
+    """
+    if not dry_run_enabled():
+        logger.info("%s on %r (lock %s)", description, table, lock)
+        return False
+    _planned.append(
+        PlannedOperation(
+            description=description,
+            table=table,
+            lock=lock,
+            estimated_rows=_estimate_rows(table, where),
+        )
+    )
+    return True
+
+
+def set_timeouts(
+    bind=None,
+    *,
+    lock_timeout: str | None = None,
+    statement_timeout: str | None = None,
+) -> None:
+    """
+    Apply ``lock_timeout``/``statement_timeout`` to the migration connection.
+    Called by ``env.py`` with the configured defaults, so a migration waiting
+    behind a long running query fails fast instead of queueing every other
+    query on the table behind its lock request.
+    """
+    if bind is None:
+        bind = op.get_bind()
+    if lock_timeout is not None:
+        bind.exec_driver_sql(f"SET lock_timeout = '{lock_timeout}'")
+    if statement_timeout is not None:
+        bind.exec_driver_sql(f"SET statement_timeout = '{statement_timeout}'")
+
+
+@contextmanager
+def timeouts(*, lock_timeout: str | None = None, statement_timeout: str | None = None):
+    """
+    Temporarily override the connection timeouts, e.g. for a single
+    ``VALIDATE CONSTRAINT`` that is expected to scan the whole table.
+    """
+    bind = op.get_bind()
+    previous_lock = bind.exec_driver_sql("SHOW lock_timeout").scalar()
+    previous_statement = bind.exec_driver_sql("SHOW statement_timeout").scalar()
+    set_timeouts(lock_timeout=lock_timeout, statement_timeout=statement_timeout)
+    try:
+        yield
+    finally:
+        set_timeouts(
+            lock_timeout=previous_lock, statement_timeout=previous_statement
+        )
+
+
+def batched_backfill(
+    table: str,
+    set_clause: str,
+    where: str,
+    *,
+    batch_size: int = 5000,
+    pause_seconds: float = 0.0,
+) -> int:
+    """
+    Run ``UPDATE table SET set_clause WHERE where`` in batches of
+    ``batch_size`` rows, each committed on its own so row locks are held only
+    for one batch. ``where`` must stop matching a row once it has been
+    updated (e.g. ``new_column IS NULL``), otherwise this never terminates.
+
+    Returns the number of rows updated.
+    """
+    if _plan(f"Backfill SET {set_clause}", table, LOCK_ROW_EXCLUSIVE, where):
+        return 0
+
+    quoted = _quote(table)
+    # FOR UPDATE waits for rows locked by other transactions rather than
+    # skipping them: a batch of only skipped rows would update nothing and
+    # end the backfill early.
+    sql = (
+        f"UPDATE {quoted} SET {set_clause} "
+        f"WHERE ctid = ANY(ARRAY("
+        f"SELECT ctid FROM {quoted} WHERE {where} "
+        f"LIMIT {int(batch_size)} FOR UPDATE))"
+    )
+    # A batch can still come back empty if all its rows were moved by
+    # concurrent updates in the meantime, so only stop once none are left.
+    remaining = f"SELECT EXISTS (SELECT 1 FROM {quoted} WHERE {where})"
+    total = 0
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            started = time.perf_counter()
+            updated = bind.exec_driver_sql(sql).rowcount
+            if not updated:
+                if not bind.exec_driver_sql(remaining).scalar():
+                    break
+                continue
+            total += updated
+            logger.info(
+                "Backfilled %d rows on %r in %.0f ms (%d total)",
+                updated,
+                table,
+                (time.perf_counter() - started) * 1000,
+                total,
+            )
+            if pause_seconds:
+                time.sleep(pause_seconds)
+    return total
+
+
+def _drop_invalid_index(index_name: str, table: str) -> None:
+    """
+    Drop ``index_name`` if it is left over, invalid, from a failed
+    concurrent build; ``IF NOT EXISTS`` would otherwise keep it.
+    """
+    schema = table.split(".")[0] if "." in table else None
+    qualified = _quote(f"{schema}.{index_name}" if schema else index_name)
+    invalid = (
+        op.get_bind()
+        .exec_driver_sql(
+            "SELECT NOT indisvalid FROM pg_index "
+            f"WHERE indexrelid = to_regclass('{qualified}')"
+        )
+        .scalar()
+    )
+    if invalid:
+        logger.warning("Dropping invalid index %s left by a failed build", index_name)
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {qualified}")
+
+
+def create_index_concurrently(
+    index_name: str,
+    table: str,
+    columns: list[str],
+    *,
+    unique: bool = False,
+    **kw,
+) -> None:
+    """
+    ``CREATE INDEX CONCURRENTLY``, which only blocks schema changes, not
+    reads or writes. Runs outside the migration transaction as PostgreSQL
+    requires, and without a statement timeout since the build scans the
+    whole table. An invalid index of the same name, left by a failed build,
+    is dropped first; ``IF NOT EXISTS`` then makes a retry safe.
+    """
+    if _plan(f"Create index {index_name}", table, LOCK_SHARE_UPDATE_EXCLUSIVE):
+        return
+    with op.get_context().autocommit_block():
+        with timeouts(statement_timeout="0"):
+            _drop_invalid_index(index_name, table)
+            op.create_index(
+                index_name,
+                table,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kw,
+            )
+
+
+def drop_index_concurrently(index_name: str, table: str) -> None:
+    if _plan(f"Drop index {index_name}", table, LOCK_SHARE_UPDATE_EXCLUSIVE):
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            index_name,
+            table_name=table,
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def add_check_constraint_not_valid(name: str, table: str, condition: str) -> None:
+    """
+    Add a CHECK constraint that is enforced for new rows only. Existing rows
+    are checked later by ``validate_constraint`` without blocking writes.
+    """
+    if _plan(f"Add CHECK constraint {name} NOT VALID", table, LOCK_ACCESS_EXCLUSIVE):
+        return
+    op.execute(
+        f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {name} "
+        f"CHECK ({condition}) NOT VALID"
+    )
+
+
+def add_foreign_key_not_valid(
+    name: str,
+    table: str,
+    columns: list[str],
+    referent_table: str,
+    referent_columns: list[str],
+    *,
+    ondelete: str | None = None,
+) -> None:
+    """
+    Add a foreign key enforced for new rows only, see ``validate_constraint``.
+    """
+    if _plan(f"Add foreign key {name} NOT VALID", table, LOCK_SHARE_ROW_EXCLUSIVE):
+        return
+    sql = (
+        f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {name} "
+        f"FOREIGN KEY ({', '.join(columns)}) "
+        f"REFERENCES {_quote(referent_table)} ({', '.join(referent_columns)})"
+    )
+    if ondelete:
+        sql += f" ON DELETE {ondelete}"
+    op.execute(sql + " NOT VALID")
+
+
+def validate_constraint(name: str, table: str) -> None:
+    """
+    Check existing rows against a ``NOT VALID`` constraint. This scans the
+    table but only takes SHARE UPDATE EXCLUSIVE, so reads and writes continue.
+    It is committed separately so the scan does not extend the migration
+    transaction's locks.
+    """
+    if _plan(f"Validate constraint {name}", table, LOCK_SHARE_UPDATE_EXCLUSIVE):
+        return
+    with op.get_context().autocommit_block():
+        with timeouts(statement_timeout="0"):
+            op.execute(f"ALTER TABLE {_quote(table)} VALIDATE CONSTRAINT {name}")
+
+
+def set_not_null(table: str, column: str) -> None:
+    """
+    ``SET NOT NULL`` without a full table scan under ACCESS EXCLUSIVE:
+    PostgreSQL 12+ skips the scan when a validated ``IS NOT NULL`` CHECK
+    constraint already proves it, so add and validate one first.
+    """
+    constraint = f"{table.split('.')[-1]}_{column}_not_null"
+    add_check_constraint_not_valid(constraint, table, f"{column} IS NOT NULL")
+    validate_constraint(constraint, table)
+    if _plan(f"Set {column} NOT NULL", table, LOCK_ACCESS_EXCLUSIVE):
+        return
+    op.alter_column(table, column, nullable=False)
+    op.drop_constraint(constraint, table, type_="check")
@@ -0,0 +1,57 @@
+"""add_user_changed_notify_trigger
+
+Revision ID: 5f2b8c1d9e4a
+Revises: 0c6e6d138d0e
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2b8c1d9e4a'
+down_revision = '0c6e6d138d0e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Publish every change to a user row on the "user_changed" channel so each
+    # worker can drop its cached copy (app/core/cache.py). The notification is
+    # delivered when the writing transaction commits.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_user_changed() RETURNS trigger AS $$
+        DECLARE
+            row_data RECORD;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                row_data := OLD;
+            ELSE
+                row_data := NEW;
+            END IF;
+            PERFORM pg_notify(
+                'user_changed',
+                json_build_object(
+                    'id', row_data.id,
+                    'email', row_data.email,
+                    'old_email', CASE WHEN TG_OP = 'UPDATE' THEN OLD.email END,
+                    'op', TG_OP,
+                    'changed_at', extract(epoch FROM clock_timestamp())
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER user_changed_notify
+        AFTER INSERT OR UPDATE OR DELETE ON "user"
+        FOR EACH ROW EXECUTE FUNCTION notify_user_changed()
+    """)
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS user_changed_notify ON "user"')
+    op.execute('DROP FUNCTION IF EXISTS notify_user_changed()')
@@ -0,0 +1,34 @@
+"""add_email_verification_table
+
+Revision ID: 7d3e91a0b6c2
+Revises: 5f2b8c1d9e4a
+Create Date: 2026-10-19 20:05:12.408133
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3e91a0b6c2'
+down_revision = '5f2b8c1d9e4a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per user that was sent a verification email, see
+    # crud.claim_verification_email.
+    op.create_table(
+        'email_verification',
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('issued_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+
+def downgrade():
+    op.drop_table('email_verification')
@@ -0,0 +1,124 @@
+"""add_role_and_permission_tables
+
+Revision ID: a4c1e8f2b7d3
+Revises: 7d3e91a0b6c2
+Create Date: 2026-10-19 22:41:07.512390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+from app.alembic import online
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c1e8f2b7d3'
+down_revision = '7d3e91a0b6c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    permission = op.create_table(
+        'permission',
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(permission, [
+        {'name': '*', 'description': 'Every permission'},
+        {'name': 'document:read', 'description': 'Read documents'},
+        {'name': 'users:admin', 'description': 'Manage users and roles'},
+    ])
+
+    role = op.create_table(
+        'role',
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('permissions', sa.ARRAY(sa.String()), server_default='{}', nullable=False),
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    # What the code used to grant: admin2 could do anything, and verified
+    # accounts were given document:read.
+    op.bulk_insert(role, [
+        {'name': 'user', 'permissions': ['document:read']},
+        {'name': 'admin1', 'permissions': ['document:read']},
+        {'name': 'admin2', 'permissions': ['*']},
+    ])
+    op.execute("""
+        INSERT INTO role (name) SELECT DISTINCT role FROM "user"
+        ON CONFLICT DO NOTHING
+    """)
+    online.add_foreign_key_not_valid(
+        'user_role_fkey', 'user', ['role'], 'role', ['name']
+    )
+
+    op.add_column('user', sa.Column('denied_permissions', sa.ARRAY(sa.String()), server_default='{}', nullable=False))
+    # Now granted by the role, so it can be revoked there for everyone.
+    online.batched_backfill(
+        'user',
+        "permissions = array_remove(permissions, 'document:read')",
+        "'document:read' = ANY(permissions)",
+    )
+    online.validate_constraint('user_role_fkey', 'user')
+
+    # Bump the version of a role on every change and publish it on the
+    # "role_changed" channel, so each worker reloads its cached roles
+    # (app/core/permissions.py).
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_role_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.version := OLD.version + 1;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER role_version_bump
+        BEFORE UPDATE ON role
+        FOR EACH ROW EXECUTE FUNCTION bump_role_version()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_role_changed() RETURNS trigger AS $$
+        DECLARE
+            row_data RECORD;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                row_data := OLD;
+            ELSE
+                row_data := NEW;
+            END IF;
+            PERFORM pg_notify(
+                'role_changed',
+                json_build_object(
+                    'name', row_data.name,
+                    'version', row_data.version,
+                    'op', TG_OP
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER role_changed_notify
+        AFTER INSERT OR UPDATE OR DELETE ON role
+        FOR EACH ROW EXECUTE FUNCTION notify_role_changed()
+    """)
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS role_changed_notify ON role')
+    op.execute('DROP FUNCTION IF EXISTS notify_role_changed()')
+    op.execute('DROP TRIGGER IF EXISTS role_version_bump ON role')
+    op.execute('DROP FUNCTION IF EXISTS bump_role_version()')
+    online.batched_backfill(
+        'user',
+        "permissions = array_append(permissions, 'document:read')",
+        "is_verified AND NOT 'document:read' = ANY(permissions)",
+    )
+    op.drop_column('user', 'denied_permissions')
+    op.drop_constraint('user_role_fkey', 'user', type_='foreignkey')
+    op.drop_table('role')
+    op.drop_table('permission')
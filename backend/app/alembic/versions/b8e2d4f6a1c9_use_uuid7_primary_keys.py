@@ -0,0 +1,56 @@
+"""use_uuid7_primary_keys
+
+Revision ID: b8e2d4f6a1c9
+Revises: a4c1e8f2b7d3
+Create Date: 2026-10-19 23:58:31.204716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2d4f6a1c9'
+down_revision = 'a4c1e8f2b7d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # UUIDv7 (RFC 9562), the same layout as app/core/ids.py: the first 48
+    # bits of a random UUID are replaced with the Unix time in milliseconds,
+    # and bits 52 and 53 turn the version nibble from 4 into 7. PostgreSQL 18
+    # has uuidv7() built in; this works on the versions we run today.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+            SELECT encode(
+                set_bit(
+                    set_bit(
+                        overlay(
+                            uuid_send(gen_random_uuid())
+                            PLACING substring(
+                                int8send(
+                                    floor(
+                                        extract(epoch FROM clock_timestamp()) * 1000
+                                    )::bigint
+                                )
+                                FROM 3
+                            )
+                            FROM 1 FOR 6
+                        ),
+                        52, 1
+                    ),
+                    53, 1
+                ),
+                'hex'
+            )::uuid
+        $$ LANGUAGE sql VOLATILE
+    """)
+    # Existing uuid4 ids stay as they are.
+    op.alter_column('user', 'id', server_default=sa.text('uuid_generate_v7()'))
+
+
+def downgrade():
+    op.alter_column('user', 'id', server_default=None)
+    op.execute('DROP FUNCTION IF EXISTS uuid_generate_v7()')
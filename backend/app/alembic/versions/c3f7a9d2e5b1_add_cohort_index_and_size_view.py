@@ -0,0 +1,64 @@
+"""add_cohort_index_and_size_view
+
+Revision ID: c3f7a9d2e5b1
+Revises: b8e2d4f6a1c9
+Create Date: 2026-10-20 01:17:44.630912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+from app.alembic import online
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f7a9d2e5b1'
+down_revision = 'b8e2d4f6a1c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built without blocking writes to the user table.
+    online.create_index_concurrently(
+        'ix_user_major_class_id', 'user', ['major', 'class_', 'id']
+    )
+
+    # Cohort sizes, refreshed periodically by the workers (app/core/cohorts.py).
+    # REFRESH ... CONCURRENTLY needs a unique index covering every row; a
+    # missing major or class is a cohort of its own, hence NULLS NOT DISTINCT.
+    op.execute("""
+        CREATE MATERIALIZED VIEW cohort_size AS
+        SELECT
+            major,
+            class_,
+            count(*) AS members,
+            count(*) FILTER (WHERE is_verified) AS verified,
+            now() AS refreshed_at
+        FROM "user"
+        WHERE is_active
+        GROUP BY major, class_
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX ix_cohort_size_major_class
+        ON cohort_size (major, class_) NULLS NOT DISTINCT
+    """)
+
+    op.execute("""
+        INSERT INTO permission (name, description)
+        VALUES ('cohorts:read', 'List cohorts and their members')
+    """)
+    op.execute("""
+        UPDATE role SET permissions = array_append(permissions, 'cohorts:read')
+        WHERE name = 'admin1'
+    """)
+
+
+def downgrade():
+    op.execute("""
+        UPDATE role SET permissions = array_remove(permissions, 'cohorts:read')
+    """)
+    op.execute("DELETE FROM permission WHERE name = 'cohorts:read'")
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS cohort_size')
+    online.drop_index_concurrently('ix_user_major_class_id', 'user')
@@ -1,7 +1,7 @@
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -10,8 +10,9 @@ from sqlmodel import Session
 from app import crud
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
-from app.models import User
+from app.core.db import engine, release_connection
+from app.core.permissions import USERS_ADMIN, Principal
+from app.core.tracing import span
 from app.schemas import TokenPayload
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -19,8 +20,15 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-def get_session() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+def get_session(request: Request) -> Generator[Session, None, None]:
+    """
+    Request-scoped session. No connection is checked out until the first
+    statement runs, and objects are not expired on commit so handlers can keep
+    using them after ``release_connection`` has handed the connection back.
+    """
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", request.url.path)
+    with Session(engine, expire_on_commit=False, info={"route": route_path}) as session:
         yield session
 
 
@@ -28,40 +36,45 @@ SessionDep = Annotated[Session, Depends(get_session)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def get_current_user(session: SessionDep, token: TokenDep) -> Principal:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
+        with span("jwt.decode", "access token"):
+            payload = security.decode_token(token)
         token_data = TokenPayload(**payload)
     except (jwt.JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = crud.get_user_by_email(session=session, email=token_data.sub)
-    if not user:
+    if token_data.sub is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    principal = crud.get_principal(session=session, email=token_data.sub)
+    release_connection(session)
+    if not principal:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return principal
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 
-def get_current_active_user(current_user: CurrentUser) -> User:
+def get_current_active_user(current_user: CurrentUser) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User:
+def get_current_active_superuser(current_user: CurrentUser) -> Principal:
     """
-    Dependency to get the current user, ensuring they have superuser privileges.
-    In this codebase, superuser is equivalent to admin2 role.
+    Dependency to get the current user, ensuring they have superuser privileges:
+    a role (admin2 by default) or override granting users:admin.
     """
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    if current_user.role != "admin2":
+    if not current_user.has_permissions([USERS_ADMIN]):
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
@@ -69,31 +82,30 @@ def get_current_active_superuser(current_user: CurrentUser) -> User:
 
 
 def get_current_admin2_user(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    current_user: Principal = Depends(get_current_active_user),
+) -> Principal:
     """
-    Dependency to get the current user, ensuring they have the 'admin2' role.
+    Dependency to get the current user, ensuring they have the permissions of
+    the 'admin2' role (users:admin).
     """
-    if current_user.role != "admin2":
+    if not current_user.has_permissions([USERS_ADMIN]):
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
 
 
-def require_permission(required_permissions: list[str]):
+def require_permission(
+    required_permissions: list[str],
+) -> Callable[[Principal], Principal]:
     """
     Dependency factory to check if the current user has the required permissions.
     """
 
     def permission_checker(
-        current_user: User = Depends(get_current_active_user),
-    ):
-        if "admin2" == current_user.role:
-            return current_user
-
-        user_permissions = set(current_user.permissions)
-        if not set(required_permissions).issubset(user_permissions):
+        current_user: Principal = Depends(get_current_active_user),
+    ) -> Principal:
+        if not current_user.has_permissions(required_permissions):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have sufficient permissions.",
@@ -0,0 +1,33 @@
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+# UUIDs, datetimes and dataclasses are serialized natively by orjson; the
+# options match fastapi.responses.ORJSONResponse, the app-wide default.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def json_rows(rows: Iterable[Mapping[Any, Any]]) -> Response:
+    """
+    Serialize result mappings (``session.exec(...).mappings()``) straight to
+    a JSON array response, skipping Pydantic validation and jsonable_encoder.
+
+    Only use this for read endpoints that select exactly the columns of their
+    declared response model, which then only documents the response.
+    """
+    return Response(
+        content=orjson.dumps([dict(row) for row in rows], option=ORJSON_OPTIONS),
+        media_type="application/json",
+    )
+
+
+def json_row(row: Mapping[Any, Any]) -> Response:
+    """
+    Single-object counterpart of ``json_rows``.
+    """
+    return Response(
+        content=orjson.dumps(dict(row), option=ORJSON_OPTIONS),
+        media_type="application/json",
+    )
@@ -0,0 +1,49 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+
+from app import crud
+from app.api.deps import SessionDep, require_permission
+from app.api.responses import json_rows
+from app.core.bulkheads import bulkhead_route
+from app.core.db import release_connection
+from app.core.permissions import COHORTS_READ
+from app.schemas import CohortSize, User
+
+router = APIRouter(
+    prefix="/cohorts",
+    tags=["cohorts"],
+    route_class=bulkhead_route("reads"),
+    dependencies=[Depends(require_permission([COHORTS_READ]))],
+)
+
+
+@router.get("/", response_model=list[CohortSize])
+def read_cohort_sizes(session: SessionDep, major: str | None = None) -> Any:
+    """
+    Number of active students, and how many of them are verified, per major
+    and class. Computed periodically, as of ``refreshed_at``.
+    """
+    rows = crud.get_cohort_sizes(session=session, major=major)
+    release_connection(session)
+    return json_rows(rows)
+
+
+@router.get("/members", response_model=list[User])
+def read_cohort_members(
+    session: SessionDep,
+    major: str,
+    class_: str,
+    after: uuid.UUID | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+) -> Any:
+    """
+    A page of the active students of a major and class, in id order. Pass
+    the last id of a page as ``after`` to get the next one.
+    """
+    rows = crud.get_cohort_member_rows(
+        session=session, major=major, class_=class_, after=after, limit=limit
+    )
+    release_connection(session)
+    return json_rows(rows)
@@ -7,10 +7,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from app import crud
 from app.api.deps import SessionDep
 from app.core import security
+from app.core.bulkheads import bulkhead_route
 from app.core.config import settings
 from app.schemas import Token
 
-router = APIRouter()
+router = APIRouter(route_class=bulkhead_route("auth"))
 
 
 @router.post("/login/access-token", response_model=Token)
@@ -36,8 +37,14 @@ def login_access_token(
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    # Add role and permissions to the JWT payload
-    additional_claims = {"role": user.role, "permissions": user.permissions}
+    # Add role and effective permissions to the JWT payload
+    permissions = crud.get_permissions(
+        session=session,
+        role=user.role,
+        granted=user.permissions,
+        denied=user.denied_permissions,
+    )
+    additional_claims = {"role": user.role, "permissions": sorted(permissions)}
     
     access_token = security.create_access_token(
         user.email,
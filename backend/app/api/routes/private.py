@@ -1,18 +1,24 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import func, select
 
+from app import crud
+
 # Corrected dependency import to use the new role-based checker
 from app.api.deps import get_current_admin2_user, SessionDep
+from app.api.responses import json_row, json_rows
+from app.core.bulkheads import bulkhead_route
+from app.core.db import release_connection
 # Corrected schema import path
-from app.schemas import User
+from app.schemas import Role, RoleUpdate, User
 from app.models import User as UserModel
 
 router = APIRouter(
     prefix="/private",
     tags=["private"],
+    route_class=bulkhead_route("admin"),
     # Updated dependency to protect all routes in this file
     dependencies=[Depends(get_current_admin2_user)],
 )
@@ -29,13 +35,60 @@ def read_users_count(session: SessionDep) -> Any:
     return count
 
 
+@router.get("/users/", response_model=list[User])
+def read_users(
+    session: SessionDep,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+) -> Any:
+    """
+    Retrieve a page of users.
+    (Requires admin2 privileges)
+    """
+    rows = crud.get_user_rows(session=session, skip=skip, limit=limit)
+    release_connection(session)
+    return json_rows(rows)
+
+
 @router.get("/user/{user_id}", response_model=User)
 def read_user_by_id(user_id: uuid.UUID, session: SessionDep) -> Any:
     """
     Get a specific user by their UUID.
     (Requires admin2 privileges)
     """
-    user = session.get(UserModel, user_id)
-    if not user:
+    row = crud.get_user_row(session=session, user_id=user_id)
+    release_connection(session)
+    if not row:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return json_row(row)
+
+
+@router.get("/roles/", response_model=list[Role])
+def read_roles(session: SessionDep) -> Any:
+    """
+    List the roles and the permissions each grants.
+    (Requires admin2 privileges)
+    """
+    return crud.get_roles(session=session)
+
+
+@router.put("/roles/{name}", response_model=Role)
+def update_role(name: str, role_in: RoleUpdate, session: SessionDep) -> Any:
+    """
+    Replace the permissions a role grants, for all of its users at once.
+    (Requires admin2 privileges)
+    """
+    unknown = crud.get_unknown_permissions(
+        session=session, permissions=role_in.permissions
+    )
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown permissions: {', '.join(sorted(unknown))}",
+        )
+    role = crud.update_role_permissions(
+        session=session, name=name, permissions=role_in.permissions
+    )
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+    return role
@@ -1,17 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
 
 from app import crud
 from app.api.deps import SessionDep
-from app.schemas import Message, UserCreate
+from app.core.bulkheads import bulkhead_route
+from app.core.cache import user_cache
+from app.schemas import Message, UserCreate, VerificationRequest
 from app.core.config import settings
+from app.core.tracing import traced
 from app.utils import send_new_account_email
 from app.core.security import generate_email_verification_token, verify_email_verification_token
 
-router = APIRouter()
+router = APIRouter(route_class=bulkhead_route("auth"))
 
 
 @router.post("/register", response_model=Message, status_code=201)
-def register_new_user(session: SessionDep, user_in: UserCreate) -> Message:
+def register_new_user(
+    session: SessionDep, user_in: UserCreate, background_tasks: BackgroundTasks
+) -> Message:
     """
     Create new user, validating email and triggering verification email.
     """
@@ -31,14 +36,59 @@ def register_new_user(session: SessionDep, user_in: UserCreate) -> Message:
     user = crud.create_user(session=session, user_in=user_in)
 
     if settings.emails_enabled:
-        token = generate_email_verification_token(email=user.email)
-        send_new_account_email(email_to=user.email, username=user.name, token=token)
+        issued_at = crud.claim_verification_email(session=session, user_id=user.id)
+        token = generate_email_verification_token(user.email, issued_at=issued_at)
+        # Sent after the response; the task continues this request's trace.
+        background_tasks.add_task(
+            traced(send_new_account_email),
+            email_to=user.email,
+            username=user.name,
+            token=token,
+        )
 
     return Message(
         message="Registration successful. Please check your @troy.edu email to verify your account."
     )
 
 
+@router.post("/resend-verification", response_model=Message, status_code=202)
+def resend_verification_email(
+    session: SessionDep,
+    body: VerificationRequest,
+    background_tasks: BackgroundTasks,
+) -> Message:
+    """
+    Queue another verification email for an unverified account.
+
+    Repeated requests for an address within the cooldown are coalesced into
+    the first, and a still-valid token is sent again rather than a new one.
+    The response is the same whether or not anything was sent, so it does not
+    reveal which addresses are registered.
+    """
+    accepted = Message(
+        message="If this address belongs to an unverified account, a verification email is on its way."
+    )
+    if not settings.emails_enabled:
+        return accepted
+
+    user = crud.get_user_by_email_cached(session=session, email=body.email)
+    if not user or user.is_verified or not user.is_active:
+        return accepted
+
+    issued_at = crud.claim_verification_email(session=session, user_id=user.id)
+    if issued_at is None:
+        return accepted
+
+    token = generate_email_verification_token(user.email, issued_at=issued_at)
+    background_tasks.add_task(
+        traced(send_new_account_email),
+        email_to=user.email,
+        username=user.name,
+        token=token,
+    )
+    return accepted
+
+
 @router.get("/verify-email", response_model=Message)
 def verify_email(session: SessionDep, token: str) -> Message:
     """
@@ -59,10 +109,10 @@ def verify_email(session: SessionDep, token: str) -> Message:
             status_code=400, detail="This email address has already been verified."
         )
 
-    # Update user status and assign default permissions
+    # Verified accounts get their permissions from their role.
     user.is_verified = True
-    user.permissions = ["document:read"]
     session.add(user)
     session.commit()
+    user_cache.invalidate(user_id=user.id, emails=(user.email,))
 
     return Message(message="Email verified successfully. You can now log in.")
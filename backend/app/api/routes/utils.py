@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from app.api.deps import get_current_active_superuser
 from app.core.config import settings
-from app.core.security import get_current_active_superuser
-from app.schemas import Message
+from app.core import bulkheads, health
+from app.core.bulkheads import bulkhead_route, use_bulkhead
+from app.core.cache import user_cache
+from app.core.db import connection_hold_stats
+from app.core.lifecycle import lifecycle
+from app.email_service import EmailError, EmailUnavailableError, send_email
+from app.schemas import HealthStatus, Message
+from app.utils import generate_test_email
 from pydantic import EmailStr
 
-router = APIRouter()
+# Probes are never queued behind other work; only the admin and email
+# endpoints are limited.
+router = APIRouter(route_class=bulkhead_route(None))
 
 
 @router.post(
@@ -12,14 +21,21 @@ router = APIRouter()
     dependencies=[Depends(get_current_active_superuser)],
     status_code=201,
 )
-def test_email(email_to: EmailStr) -> Message:
-    from app.email_service import send_email
-
-    send_email(
-        email_to=email_to,
-        subject="Test email",
-        template_name="test_email.html",
-    )
+@use_bulkhead("email")
+async def test_email(email_to: EmailStr) -> Message:
+    """
+    Send a test email through the configured transport.
+    """
+    try:
+        await send_email(generate_test_email(email_to))
+    except EmailUnavailableError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(int(settings.EMAIL_BREAKER_RESET_SECONDS))},
+        )
+    except EmailError as e:
+        raise HTTPException(status_code=502, detail=f"Test email not sent: {e}")
 
     return Message(message="Test email sent")
 
@@ -29,6 +45,70 @@ async def health_check() -> bool:
     return True
 
 
+@router.get("/health/live", response_model=HealthStatus)
+async def liveness() -> HealthStatus:
+    """
+    The process is up and serving requests. Does not touch any dependency.
+    """
+    return HealthStatus(status="ok")
+
+
+@router.get(
+    "/health/ready",
+    response_model=HealthStatus,
+    responses={503: {"model": HealthStatus}},
+)
+async def readiness(response: Response) -> HealthStatus:
+    """
+    Whether this worker should receive traffic: database reachable, and email
+    transport state if configured as critical. Connection pool and threadpool
+    saturation are reported but don't fail it. Probe results are cached
+    briefly and bounded by a timeout. Fails while the worker is shutting down.
+    """
+    if lifecycle.draining:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return HealthStatus(status="draining")
+    ready, probes = await health.readiness()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return HealthStatus(status="ok" if ready else "unavailable", probes=probes)
+
+
+@router.get(
+    "/db-connection-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+@use_bulkhead("admin")
+def db_connection_stats() -> dict[str, dict[str, float]]:
+    """
+    Per-route connection hold times recorded by this worker process.
+    """
+    return connection_hold_stats.snapshot()
+
+
+@router.get(
+    "/user-cache-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+@use_bulkhead("admin")
+def user_cache_stats() -> dict[str, float]:
+    """
+    Hit ratio and invalidation lag of this worker's user cache.
+    """
+    return user_cache.stats()
+
+
+@router.get(
+    "/bulkhead-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def bulkhead_stats() -> dict[str, dict[str, float]]:
+    """
+    Threadpool and per-bulkhead occupancy of this worker process.
+    """
+    return bulkheads.stats()
+
+
 @router.get("/debug/cors/")
 async def debug_cors() -> dict:
     """Debug endpoint to check CORS configuration"""
@@ -2,20 +2,31 @@ import logging
 
 from sqlalchemy import Engine
 from sqlmodel import Session, select
-from tenacity import after_log, before_log, retry, stop_after_attempt, wait_fixed
+from tenacity import (
+    after_log,
+    before_log,
+    retry,
+    stop_after_delay,
+    wait_random_exponential,
+)
 
 from app.core.db import engine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-max_tries = 60 * 5  # 5 minutes
-wait_seconds = 1
+max_wait_seconds = 60 * 5  # 5 minutes
+# Exponential backoff with full jitter: the first retries come quickly, and
+# replicas starting together do not poll the database in lockstep.
+backoff_multiplier = 0.1
+backoff_max_seconds = 5
 
 
 @retry(
-    stop=stop_after_attempt(max_tries),
-    wait=wait_fixed(wait_seconds),
+    stop=stop_after_delay(max_wait_seconds),
+    wait=wait_random_exponential(
+        multiplier=backoff_multiplier, max=backoff_max_seconds
+    ),
     before=before_log(logger, logging.INFO),
     after=after_log(logger, logging.WARN),
 )
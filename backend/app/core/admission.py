@@ -0,0 +1,233 @@
+"""
+Admission control: shed load early instead of letting requests time out.
+
+Each worker admits at most ``ADMISSION_MAX_IN_FLIGHT`` requests at once; the
+rest wait in a priority queue. How long they may wait follows CoDel
+(controlled delay), in the form used for server request queues: a burst is
+allowed to queue for up to ``ADMISSION_INTERVAL_MS``, but once the queue has
+not been empty for a whole interval the worker is overloaded, and until the
+queue drains:
+
+* anonymous sign-ups (and verification resends) are rejected as soon as
+  they would have to queue,
+* other anonymous requests may only wait ``ADMISSION_TARGET_DELAY_MS``,
+* authenticated requests keep the full interval.
+
+A request counts as authenticated only if its bearer token verifies (an
+HMAC and an expiry check); a missing, forged or expired token is treated
+as anonymous, so the priority cannot be claimed by just sending a header.
+
+Rejected requests get 503 with ``Retry-After`` before any work is done on
+them. Health probes and ``/metrics`` bypass admission entirely, so an
+overloaded worker still reports its state.
+"""
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+import anyio
+from jose import JWTError
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.keyring import keyring
+from app.core.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_WAIT,
+    ADMISSION_QUEUED,
+    ADMISSION_REJECTIONS,
+)
+
+
+class Priority(IntEnum):
+    # Lower values are admitted first.
+    AUTHENTICATED = 0
+    ANONYMOUS = 1
+    REGISTRATION = 2
+
+
+BYPASS_PREFIXES = ("/metrics", f"{settings.API_V1_STR}/health")
+REGISTRATION_PATHS = (
+    f"{settings.API_V1_STR}/register",
+    f"{settings.API_V1_STR}/resend-verification",
+)
+
+
+def _has_valid_token(value: bytes) -> bool:
+    try:
+        keyring.decode(value[7:].decode("latin-1").strip())
+    except JWTError:
+        return False
+    return True
+
+
+def classify(scope: Scope) -> Priority | None:
+    """
+    Priority of a request, or None if it is not subject to admission.
+    """
+    path: str = scope["path"]
+    if path.startswith(BYPASS_PREFIXES):
+        return None
+    for name, value in scope["headers"]:
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            if _has_valid_token(value):
+                return Priority.AUTHENTICATED
+            break
+    if path.startswith(REGISTRATION_PATHS):
+        return Priority.REGISTRATION
+    return Priority.ANONYMOUS
+
+
+@dataclass
+class _Waiter:
+    priority: Priority
+    enqueued_at: float
+    event: anyio.Event = field(default_factory=anyio.Event)
+    admitted: bool = False
+
+
+class AdmissionController:
+    def __init__(
+        self, *, max_in_flight: int, target_delay: float, interval: float
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.target_delay = target_delay
+        self.interval = interval
+        self.in_flight = 0
+        self.rejected = 0
+        self._queue: list[tuple[Priority, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        # Last time nothing was queued.
+        self._last_good = time.monotonic()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def overloaded(self, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return now - self._last_good > self.interval
+
+    def _max_wait(self, priority: Priority, now: float) -> float:
+        if not self.overloaded(now) or priority == Priority.AUTHENTICATED:
+            return self.interval
+        if priority == Priority.REGISTRATION:
+            return 0.0
+        return self.target_delay
+
+    async def admit(self, priority: Priority) -> bool:
+        """
+        Wait for a slot. Returns False if the request should be rejected;
+        on True the caller must call ``release`` when done.
+        """
+        now = time.monotonic()
+        if self.in_flight < self.max_in_flight and not self._queue:
+            self.in_flight += 1
+            self._last_good = now
+            return True
+        max_wait = self._max_wait(priority, now)
+        if max_wait <= 0:
+            return self._reject(priority)
+
+        waiter = _Waiter(priority, now)
+        entry = (priority, next(self._sequence), waiter)
+        heapq.heappush(self._queue, entry)
+        ADMISSION_QUEUED.inc()
+        try:
+            with anyio.move_on_after(max_wait):
+                await waiter.event.wait()
+        except BaseException:
+            # Cancelled, e.g. the client went away: give back a slot that
+            # may have been handed over in the meantime.
+            if waiter.admitted:
+                self.release()
+            else:
+                self._remove(entry)
+            raise
+        if not waiter.admitted:
+            self._remove(entry)
+            return self._reject(priority)
+        return True
+
+    def release(self) -> None:
+        """
+        Hand the slot to the first queued request, or free it.
+        """
+        now = time.monotonic()
+        if not self._queue:
+            self.in_flight -= 1
+            self._last_good = now
+            return
+        priority, _, waiter = heapq.heappop(self._queue)
+        ADMISSION_QUEUED.dec()
+        if not self._queue:
+            self._last_good = now
+        waited = now - waiter.enqueued_at
+        ADMISSION_QUEUE_WAIT.labels(priority.name.lower()).observe(waited)
+        waiter.admitted = True
+        waiter.event.set()
+
+    def _remove(self, entry: tuple[Priority, int, _Waiter]) -> None:
+        self._queue.remove(entry)
+        heapq.heapify(self._queue)
+        ADMISSION_QUEUED.dec()
+        if not self._queue:
+            self._last_good = time.monotonic()
+
+    def _reject(self, priority: Priority) -> bool:
+        self.rejected += 1
+        ADMISSION_REJECTIONS.labels(priority.name.lower()).inc()
+        return False
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "overloaded": self.overloaded(),
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware applying an ``AdmissionController`` per worker.
+    """
+
+    def __init__(
+        self, app: ASGIApp, controller: AdmissionController | None = None
+    ) -> None:
+        self.app = app
+        self.controller = controller or AdmissionController(
+            max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+            target_delay=settings.ADMISSION_TARGET_DELAY_MS / 1000,
+            interval=settings.ADMISSION_INTERVAL_MS / 1000,
+        )
+        self.rejection = Response(
+            b'{"detail":"The server is overloaded, please retry shortly."}',
+            status_code=503,
+            media_type="application/json",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = classify(scope)
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+        if not await self.controller.admit(priority):
+            await self.rejection(scope, receive, send)
+            return
+        ADMISSION_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ADMISSION_IN_FLIGHT.dec()
+            self.controller.release()
@@ -0,0 +1,158 @@
+"""
+Per-route-group concurrency limits ("bulkheads").
+
+Sync endpoints and dependencies run on AnyIO's worker threads. Without
+limits, a burst of slow calls (bcrypt logins, SMTP sends) can hold every
+thread while cheap requests queue behind them. Each route group gets its own
+capacity, acquired before any of the route's dependencies run, so at most
+that many of its requests hold threads at once; the rest wait on the event
+loop, and give up with 503 after ``BULKHEAD_QUEUE_TIMEOUT_SECONDS``.
+
+Routers opt in with ``APIRouter(route_class=bulkhead_route("auth"))``; a
+single endpoint can pick another group with ``@use_bulkhead("email")``.
+Routes without a group (health probes) are not limited.
+"""
+
+import time
+from collections.abc import AsyncIterator, Callable, Coroutine
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+import anyio
+import anyio.to_thread
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.core.metrics import (
+    BULKHEAD_IN_USE,
+    BULKHEAD_QUEUED,
+    BULKHEAD_REJECTIONS,
+    BULKHEAD_WAIT,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Bulkhead:
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = limit
+        self.waiting = 0
+        self.rejected = 0
+        # Created on first use, inside the event loop.
+        self._limiter: anyio.CapacityLimiter | None = None
+        self._in_use = BULKHEAD_IN_USE.labels(name)
+        self._queued = BULKHEAD_QUEUED.labels(name)
+        self._wait = BULKHEAD_WAIT.labels(name)
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.limit)
+        return self._limiter
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        limiter = self.limiter
+        started = time.perf_counter()
+        self.waiting += 1
+        self._queued.inc()
+        try:
+            with anyio.fail_after(settings.BULKHEAD_QUEUE_TIMEOUT_SECONDS):
+                await limiter.acquire()
+        except TimeoutError:
+            self.rejected += 1
+            BULKHEAD_REJECTIONS.labels(self.name).inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The server is busy, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self.waiting -= 1
+            self._queued.dec()
+        self._wait.observe(time.perf_counter() - started)
+        self._in_use.inc()
+        try:
+            yield
+        finally:
+            limiter.release()
+            self._in_use.dec()
+
+    def stats(self) -> dict[str, float]:
+        in_use = self._limiter.borrowed_tokens if self._limiter is not None else 0
+        return {
+            "limit": self.limit,
+            "in_use": in_use,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+bulkheads = {
+    name: Bulkhead(name, limit) for name, limit in settings.BULKHEAD_LIMITS.items()
+}
+
+
+def use_bulkhead(name: str) -> Callable[[F], F]:
+    """
+    Put one endpoint in a different group than its router's default.
+    """
+    if name not in bulkheads:
+        raise KeyError(f"Unknown bulkhead {name!r}, see BULKHEAD_LIMITS")
+
+    def decorator(endpoint: F) -> F:
+        endpoint.bulkhead = name  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorator
+
+
+def bulkhead_route(default: str | None) -> type[APIRoute]:
+    """
+    Route class running each request of the router's routes inside the
+    bulkhead named by ``use_bulkhead`` on the endpoint, else ``default``.
+    """
+    if default is not None and default not in bulkheads:
+        raise KeyError(f"Unknown bulkhead {default!r}, see BULKHEAD_LIMITS")
+
+    class BulkheadRoute(APIRoute):
+        def get_route_handler(
+            self,
+        ) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+            handler = super().get_route_handler()
+            name = getattr(self.endpoint, "bulkhead", default)
+            if name is None:
+                return handler
+            bulkhead = bulkheads[name]
+
+            async def limited_handler(request: Request) -> Response:
+                async with bulkhead.acquire():
+                    return await handler(request)
+
+            return limited_handler
+
+    return BulkheadRoute
+
+
+def configure_threadpool() -> None:
+    """
+    Apply THREADPOOL_SIZE to AnyIO's default limiter, which FastAPI uses for
+    sync endpoints and dependencies. Must run inside the event loop.
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        settings.THREADPOOL_SIZE
+    )
+
+
+def stats() -> dict[str, dict[str, float]]:
+    threadpool = anyio.to_thread.current_default_thread_limiter().statistics()
+    return {
+        "threadpool": {
+            "limit": threadpool.total_tokens,
+            "in_use": threadpool.borrowed_tokens,
+            "waiting": threadpool.tasks_waiting,
+        },
+        **{name: bulkhead.stats() for name, bulkhead in bulkheads.items()},
+    }
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+import psycopg
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.metrics import USER_CACHE_INVALIDATION_LAG, USER_CACHE_LOOKUPS
+from app.core.permissions import ROLE_CHANGED_CHANNEL, handle_role_changed, role_cache
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+# Channel the user table trigger publishes to, see the
+# "add_user_changed_notify_trigger" migration.
+USER_CHANGED_CHANNEL = "user_changed"
+
+# Columns kept in the cache. hashed_password is left out on purpose: it is
+# only needed by crud.authenticate, which always reads from the database.
+CACHED_COLUMNS = tuple(
+    attr.key for attr in inspect(User).column_attrs if attr.key != "hashed_password"
+)
+# Mutable column values, copied in and out so callers can't change an entry.
+LIST_COLUMNS = ("permissions", "denied_permissions")
+
+
+class UserCache:
+    """
+    Process-local read-through cache of user rows, keyed by id with a
+    secondary email index. Entries expire after ``ttl`` seconds and the least
+    recently used entry is evicted once ``max_size`` is reached.
+
+    Values are plain dicts of column values, never ORM instances, so a cached
+    row can be turned into a fresh instance for each request's session.
+
+    The cache only stores values while ``enabled`` is set, which the
+    ``user_changed`` listener does once it is subscribed; without a listener
+    (scripts, a lost connection) nothing is cached that could go stale.
+
+    ``generation`` changes on every invalidation. Callers read it before
+    loading from the database and pass it to ``put``, which drops the value
+    if an invalidation happened in between, so a slow read can't put a stale
+    row back after the change notification has been processed.
+    """
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[uuid.UUID, tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self._ids_by_email: dict[str, uuid.UUID] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.invalidation_lag_count = 0
+        self.invalidation_lag_total = 0.0
+        self.invalidation_lag_max = 0.0
+
+    @staticmethod
+    def snapshot(user: User) -> dict[str, Any]:
+        values = {key: getattr(user, key) for key in CACHED_COLUMNS}
+        for key in LIST_COLUMNS:
+            values[key] = list(values[key])
+        return values
+
+    def get_by_id(self, user_id: uuid.UUID) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self._miss()
+                return None
+            expires_at, values = entry
+            if expires_at < time.monotonic():
+                self._remove(user_id)
+                self._miss()
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            USER_CACHE_LOOKUPS.labels("hit").inc()
+            values = dict(values)
+            for key in LIST_COLUMNS:
+                values[key] = list(values[key])
+            return values
+
+    def get_by_email(self, email: str) -> dict[str, Any] | None:
+        with self._lock:
+            user_id = self._ids_by_email.get(email)
+        if user_id is None:
+            with self._lock:
+                self._miss()
+            return None
+        return self.get_by_id(user_id)
+
+    def put(self, values: dict[str, Any], generation: int) -> None:
+        with self._lock:
+            if not self.enabled or generation != self.generation:
+                return
+            user_id = values["id"]
+            self._remove(user_id)
+            self._entries[user_id] = (time.monotonic() + self.ttl, values)
+            self._ids_by_email[values["email"]] = user_id
+            while len(self._entries) > self.max_size:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self.evictions += 1
+
+    def invalidate(
+        self,
+        *,
+        user_id: uuid.UUID | None = None,
+        emails: tuple[str | None, ...] = (),
+        changed_at: float | None = None,
+    ) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            if user_id is not None:
+                self._remove(user_id)
+            for email in emails:
+                if email is not None and email in self._ids_by_email:
+                    self._remove(self._ids_by_email[email])
+            if changed_at is not None:
+                lag = max(time.time() - changed_at, 0.0)
+                self.invalidation_lag_count += 1
+                self.invalidation_lag_total += lag
+                self.invalidation_lag_max = max(self.invalidation_lag_max, lag)
+                USER_CACHE_INVALIDATION_LAG.observe(lag)
+
+    def clear(self, *, enabled: bool | None = None) -> None:
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            self.generation += 1
+            self._entries.clear()
+            self._ids_by_email.clear()
+
+    def _miss(self) -> None:
+        self.misses += 1
+        USER_CACHE_LOOKUPS.labels("miss").inc()
+
+    def _remove(self, user_id: uuid.UUID) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            email = entry[1]["email"]
+            if self._ids_by_email.get(email) == user_id:
+                del self._ids_by_email[email]
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            lag_count = self.invalidation_lag_count
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "invalidation_lag_avg_seconds": (
+                    self.invalidation_lag_total / lag_count if lag_count else 0.0
+                ),
+                "invalidation_lag_max_seconds": self.invalidation_lag_max,
+            }
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def handle_user_changed(payload: str) -> None:
+    try:
+        data = json.loads(payload)
+        user_id = uuid.UUID(data["id"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning(
+            "Ignoring malformed %s payload: %r", USER_CHANGED_CHANNEL, payload
+        )
+        user_cache.clear()
+        return
+    user_cache.invalidate(
+        user_id=user_id,
+        emails=(data.get("email"), data.get("old_email")),
+        changed_at=data.get("changed_at"),
+    )
+
+
+async def listen_for_user_changes() -> None:
+    """
+    Keep a dedicated connection LISTENing on ``user_changed`` and
+    ``role_changed`` and invalidate the user and role caches as notifications
+    arrive. Runs for the life of the worker process; on connection loss the
+    caches are cleared (notifications may have been missed) and the listener
+    reconnects with backoff.
+    """
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    delay = 0.5
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(
+                dsn, autocommit=True
+            ) as connection:
+                await connection.execute(f"LISTEN {USER_CHANGED_CHANNEL}")
+                await connection.execute(f"LISTEN {ROLE_CHANGED_CHANNEL}")
+                # Anything cached before LISTEN took effect may be stale.
+                user_cache.clear(enabled=settings.USER_CACHE_ENABLED)
+                role_cache.clear(enabled=True)
+                delay = 0.5
+                logger.info(
+                    "Listening for %s and %s notifications",
+                    USER_CHANGED_CHANNEL,
+                    ROLE_CHANGED_CHANNEL,
+                )
+                async for notify in connection.notifies():
+                    if notify.channel == ROLE_CHANGED_CHANNEL:
+                        handle_role_changed(notify.payload)
+                    else:
+                        handle_user_changed(notify.payload)
+        except asyncio.CancelledError:
+            user_cache.clear(enabled=False)
+            role_cache.clear(enabled=False)
+            raise
+        except Exception as e:
+            user_cache.clear(enabled=False)
+            role_cache.clear(enabled=False)
+            logger.warning(
+                "User cache listener disconnected (%s), retrying in %.1fs", e, delay
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
@@ -0,0 +1,77 @@
+"""
+Cohorts: students grouped by ``major`` and ``class_``.
+
+Members are read from the user table through the (major, class_, id)
+index, so a page of a cohort is a short index range scan however large the
+table grows. Cohort sizes come from the ``cohort_size`` materialized view,
+which each worker refreshes every ``COHORT_REFRESH_SECONDS`` with
+``REFRESH MATERIALIZED VIEW CONCURRENTLY``: readers keep seeing the previous
+contents while it runs instead of waiting on its lock. A transaction-level
+advisory lock and the view's ``refreshed_at`` column make sure only one
+worker across all replicas refreshes it per interval.
+"""
+
+import asyncio
+import logging
+import random
+
+import anyio.to_thread
+from sqlalchemy import column, func, select, table, text
+
+from app.core.config import settings
+from app.core.db import engine
+
+logger = logging.getLogger(__name__)
+
+# Key for pg_try_advisory_xact_lock, shared by all replicas ("coho").
+REFRESH_LOCK_KEY = 0x636F686F
+
+# See the "add_cohort_index_and_size_view" migration.
+cohort_size = table(
+    "cohort_size",
+    column("major"),
+    column("class_"),
+    column("members"),
+    column("verified"),
+    column("refreshed_at"),
+)
+
+
+def refresh_cohort_sizes(max_age: float) -> bool:
+    """
+    Refresh ``cohort_size`` unless another worker is doing so or did within
+    the last ``max_age`` seconds. Returns whether it was refreshed.
+    """
+    with engine.connect() as connection:
+        locked: bool = connection.execute(
+            select(func.pg_try_advisory_xact_lock(REFRESH_LOCK_KEY))
+        ).scalar_one()
+        if not locked:
+            return False
+        age = connection.execute(
+            select(
+                func.extract("epoch", func.now() - func.max(cohort_size.c.refreshed_at))
+            )
+        ).scalar_one()
+        if age is not None and age < max_age:
+            return False
+        connection.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY cohort_size"))
+        connection.commit()
+    return True
+
+
+async def refresh_cohort_sizes_periodically() -> None:
+    """
+    Keep ``cohort_size`` at most about ``COHORT_REFRESH_SECONDS`` old. Runs
+    for the life of the worker process; failures are logged and retried at
+    the next interval.
+    """
+    interval = settings.COHORT_REFRESH_SECONDS
+    while True:
+        # Jittered, so the workers don't all wake up together.
+        await asyncio.sleep(interval * random.uniform(0.5, 1.0))
+        try:
+            if await anyio.to_thread.run_sync(refresh_cohort_sizes, interval):
+                logger.info("Refreshed cohort sizes")
+        except Exception as e:
+            logger.warning("Refreshing cohort sizes failed: %s", e)
@@ -6,6 +6,7 @@ from pydantic import (
     AnyUrl,
     BeforeValidator,
     EmailStr,
+    Field,
     HttpUrl,
     PostgresDsn,
     computed_field,
@@ -31,6 +32,13 @@ class Settings(BaseSettings):
     )
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
+    # JWT signing keys by key id ("kid"), as JSON. New tokens are signed with
+    # SIGNING_KEY_ID and carry its id; a token is verified with the key its
+    # header names, so to rotate, add a key, switch SIGNING_KEY_ID to it and
+    # drop the old one once its tokens have expired. Tokens without a kid
+    # are verified with SECRET_KEY. See app/core/keyring.py.
+    SIGNING_KEYS: dict[str, str] = {}
+    SIGNING_KEY_ID: str | None = None
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
     FRONTEND_HOST: str = "http://localhost:5173"
     SERVER_HOST: str = "http://localhost:8000"
@@ -49,6 +57,9 @@ class Settings(BaseSettings):
 
     PROJECT_NAME: str
     SENTRY_DSN: HttpUrl | None = None
+    # Share of requests traced; health probes and /metrics are never traced.
+    SENTRY_TRACES_SAMPLE_RATE: float = 0.1
+    SENTRY_PROFILES_SAMPLE_RATE: float = 0.0
 
     DATABASE_URL: PostgresDsn | None = None
     POSTGRES_SERVER: str | None = None
@@ -76,6 +87,67 @@ class Settings(BaseSettings):
             )
         raise ValueError("Database configuration is missing. Set either DATABASE_URL or all POSTGRES_* variables.")
 
+    # Per-process user cache, invalidated through LISTEN/NOTIFY (app/core/cache.py)
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 10_000
+    # Roles are cached the same way (app/core/permissions.py); the TTL only
+    # applies while the change listener is not connected.
+    ROLE_CACHE_TTL_SECONDS: float = 60.0
+
+    # Statements slower than this are logged; parameter values are redacted
+    # unless SLOW_QUERY_LOG_PARAMETERS is set (never in production).
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_LOG_PARAMETERS: bool = False
+
+    # Worker threads for sync endpoints and dependencies, and how many of
+    # them each route group may hold at once (app/core/bulkheads.py).
+    THREADPOOL_SIZE: int = 40
+    BULKHEAD_LIMITS: dict[str, int] = {
+        "auth": 10,
+        "email": 4,
+        "admin": 8,
+        "reads": 16,
+    }
+    BULKHEAD_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
+    # How stale the cohort_size materialized view may get (app/core/cohorts.py).
+    COHORT_REFRESH_SECONDS: float = 300.0
+
+    # Admission control (app/core/admission.py), per worker. Requests beyond
+    # ADMISSION_MAX_IN_FLIGHT queue; once the queue has not been empty for an
+    # interval, anonymous traffic is shed with 503.
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = Field(default=64, ge=1)
+    ADMISSION_TARGET_DELAY_MS: float = 50.0
+    ADMISSION_INTERVAL_MS: float = 500.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Server process (app/server.py). Without WEB_CONCURRENCY the worker
+    # count follows the container's CPU quota and memory limit.
+    WEB_BIND: str = "0.0.0.0:8000"
+    WEB_CONCURRENCY: int | None = None
+    WEB_WORKERS_PER_CORE: float = 1.0
+    WEB_MAX_WORKERS: int = 16
+    WEB_WORKER_MEMORY_MB: int = 256
+    WEB_MAX_REQUESTS: int = 10_000
+    WEB_MAX_REQUESTS_JITTER: int = 1_000
+    # Must exceed the proxy's idle timeout for upstream connections (Traefik:
+    # 90s), or it can reuse a connection a worker just closed and answer 502.
+    WEB_KEEPALIVE_SECONDS: int = 95
+    WEB_BACKLOG: int = 2048
+    WEB_TIMEOUT_SECONDS: int = 60
+    WEB_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    # Shutdown (app/core/lifecycle.py): after SIGTERM, keep serving with
+    # readiness failing for the drain delay, then drain in-flight requests;
+    # the cleanup budget is kept out of the graceful timeout for the
+    # lifespan shutdown.
+    SHUTDOWN_DRAIN_DELAY_SECONDS: float = 5.0
+    SHUTDOWN_CLEANUP_TIMEOUT_SECONDS: float = 5.0
+
+    # Guards applied to the Alembic connection, see app/alembic/online.py
+    MIGRATION_LOCK_TIMEOUT: str = "5s"
+    MIGRATION_STATEMENT_TIMEOUT: str = "60s"
 
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
@@ -93,11 +165,76 @@ class Settings(BaseSettings):
         return self
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
+    # /resend-verification: at most one email per address per cooldown, and
+    # the previous token is sent again while it stays valid at least
+    # EMAIL_VERIFICATION_MIN_VALIDITY_HOURS longer.
+    EMAIL_VERIFICATION_COOLDOWN_SECONDS: int = 300
+    EMAIL_VERIFICATION_MIN_VALIDITY_HOURS: int = 24
+
+    # bcrypt cost for new hashes. The test suite lowers it to the minimum (4);
+    # existing hashes keep the cost they were created with.
+    PASSWORD_HASH_ROUNDS: int = Field(default=12, ge=4, le=31)
+
+    @model_validator(mode="after")
+    def _check_password_hash_rounds(self) -> Self:
+        if self.ENVIRONMENT != "local" and self.PASSWORD_HASH_ROUNDS < 12:
+            raise ValueError(
+                "PASSWORD_HASH_ROUNDS below 12 is only allowed with ENVIRONMENT=local."
+            )
+        return self
+
+    # Email delivery (app/email_service.py). Without EMAIL_TRANSPORT, SMTP is
+    # used when configured, else Resend when RESEND_API_KEY is set. "file"
+    # writes each message to EMAIL_FILE_DIR, "memory" keeps them in-process.
+    EMAIL_TRANSPORT: Literal["smtp", "resend", "file", "memory"] | None = None
+    EMAIL_FILE_DIR: str = "/tmp/emails"
+    EMAIL_MAX_ATTEMPTS: int = Field(default=3, ge=1)
+    EMAIL_RETRY_BACKOFF_SECONDS: float = 0.5
+    # Consecutive failed attempts before the provider is left alone for
+    # EMAIL_BREAKER_RESET_SECONDS.
+    EMAIL_BREAKER_FAILURE_THRESHOLD: int = 5
+    EMAIL_BREAKER_RESET_SECONDS: float = 30.0
+
+    @property
+    def email_transport(self) -> str | None:
+        if self.EMAIL_TRANSPORT:
+            return self.EMAIL_TRANSPORT
+        if self.SMTP_HOST and self.EMAILS_FROM_EMAIL:
+            return "smtp"
+        if self.RESEND_API_KEY:
+            return "resend"
+        return None
+
+    @model_validator(mode="after")
+    def _check_signing_keys(self) -> Self:
+        if self.SIGNING_KEYS and self.SIGNING_KEY_ID not in self.SIGNING_KEYS:
+            raise ValueError("SIGNING_KEY_ID must name one of the SIGNING_KEYS.")
+        if self.SIGNING_KEY_ID and not self.SIGNING_KEYS:
+            raise ValueError("SIGNING_KEY_ID is set but SIGNING_KEYS is empty.")
+        return self
+
+    @property
+    def signing_key_is_ephemeral(self) -> bool:
+        """
+        Tokens are signed with the SECRET_KEY generated at startup, which
+        differs between processes and restarts.
+        """
+        return not self.SIGNING_KEYS and "SECRET_KEY" not in self.model_fields_set
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def emails_enabled(self) -> bool:
-        return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
+        return self.email_transport is not None
+
+    # Readiness probes (app/core/health.py)
+    HEALTH_PROBE_TTL_SECONDS: float = 2.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 1.0
+    # Share of the DB pool / threadpool in use above which the readiness body
+    # reports it as saturated. Informational; readiness doesn't fail on it.
+    HEALTH_POOL_SATURATION_LIMIT: float = 0.9
+    HEALTH_THREADPOOL_SATURATION_LIMIT: float = 0.9
+    # Whether a failing email transport takes the instance out of rotation.
+    HEALTH_EMAIL_CRITICAL: bool = False
 
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     RESEND_API_KEY: str | None = None
@@ -1,11 +1,152 @@
+import logging
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
 from sqlmodel import Session, create_engine
 
 from app.core.config import settings
+from app.core.metrics import DB_CONNECTION_HOLD, current_query_stats
+
+logger = logging.getLogger(__name__)
 
 # The database engine is created using the URI from the application settings.
 engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
 
 
+class ConnectionHoldStats:
+    """
+    Per-route totals of how long request sessions kept a pooled connection
+    checked out. Only sessions created with a ``route`` in ``Session.info``
+    (see ``app.api.deps.get_session``) are recorded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[str, list[float]] = {}
+
+    def record(self, route: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                self._routes[route] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                route: {
+                    "count": count,
+                    "total_seconds": total,
+                    "max_seconds": longest,
+                    "avg_seconds": total / count,
+                }
+                for route, (count, total, longest) in self._routes.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+connection_hold_stats = ConnectionHoldStats()
+
+
+def release_connection(session: Session) -> None:
+    """
+    End the session's current transaction so its connection goes back to the
+    pool before slow, non-database work (bcrypt, JWT, serialization).
+
+    Pending changes are committed. The session stays usable: the next
+    statement lazily checks out a new connection.
+    """
+    if session.in_transaction():
+        session.commit()
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_connection_acquired(
+    session: Session,
+    transaction: Any,  # noqa: ARG001
+    connection: Any,  # noqa: ARG001
+) -> None:
+    session.info.setdefault("connection_acquired_at", time.perf_counter())
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _record_connection_hold(session: Session, transaction: Any) -> None:
+    if transaction.parent is not None:
+        return
+    acquired_at = session.info.pop("connection_acquired_at", None)
+    route = session.info.get("route")
+    if acquired_at is None or route is None:
+        return
+    held = time.perf_counter() - acquired_at
+    connection_hold_stats.record(route, held)
+    DB_CONNECTION_HOLD.labels(route).observe(held)
+    logger.debug("DB connection held for %.2f ms on %s", held * 1000, route)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(
+    conn: Any,  # noqa: ARG001
+    cursor: Any,  # noqa: ARG001
+    statement: str,  # noqa: ARG001
+    parameters: Any,  # noqa: ARG001
+    context: Any,
+    executemany: bool,  # noqa: ARG001
+) -> None:
+    # Kept on the statement's execution context rather than the connection:
+    # after_cursor_execute doesn't run when the statement fails, and the
+    # context is discarded along with its start time. Statements executed
+    # without a context (a few dialect internals) are not timed.
+    if context is not None:
+        context.query_started_at = time.perf_counter()
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """
+    Replace bound parameter values with their type, so slow query logs never
+    contain emails, password hashes or tokens.
+    """
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [redact_parameters(value) for value in parameters]
+    return f"<{type(parameters).__name__}>"
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _record_query(
+    conn: Any,  # noqa: ARG001
+    cursor: Any,  # noqa: ARG001
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,  # noqa: ARG001
+) -> None:
+    started_at = getattr(context, "query_started_at", None)
+    if started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        logger.warning(
+            "Slow query (%.1f ms): %s parameters=%s",
+            elapsed * 1000,
+            statement,
+            parameters
+            if settings.SLOW_QUERY_LOG_PARAMETERS
+            else redact_parameters(parameters),
+        )
+
+
 # This function is a stub and is not directly called for initial data creation.
 # The primary initialization logic is triggered by the backend_pre_start.py script,
 # which executes the logic defined in app/initial_data.py.
@@ -0,0 +1,217 @@
+import logging
+import math
+import socket
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import anyio
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.core.config import settings
+from app.core.db import engine
+from app.email_service import get_mailer
+from app.schemas import ProbeResult
+
+logger = logging.getLogger(__name__)
+
+
+class CachedProbe:
+    """
+    A readiness check whose result is reused for HEALTH_PROBE_TTL_SECONDS.
+
+    Only one refresh runs at a time per process; concurrent callers wait for
+    it and share the result, so a burst of health checks costs one probe.
+    Blocking checks run in a worker thread and are abandoned after
+    HEALTH_PROBE_TIMEOUT_SECONDS, which is reported as a failure. While an
+    abandoned check is still running no new one is started, so a hung
+    dependency ties up at most one thread per probe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        check: Callable[[], dict[str, Any]],
+        *,
+        blocking: bool = False,
+        critical: bool = True,
+    ) -> None:
+        self.name = name
+        self.check = check
+        self.blocking = blocking
+        self.critical = critical
+        self._result: ProbeResult | None = None
+        self._checked_at = 0.0
+        self._lock: anyio.Lock | None = None
+        self._in_flight = threading.Event()
+
+    def _fresh(self) -> bool:
+        return (
+            self._result is not None
+            and time.monotonic() - self._checked_at < settings.HEALTH_PROBE_TTL_SECONDS
+        )
+
+    async def result(self) -> ProbeResult:
+        if self._fresh():
+            assert self._result is not None
+            return self._result
+        if self._lock is None:
+            self._lock = anyio.Lock()
+        async with self._lock:
+            if not self._fresh():
+                self._result = await self._run()
+                self._checked_at = time.monotonic()
+        assert self._result is not None
+        return self._result
+
+    def _check_in_thread(self) -> dict[str, Any]:
+        try:
+            return self.check()
+        finally:
+            self._in_flight.clear()
+
+    async def _run(self) -> ProbeResult:
+        started = time.perf_counter()
+        details: dict[str, Any] = {}
+        error: str | None = None
+        if self.blocking and self._in_flight.is_set():
+            return self._failed(started, "previous check still running")
+        with anyio.move_on_after(settings.HEALTH_PROBE_TIMEOUT_SECONDS) as scope:
+            try:
+                if self.blocking:
+                    self._in_flight.set()
+                    details = await anyio.to_thread.run_sync(
+                        self._check_in_thread, abandon_on_cancel=True
+                    )
+                else:
+                    details = self.check()
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+        if scope.cancelled_caught:
+            error = f"timed out after {settings.HEALTH_PROBE_TIMEOUT_SECONDS}s"
+        if error is None and details.get("error"):
+            error = details.pop("error")
+        if error:
+            return self._failed(started, error, details)
+        return ProbeResult(
+            ok=True,
+            critical=self.critical,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            details=details,
+        )
+
+    def _failed(
+        self, started: float, error: str, details: dict[str, Any] | None = None
+    ) -> ProbeResult:
+        logger.warning("Health probe %s failed: %s", self.name, error)
+        return ProbeResult(
+            ok=False,
+            critical=self.critical,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            error=error,
+            details=details or {},
+        )
+
+
+# Pings open their own connection instead of borrowing one from the request
+# pool: a pool exhausted by traffic is not a database outage. libpq rounds
+# connect_timeout to whole seconds and treats anything below 2 as 2.
+_ping_engine = create_engine(
+    engine.url,
+    poolclass=NullPool,
+    connect_args={
+        "connect_timeout": max(2, math.ceil(settings.HEALTH_PROBE_TIMEOUT_SECONDS)),
+        "options": "-c statement_timeout="
+        f"{int(settings.HEALTH_PROBE_TIMEOUT_SECONDS * 1000)}",
+    },
+)
+
+
+def check_database() -> dict[str, Any]:
+    with _ping_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return {}
+
+
+def check_pool() -> dict[str, Any]:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": pool.__class__.__name__}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    saturation = checked_out / capacity if capacity else 0.0
+    details: dict[str, Any] = {
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(saturation, 3),
+    }
+    details["saturated"] = saturation >= settings.HEALTH_POOL_SATURATION_LIMIT
+    return details
+
+
+def check_threadpool() -> dict[str, Any]:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    total = limiter.total_tokens
+    borrowed = limiter.borrowed_tokens
+    saturation = borrowed / total if total else 0.0
+    details: dict[str, Any] = {
+        "busy": borrowed,
+        "capacity": total,
+        "waiting": limiter.statistics().tasks_waiting,
+        "saturation": round(saturation, 3),
+    }
+    details["saturated"] = saturation >= settings.HEALTH_THREADPOOL_SATURATION_LIMIT
+    return details
+
+
+def check_email() -> dict[str, Any]:
+    mailer = get_mailer()
+    if mailer is None:
+        return {"transport": "disabled"}
+    details: dict[str, Any] = {
+        "transport": mailer.transport.name,
+        "breaker": mailer.breaker.state.name.lower(),
+    }
+    if mailer.transport.name == "smtp":
+        assert settings.SMTP_HOST
+        with socket.create_connection(
+            (settings.SMTP_HOST, settings.SMTP_PORT),
+            timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+        ):
+            pass
+    if details["breaker"] == "open":
+        details["error"] = "email transport failing, circuit open"
+    return details
+
+
+probes = [
+    CachedProbe("database", check_database, blocking=True),
+    # Saturation is reported, never failed on: under load every replica
+    # saturates at once, and taking them all out of rotation together would
+    # turn a spike into an outage.
+    CachedProbe("db_pool", check_pool, critical=False),
+    CachedProbe("threadpool", check_threadpool, critical=False),
+    CachedProbe(
+        "email", check_email, blocking=True, critical=settings.HEALTH_EMAIL_CRITICAL
+    ),
+]
+
+
+async def readiness() -> tuple[bool, dict[str, ProbeResult]]:
+    """
+    Run (or reuse) every probe. The service is ready when no critical probe
+    failed.
+    """
+    results: dict[str, ProbeResult] = {}
+
+    async def run(probe: CachedProbe) -> None:
+        results[probe.name] = await probe.result()
+
+    async with anyio.create_task_group() as tg:
+        for probe in probes:
+            tg.start_soon(run, probe)
+    results = {probe.name: results[probe.name] for probe in probes}
+    ready = all(result.ok for result in results.values() if result.critical)
+    return ready, results
@@ -0,0 +1,81 @@
+"""
+JWT signing keys, selected by key id.
+
+Every configured key is turned into a jose HMAC key object once, at import,
+instead of on every encode and decode. A token's header names the key that
+signed it ("kid"), so verification looks the key up directly rather than
+trying each one, and several keys can be valid at once while a rotation is
+in progress. Tokens without a kid, issued before SIGNING_KEYS was set, are
+verified with SECRET_KEY.
+"""
+
+from typing import Any
+
+from jose import jwk, jwt
+from jose.backends.base import Key
+
+from app.core.config import Settings, settings
+
+ALGORITHM = "HS256"
+
+
+class Keyring:
+    def __init__(
+        self, keys: dict[str, str], current_kid: str | None, legacy_key: str
+    ) -> None:
+        self._keys: dict[str, Key] = {
+            kid: jwk.construct(secret, ALGORITHM) for kid, secret in keys.items()
+        }
+        self._legacy_key = jwk.construct(legacy_key, ALGORITHM)
+        self.current_kid = current_kid
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "Keyring":
+        return cls(settings.SIGNING_KEYS, settings.SIGNING_KEY_ID, settings.SECRET_KEY)
+
+    @property
+    def kids(self) -> list[str]:
+        return list(self._keys)
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        token: str
+        if self.current_kid is None:
+            token = jwt.encode(claims, self._legacy_key, algorithm=ALGORITHM)
+        else:
+            token = jwt.encode(
+                claims,
+                self._keys[self.current_kid],
+                algorithm=ALGORITHM,
+                headers={"kid": self.current_kid},
+            )
+        return token
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """
+        Verified claims of ``token``. Raises ``jwt.JWTError`` if it is
+        invalid, expired or signed with an unknown key.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is not None and not isinstance(kid, str):
+            raise jwt.JWTError(f"Invalid signing key id {kid!r}")
+        key = self._legacy_key if kid is None else self._keys.get(kid)
+        if key is None:
+            raise jwt.JWTError(f"Unknown signing key {kid!r}")
+        claims: dict[str, Any] = jwt.decode(token, key, algorithms=[ALGORITHM])
+        return claims
+
+
+keyring = Keyring.from_settings(settings)
+
+
+def check_worker_count(settings: Settings, workers: int) -> None:
+    """
+    Refuse to run several worker processes while tokens are signed with a
+    key generated at startup.
+    """
+    if workers > 1 and settings.signing_key_is_ephemeral:
+        raise RuntimeError(
+            f"Refusing to start {workers} workers without SECRET_KEY or "
+            "SIGNING_KEYS set: the generated key is not shared between "
+            "processes or restarts, so tokens would randomly fail."
+        )
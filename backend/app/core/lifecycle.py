@@ -0,0 +1,153 @@
+"""
+Worker shutdown: stop taking traffic, drain, then clean up.
+
+On SIGTERM (sent by gunicorn on deploys, restarts and SIGHUP reloads) the
+worker does not stop listening right away. For ``SHUTDOWN_DRAIN_DELAY_SECONDS``
+it keeps serving while the readiness probe answers 503, so the load balancer
+takes it out of rotation, and every response asks the client to close its
+keep-alive connection. Only then does uvicorn close the listening socket and
+wait, at most until the gunicorn graceful timeout minus the cleanup budget,
+for in-flight requests. The lifespan shutdown (app/main.py) then waits for
+tracked background tasks and flushes buffers phase by phase, logging how
+long each took.
+"""
+
+import asyncio
+import logging
+import signal
+import threading
+import time
+from collections.abc import Coroutine, Iterator
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    def __init__(self) -> None:
+        self.draining_since: float | None = None
+        self.exiting_since: float | None = None
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    @property
+    def draining(self) -> bool:
+        return self.draining_since is not None
+
+    def begin_draining(self) -> None:
+        if self.draining_since is None:
+            self.draining_since = time.monotonic()
+            logger.info("Draining: readiness now fails, keep-alive disabled")
+
+    def create_task(
+        self, coro: Coroutine[Any, Any, Any], *, name: str | None = None
+    ) -> asyncio.Task[Any]:
+        """
+        Start background work that shutdown waits for, up to
+        ``SHUTDOWN_CLEANUP_TIMEOUT_SECONDS``, instead of dropping it.
+        """
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def wait_for_tasks(self, timeout: float) -> int:
+        """
+        Wait for the tracked tasks; cancel the ones still running after
+        ``timeout``. Returns how many were cancelled.
+        """
+        if not self._tasks:
+            return 0
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(
+                "Cancelled %d background task(s) still running after %.1fs",
+                len(pending),
+                timeout,
+            )
+        return len(pending)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            logger.exception("Shutdown phase %s failed", name)
+        finally:
+            logger.info(
+                "Shutdown phase %s took %.1f ms",
+                name,
+                (time.perf_counter() - started) * 1000,
+            )
+
+    def install_signal_handler(self) -> None:
+        """
+        Delay uvicorn's SIGTERM handling by ``SHUTDOWN_DRAIN_DELAY_SECONDS``,
+        draining in the meantime. Call from the lifespan startup, after
+        uvicorn installed its handlers.
+        """
+        delay = settings.SHUTDOWN_DRAIN_DELAY_SECONDS
+        # Signal handlers can only be set from the main thread (not under
+        # the test client, which runs the app in a separate thread).
+        if delay <= 0 or threading.current_thread() is not threading.main_thread():
+            return
+        exit_handler = signal.getsignal(signal.SIGTERM)
+        if not callable(exit_handler):
+            return
+        loop = asyncio.get_running_loop()
+
+        def handle_sigterm(signum: int, frame: FrameType | None) -> None:
+            if self.draining:
+                # A second SIGTERM: stop waiting.
+                exit_handler(signum, frame)
+                return
+            self.begin_draining()
+
+            def close_listeners() -> None:
+                self.exiting_since = time.monotonic()
+                logger.info("Closing listeners after %.1fs drain delay", delay)
+                exit_handler(signum, frame)
+
+            loop.call_soon_threadsafe(loop.call_later, delay, close_listeners)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+
+lifecycle = Lifecycle()
+
+
+class DrainingMiddleware:
+    """
+    While draining, mark every response ``Connection: close`` so clients and
+    proxies drop their keep-alive connections before the listener goes away,
+    rather than racing a request against the socket being closed.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and lifecycle.draining:
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() != b"connection"
+                ]
+                headers.append((b"connection", b"close"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,312 @@
+"""
+Prometheus metrics for the API.
+
+With several uvicorn workers each process keeps its own values. When
+``PROMETHEUS_MULTIPROC_DIR`` is set (the entrypoint does this) prometheus_client
+writes them to per-process files in that directory and ``/metrics`` merges the
+files of all workers, so any worker can answer a scrape with totals for the
+whole container. The variable must be set before this module is imported.
+"""
+
+import heapq
+import logging
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0
+)  # fmt: skip
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving the request to sending the last body chunk.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size.",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+    multiprocess_mode="livesum",
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling a request.",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Total SQL execution time while handling a request.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_CONNECTION_HOLD = Histogram(
+    "db_connection_hold_seconds",
+    "How long a request session kept a pooled connection checked out.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hashing and verification time.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+EMAIL_SEND_DURATION = Histogram(
+    "email_send_duration_seconds",
+    "Time spent handing a message to the email provider.",
+    ["transport", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+EMAIL_BREAKER_STATE = Gauge(
+    "email_breaker_state",
+    "Circuit breaker per email transport: 0 closed, 1 half-open, 2 open.",
+    ["transport"],
+    multiprocess_mode="livemax",
+)
+BULKHEAD_IN_USE = Gauge(
+    "bulkhead_in_use",
+    "Requests currently running inside each bulkhead.",
+    ["bulkhead"],
+    multiprocess_mode="livesum",
+)
+BULKHEAD_QUEUED = Gauge(
+    "bulkhead_queued",
+    "Requests waiting for a slot in each bulkhead.",
+    ["bulkhead"],
+    multiprocess_mode="livesum",
+)
+BULKHEAD_WAIT = Histogram(
+    "bulkhead_wait_seconds",
+    "Time requests waited for a bulkhead slot.",
+    ["bulkhead"],
+    buckets=LATENCY_BUCKETS,
+)
+BULKHEAD_REJECTIONS = Counter(
+    "bulkhead_rejections_total",
+    "Requests answered with 503 after waiting too long for a bulkhead slot.",
+    ["bulkhead"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Requests admitted by admission control and still running.",
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued",
+    "Requests waiting for admission.",
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "Time queued requests waited before being admitted.",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total",
+    "Requests shed with 503 by admission control.",
+    ["priority"],
+)
+USER_CACHE_LOOKUPS = Counter(
+    "user_cache_lookups_total",
+    "User cache lookups by result.",
+    ["result"],
+)
+USER_CACHE_INVALIDATION_LAG = Histogram(
+    "user_cache_invalidation_lag_seconds",
+    "Delay between a user row change and this worker dropping its copy.",
+    buckets=LATENCY_BUCKETS,
+)
+
+
+@dataclass
+class QueryStats:
+    """
+    SQL statements executed for the current request, filled in by the engine
+    hooks in app/core/db.py. Keeps the ``max_slowest`` slowest statements.
+    """
+
+    count: int = 0
+    seconds: float = 0.0
+    max_slowest: int = 5
+    _slowest: list[tuple[float, int, str]] = field(default_factory=list)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        entry = (seconds, self.count, statement)
+        if len(self._slowest) < self.max_slowest:
+            heapq.heappush(self._slowest, entry)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> list[tuple[float, str]]:
+        """
+        (seconds, statement) pairs, slowest first.
+        """
+        return [
+            (seconds, statement)
+            for seconds, _, statement in sorted(self._slowest, reverse=True)
+        ]
+
+
+# Set per request by MetricsMiddleware. Sync endpoints run in a threadpool
+# with a copy of the context, which still points at the same QueryStats.
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Path template of the matched route, never the raw path, so label
+    cardinality stays bounded.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead) that
+    records latency, status, response size, in-flight count and per-request
+    SQL totals.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # labels() takes a lock and builds a key on every call; the set of
+        # (method, route, status) combinations is small, so resolve each once.
+        self._series: dict[tuple[str, str], tuple[Any, ...]] = {}
+        self._request_counters: dict[tuple[str, str, int], Any] = {}
+
+    def _route_series(self, method: str, route: str) -> tuple[Any, ...]:
+        series = self._series.get((method, route))
+        if series is None:
+            series = (
+                HTTP_REQUEST_DURATION.labels(method, route),
+                HTTP_RESPONSE_SIZE.labels(method, route),
+                DB_QUERIES_PER_REQUEST.labels(route),
+                DB_TIME_PER_REQUEST.labels(route),
+            )
+            self._series[(method, route)] = series
+        return series
+
+    def _request_counter(self, method: str, route: str, status_code: int) -> Any:
+        key = (method, route, status_code)
+        counter = self._request_counters.get(key)
+        if counter is None:
+            counter = HTTP_REQUESTS.labels(method, route, str(status_code))
+            self._request_counters[key] = counter
+        return counter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        query_stats = QueryStats()
+        token = current_query_stats.set(query_stats)
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            current_query_stats.reset(token)
+            method = scope["method"]
+            route = route_template(scope)
+            duration, size, queries, db_time = self._route_series(method, route)
+            duration.observe(time.perf_counter() - started)
+            size.observe(response_size)
+            queries.observe(query_stats.count)
+            db_time.observe(query_stats.seconds)
+            self._request_counter(method, route, status_code).inc()
+            if query_stats.count and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "%s %s: %d queries in %.1f ms, slowest: %s",
+                    method,
+                    route,
+                    query_stats.count,
+                    query_stats.seconds * 1000,
+                    [
+                        (round(seconds * 1000, 1), statement)
+                        for seconds, statement in query_stats.slowest
+                    ],
+                )
+
+
+@contextmanager
+def timed(histogram: Histogram, *labels: str) -> Iterator[None]:
+    """
+    Observe the duration of the block, including when it raises.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(*labels).observe(time.perf_counter() - started)
+
+
+def metrics_endpoint(_request: Request) -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead() -> None:
+    """
+    Drop this worker's live gauges from the shared directory on shutdown.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
@@ -0,0 +1,124 @@
+"""
+Serve the OpenAPI document from memory.
+
+FastAPI builds the schema on the first request to the OpenAPI URL, which
+walks every route and model. The Docker build runs ``python -m
+app.core.openapi`` to write the document to ``app/openapi.json``; at startup
+it is loaded as bytes, served with an ETag and answered with 304 when the
+client already has it. If the file is missing or was generated from other
+code or settings (another ENVIRONMENT, say), the document is built once on
+first request and cached the same way.
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any
+
+import orjson
+from fastapi import FastAPI, Request, Response
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = Path(__file__).resolve().parents[1]
+OPENAPI_PATH = APP_DIR / "openapi.json"
+
+
+def fingerprint(app: FastAPI) -> str:
+    """
+    Identifies the inputs the document is generated from: the settings that
+    change routes or metadata, and the application source files.
+    """
+    digest = hashlib.sha256()
+    for value in (app.title, app.version, settings.ENVIRONMENT, settings.API_V1_STR):
+        digest.update(f"{value}\0".encode())
+    for path in sorted(APP_DIR.rglob("*.py")):
+        stat = path.stat()
+        digest.update(
+            f"{path.relative_to(APP_DIR)}:{stat.st_size}:{stat.st_mtime_ns}\0".encode()
+        )
+    return digest.hexdigest()
+
+
+class OpenAPIDocument:
+    def __init__(self, app: FastAPI) -> None:
+        self.app = app
+        self._body: bytes | None = None
+        self._etag = ""
+
+    def preload(self) -> None:
+        """
+        Load the precomputed document, if it is usable, before serving.
+        """
+        if self._body is None:
+            body = self._load()
+            if body is not None:
+                self._set(body)
+
+    def get(self) -> tuple[bytes, str]:
+        if self._body is None:
+            self._set(self._load() or orjson.dumps(self.app.openapi()))
+        assert self._body is not None
+        return self._body, self._etag
+
+    def _set(self, body: bytes) -> None:
+        self._body = body
+        self._etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def _load(self) -> bytes | None:
+        if not OPENAPI_PATH.exists():
+            return None
+        stored: dict[str, Any] = orjson.loads(OPENAPI_PATH.read_bytes())
+        if stored.get("fingerprint") != fingerprint(self.app):
+            logger.info("Precomputed OpenAPI document is stale, ignoring it")
+            return None
+        self.app.openapi_schema = stored["document"]
+        return orjson.dumps(stored["document"])
+
+    def response(self, request: Request) -> Response:
+        body, etag = self.get()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+
+def install(app: FastAPI, openapi_url: str) -> OpenAPIDocument:
+    """
+    Add the OpenAPI, Swagger UI and ReDoc routes to an app created with
+    ``openapi_url=None``.
+    """
+    document = OpenAPIDocument(app)
+    app.openapi_url = openapi_url
+
+    async def openapi(request: Request) -> Response:
+        return document.response(request)
+
+    async def swagger_ui_html(_request: Request) -> Response:
+        return get_swagger_ui_html(
+            openapi_url=openapi_url, title=f"{app.title} - Swagger UI"
+        )
+
+    async def redoc_html(_request: Request) -> Response:
+        return get_redoc_html(openapi_url=openapi_url, title=f"{app.title} - ReDoc")
+
+    app.add_route(openapi_url, openapi, include_in_schema=False)
+    app.add_route("/docs", swagger_ui_html, include_in_schema=False)
+    app.add_route("/redoc", redoc_html, include_in_schema=False)
+    return document
+
+
+def main() -> None:
+    from app.main import app
+
+    stored = {"fingerprint": fingerprint(app), "document": app.openapi()}
+    OPENAPI_PATH.write_bytes(orjson.dumps(stored))
+    logger.info("Wrote %s", OPENAPI_PATH)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,175 @@
+"""
+Role-based permissions.
+
+A user's effective permissions are those of their role (the ``role`` table)
+plus the user's own ``permissions`` minus their ``denied_permissions``.
+Roles are read into a process-local cache and each distinct combination of
+role and overrides is computed once, so an authorization check is a set
+lookup. Changing what a role may do is an update of its one row: a trigger
+bumps the role's version and publishes it on ``role_changed``, and every
+worker drops its cached roles (see app/core/cache.py for the listener).
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Iterable, Sequence
+from typing import NamedTuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Channel the role table trigger publishes to, see the
+# "add_role_and_permission_tables" migration.
+ROLE_CHANGED_CHANNEL = "role_changed"
+
+# Grants every permission, including ones added later.
+ALL = "*"
+COHORTS_READ = "cohorts:read"
+DOCUMENT_READ = "document:read"
+USERS_ADMIN = "users:admin"
+
+# Memoized effective sets kept at most; there is one per distinct
+# combination of role and overrides, so normally only a handful.
+MAX_EFFECTIVE_SETS = 4096
+
+
+class RoleEntry(NamedTuple):
+    version: int
+    permissions: frozenset[str]
+
+
+def effective_permissions(
+    role_permissions: frozenset[str],
+    granted: Iterable[str] = (),
+    denied: Iterable[str] = (),
+) -> frozenset[str]:
+    return (role_permissions | frozenset(granted)) - frozenset(denied)
+
+
+def has_permissions(permissions: frozenset[str], required: Iterable[str]) -> bool:
+    return ALL in permissions or permissions.issuperset(required)
+
+
+class Principal:
+    """
+    The user a request is authenticated as: what authorization needs and
+    nothing else. Built from the user cache or a few columns rather than an
+    ORM instance, so creating one per request is cheap and it holds no
+    session state. Handlers that need the full row load it themselves.
+    """
+
+    __slots__ = ("id", "email", "role", "permissions", "is_active", "is_verified")
+
+    def __init__(
+        self,
+        *,
+        id: uuid.UUID,
+        email: str,
+        role: str,
+        permissions: frozenset[str],
+        is_active: bool,
+        is_verified: bool,
+    ) -> None:
+        self.id = id
+        self.email = email
+        self.role = role
+        self.permissions = permissions
+        self.is_active = is_active
+        self.is_verified = is_verified
+
+    def has_permissions(self, required: Iterable[str]) -> bool:
+        return has_permissions(self.permissions, required)
+
+    def __repr__(self) -> str:
+        return f"Principal(id={self.id!r}, email={self.email!r}, role={self.role!r})"
+
+
+class RoleCache:
+    """
+    Process-local copy of the role table and memoized effective permission
+    sets. The roles are loaded together (there are only a few) and dropped
+    together whenever one of them changes.
+
+    Like the user cache, the roles are trusted indefinitely only while
+    ``enabled`` is set by the ``role_changed`` listener; without it they are
+    reloaded after ``ttl`` seconds. ``generation`` changes on every
+    invalidation, and ``load`` keeps nothing read before the latest one.
+    """
+
+    def __init__(self, *, ttl: float) -> None:
+        self.ttl = ttl
+        self.generation = 0
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._roles: dict[str, RoleEntry] | None = None
+        self._loaded_at = 0.0
+        self._effective: dict[
+            tuple[str, tuple[str, ...], tuple[str, ...]], frozenset[str]
+        ] = {}
+
+    def lookup(
+        self, role: str, granted: Sequence[str] = (), denied: Sequence[str] = ()
+    ) -> frozenset[str] | None:
+        """
+        Effective permissions for ``role`` with the given overrides, or None
+        if the roles need to be (re)loaded first.
+        """
+        key = (role, tuple(granted), tuple(denied))
+        with self._lock:
+            if self._roles is None or (
+                not self.enabled and time.monotonic() - self._loaded_at > self.ttl
+            ):
+                return None
+            permissions = self._effective.get(key)
+            if permissions is None:
+                entry = self._roles.get(role)
+                permissions = effective_permissions(
+                    entry.permissions if entry else frozenset(), granted, denied
+                )
+                if len(self._effective) >= MAX_EFFECTIVE_SETS:
+                    self._effective.clear()
+                self._effective[key] = permissions
+            return permissions
+
+    def load(
+        self, rows: Iterable[tuple[str, int, Sequence[str]]], generation: int
+    ) -> dict[str, RoleEntry]:
+        """
+        Replace the cached roles with ``rows`` of (name, version,
+        permissions), unless they were invalidated since ``generation`` was
+        read. Returns the roles either way.
+        """
+        roles = {
+            name: RoleEntry(version, frozenset(permissions))
+            for name, version, permissions in rows
+        }
+        with self._lock:
+            if generation == self.generation:
+                self._roles = roles
+                self._loaded_at = time.monotonic()
+                self._effective.clear()
+        return roles
+
+    def clear(self, *, enabled: bool | None = None) -> None:
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            self.generation += 1
+            self._roles = None
+            self._effective.clear()
+
+
+role_cache = RoleCache(ttl=settings.ROLE_CACHE_TTL_SECONDS)
+
+
+def handle_role_changed(payload: str) -> None:
+    try:
+        data = json.loads(payload)
+        logger.info("Role %s changed (version %s)", data["name"], data["version"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning("Malformed %s payload: %r", ROLE_CHANGED_CHANNEL, payload)
+    role_cache.clear()
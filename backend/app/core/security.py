@@ -5,10 +5,15 @@ from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.keyring import keyring
+from app.core.metrics import PASSWORD_HASH_DURATION, timed
+from app.core.tracing import span
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-ALGORITHM = "HS256"
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 
 
 def create_access_token(
@@ -21,38 +26,43 @@ def create_access_token(
     to_encode = {"exp": expire, "sub": str(subject)}
     if additional_claims:
         to_encode.update(additional_claims)
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    return keyring.encode(to_encode)
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    """
+    Verified claims of a token issued by this service. Raises
+    ``jwt.JWTError`` if it is invalid or expired.
+    """
+    return keyring.decode(token)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifies a plain password against a hashed password.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    with timed(PASSWORD_HASH_DURATION, "verify"), span("password.verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """
     Hashes a plain password.
     """
-    return pwd_context.hash(password)
+    with timed(PASSWORD_HASH_DURATION, "hash"), span("password.hash"):
+        return pwd_context.hash(password)
 
 
-def generate_email_verification_token(email: str) -> str:
+def generate_email_verification_token(
+    email: str, issued_at: datetime | None = None
+) -> str:
     """
-    Generates a JWT for email verification.
+    Generates a JWT for email verification. The same ``issued_at`` always
+    gives the same token.
     """
-    delta = timedelta(hours=settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS)
-    now = datetime.now(timezone.utc)
-    expires = now + delta
-    exp = expires.timestamp()
-    encoded_jwt = jwt.encode(
-        {"exp": exp, "nbf": now, "sub": email},
-        settings.SECRET_KEY,
-        algorithm="HS256",
-    )
-    return encoded_jwt
+    issued_at = issued_at or datetime.now(timezone.utc)
+    expires = issued_at + timedelta(hours=settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS)
+    return keyring.encode({"exp": expires, "nbf": issued_at, "sub": email})
 
 
 def verify_email_verification_token(token: str) -> str | None:
@@ -60,9 +70,8 @@ def verify_email_verification_token(token: str) -> str | None:
     Verifies an email verification token.
     """
     try:
-        decoded_token = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=["HS256"]
-        )
+        with span("jwt.decode", "email verification token"):
+            decoded_token = keyring.decode(token)
         return decoded_token["sub"]
     except jwt.JWTError:
         return None
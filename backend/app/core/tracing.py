@@ -0,0 +1,124 @@
+"""
+Sentry error reporting and performance tracing.
+
+The FastAPI/Starlette integrations start a transaction per request and the
+SQLAlchemy integration adds a span per statement. ``span`` marks the other
+slow parts of a request (bcrypt, JWT decoding, email), and ``traced`` carries
+the request's trace into work that runs after the response is sent.
+
+Without ``SENTRY_DSN`` nothing is initialized and ``span`` costs one
+function call and a no-op context manager.
+"""
+
+import functools
+import inspect
+import logging
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, ParamSpec, TypeVar
+
+import sentry_sdk
+from sentry_sdk.integrations.fastapi import FastApiIntegration
+from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+from sentry_sdk.integrations.starlette import StarletteIntegration
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Probes and scrapes arrive every few seconds and would drown real traffic.
+UNTRACED_PATHS = ("/metrics", f"{settings.API_V1_STR}/health")
+
+
+def traces_sampler(sampling_context: dict[str, Any]) -> float:
+    parent_sampled = sampling_context.get("parent_sampled")
+    if parent_sampled is not None:
+        # Keep traces whole across services and background jobs.
+        return float(parent_sampled)
+    scope = sampling_context.get("asgi_scope") or {}
+    if scope.get("path", "").startswith(UNTRACED_PATHS):
+        return 0.0
+    return settings.SENTRY_TRACES_SAMPLE_RATE
+
+
+def init_sentry(**options: Any) -> bool:
+    """
+    Initialize the SDK if a DSN is configured. Keyword arguments override the
+    defaults; tests pass ``dsn`` and ``transport`` to capture envelopes locally.
+    """
+    dsn = options.pop("dsn", None) or settings.SENTRY_DSN
+    if not dsn:
+        return False
+    sentry_sdk.init(
+        **{
+            "dsn": str(dsn),
+            "environment": settings.ENVIRONMENT,
+            "traces_sampler": traces_sampler,
+            "profiles_sample_rate": settings.SENTRY_PROFILES_SAMPLE_RATE,
+            "integrations": [
+                StarletteIntegration(),
+                FastApiIntegration(),
+                SqlalchemyIntegration(),
+            ],
+            **options,
+        }
+    )
+    logger.info("Sentry initialized for %s", settings.ENVIRONMENT)
+    return True
+
+
+@contextmanager
+def span(op: str, name: str | None = None, **data: Any) -> Iterator[None]:
+    """
+    Record the block as a child span of the current transaction, if any.
+    """
+    if sentry_sdk.get_current_span() is None:
+        yield
+        return
+    with sentry_sdk.start_span(op=op, name=name or op) as current:
+        for key, value in data.items():
+            current.set_data(key, value)
+        yield
+
+
+def traced(func: Callable[P, R], op: str = "task") -> Callable[P, R]:
+    """
+    Wrap a function that will run later, e.g. as a FastAPI background task,
+    so it runs in its own transaction continuing the current trace. Must be
+    called while the request is still being handled. Works for sync and
+    async functions.
+    """
+    headers = {
+        "sentry-trace": sentry_sdk.get_traceparent(),
+        "baggage": sentry_sdk.get_baggage(),
+    }
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @contextmanager
+    def transaction() -> Iterator[None]:
+        continued = sentry_sdk.continue_trace(
+            {key: value for key, value in headers.items() if value},
+            op=op,
+            name=name,
+        )
+        with sentry_sdk.isolation_scope(), sentry_sdk.start_transaction(continued):
+            yield
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+            with transaction():
+                return await func(*args, **kwargs)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        with transaction():
+            return func(*args, **kwargs)
+
+    return wrapper
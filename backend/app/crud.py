@@ -1,10 +1,39 @@
-from sqlmodel import Session, select
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import cast
+
+from sqlalchemy import RowMapping, case
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import QueryableAttribute, make_transient_to_detached, undefer
+from sqlmodel import Session, col, select
 import re
 
+from app.core.cache import CACHED_COLUMNS, user_cache
+from app.core.cohorts import cohort_size
+from app.core.config import settings
+from app.core.db import release_connection
+from app.core.permissions import Principal, effective_permissions, role_cache
 from app.core.security import get_password_hash, verify_password
-from app.models import User
+from app.models import EmailVerification, Permission, Role, User
+from app.schemas import User as UserPublic
 from app.schemas import UserCreate, UserUpdate
 
+# Columns exposed by schemas.User, for read paths that serialize rows
+# directly instead of building ORM objects and Pydantic models.
+USER_PUBLIC_COLUMNS = [getattr(User, name) for name in UserPublic.model_fields]
+# Columns a Principal is built from, and those the user cache keeps.
+PRINCIPAL_COLUMNS = [
+    User.id,
+    User.email,
+    User.role,
+    User.permissions,
+    User.denied_permissions,
+    User.is_active,
+    User.is_verified,
+]
+USER_CACHE_COLUMNS = [getattr(User, name) for name in CACHED_COLUMNS]
+
 
 def get_user_by_email(*, session: Session, email: str) -> User | None:
     """
@@ -14,6 +43,117 @@ def get_user_by_email(*, session: Session, email: str) -> User | None:
     return session.exec(statement).first()
 
 
+def get_user_row(*, session: Session, user_id: uuid.UUID) -> RowMapping | None:
+    """
+    Public columns of a single user as a mapping.
+    """
+    statement = select(*USER_PUBLIC_COLUMNS).where(User.id == user_id)
+    row: RowMapping | None = session.exec(statement).mappings().first()
+    return row
+
+
+def get_user_rows(
+    *, session: Session, skip: int = 0, limit: int = 100
+) -> Sequence[RowMapping]:
+    """
+    Public columns of a page of users as mappings, in a stable order.
+    """
+    statement = select(*USER_PUBLIC_COLUMNS).order_by(User.id).offset(skip).limit(limit)
+    rows: Sequence[RowMapping] = session.exec(statement).mappings().all()
+    return rows
+
+
+def get_cohort_sizes(
+    *, session: Session, major: str | None = None
+) -> Sequence[RowMapping]:
+    """
+    Sizes of all cohorts, or those of one major, from the cohort_size view.
+    """
+    statement = select(*cohort_size.c).order_by(
+        cohort_size.c.major, cohort_size.c.class_
+    )
+    if major is not None:
+        statement = statement.where(cohort_size.c.major == major)
+    rows: Sequence[RowMapping] = session.exec(statement).mappings().all()
+    return rows
+
+
+def get_cohort_member_rows(
+    *,
+    session: Session,
+    major: str,
+    class_: str,
+    after: uuid.UUID | None = None,
+    limit: int = 100,
+) -> Sequence[RowMapping]:
+    """
+    Public columns of active users in a cohort, in id order, starting after
+    the id ``after``. Each page is a range of the (major, class_, id) index.
+    """
+    statement = (
+        select(*USER_PUBLIC_COLUMNS)
+        .where(User.major == major, User.class_ == class_, User.is_active)
+        .order_by(User.id)
+        .limit(limit)
+    )
+    if after is not None:
+        statement = statement.where(User.id > after)
+    rows: Sequence[RowMapping] = session.exec(statement).mappings().all()
+    return rows
+
+
+def get_user_by_email_cached(*, session: Session, email: str) -> User | None:
+    """
+    Like get_user_by_email, but served from the process-local user cache when
+    possible. A cache hit is attached to the session without a query, so it
+    can still be modified and committed as usual.
+    """
+    values = user_cache.get_by_email(email)
+    if values is not None:
+        cached = User(**values)
+        make_transient_to_detached(cached)
+        session.add(cached)
+        return cached
+
+    generation = user_cache.generation
+    user = get_user_by_email(session=session, email=email)
+    if user:
+        user_cache.put(user_cache.snapshot(user), generation)
+    return user
+
+
+def get_principal(*, session: Session, email: str) -> Principal | None:
+    """
+    The user with this email as a Principal, with their effective
+    permissions. Served from the user cache when possible; otherwise only
+    the columns needed are read, as a row, without building an ORM instance.
+    While the cache is enabled the columns it keeps are read and cached.
+    """
+    values = user_cache.get_by_email(email)
+    if values is None:
+        generation = user_cache.generation
+        columns = USER_CACHE_COLUMNS if user_cache.enabled else PRINCIPAL_COLUMNS
+        statement = select(*columns).where(User.email == email)
+        row = session.exec(statement).mappings().first()
+        if row is None:
+            return None
+        values = dict(row)
+        user_cache.put(values, generation)
+    return Principal(
+        id=values["id"],
+        email=values["email"],
+        role=values["role"],
+        permissions=get_permissions(
+            session=session,
+            role=values["role"],
+            granted=values["permissions"],
+            denied=values["denied_permissions"],
+        ),
+        is_active=values["is_active"],
+        is_verified=values["is_verified"],
+    )
+
+
 def create_user(*, session: Session, user_in: UserCreate) -> User:
     """
     Create a new user in the database.
@@ -48,14 +188,15 @@ def create_user(*, session: Session, user_in: UserCreate) -> User:
                     user_data["id_troy"] = id_troy
                     break
     
-    # Hash the password and add it to the user data
+    # Hash the password and add it to the user data. The id_troy lookups above
+    # are done, so give the connection back before spending time in bcrypt.
+    release_connection(session)
     user_data["hashed_password"] = get_password_hash(user_in.password)
     
     db_user = User(**user_data)
     
     session.add(db_user)
     session.commit()
-    session.refresh(db_user)
     return db_user
 
 
@@ -65,6 +206,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> User
     """
     user_data = user_in.model_dump(exclude_unset=True)
     if "password" in user_data and user_data["password"]:
+        release_connection(session)
         hashed_password = get_password_hash(user_data["password"])
         del user_data["password"]
         user_data["hashed_password"] = hashed_password
@@ -74,7 +216,9 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> User
         
     session.add(db_user)
     session.commit()
-    session.refresh(db_user)
+    # Other workers are notified by the user table trigger; drop our own
+    # copy right away so this process never serves the old row.
+    user_cache.invalidate(user_id=db_user.id, emails=(db_user.email,))
     return db_user
 
 
@@ -83,9 +227,119 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     Authenticate a user by email and password.
     Returns the user object if authentication is successful, otherwise None.
     """
-    db_user = get_user_by_email(session=session, email=email)
+    # Declared as a plain str on the model; mapped as a deferred column.
+    hashed_password_column = cast(QueryableAttribute[str], User.hashed_password)
+    statement = (
+        select(User).where(User.email == email).options(undefer(hashed_password_column))
+    )
+    db_user = session.exec(statement).first()
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    # Read before releasing: a session that expires on commit would load it
+    # again afterwards.
+    hashed_password = db_user.hashed_password
+    release_connection(session)
+    if not verify_password(password, hashed_password):
         return None
     return db_user
+
+
+def get_permissions(
+    *,
+    session: Session,
+    role: str,
+    granted: Sequence[str] = (),
+    denied: Sequence[str] = (),
+) -> frozenset[str]:
+    """
+    Effective permissions of a user: their role's, plus their own grants,
+    minus their denials. Served from the role cache, which is (re)loaded with
+    one query when needed.
+    """
+    permissions = role_cache.lookup(role, granted, denied)
+    if permissions is not None:
+        return permissions
+    generation = role_cache.generation
+    rows = session.exec(select(Role.name, Role.version, Role.permissions)).all()
+    entry = role_cache.load(rows, generation).get(role)
+    return effective_permissions(
+        entry.permissions if entry else frozenset(), granted, denied
+    )
+
+
+def get_roles(*, session: Session) -> Sequence[Role]:
+    return session.exec(select(Role).order_by(Role.name)).all()
+
+
+def get_unknown_permissions(
+    *, session: Session, permissions: Sequence[str]
+) -> set[str]:
+    """
+    The entries of ``permissions`` missing from the permission table.
+    """
+    known = session.exec(
+        select(Permission.name).where(col(Permission.name).in_(permissions))
+    ).all()
+    return set(permissions) - set(known)
+
+
+def update_role_permissions(
+    *, session: Session, name: str, permissions: Sequence[str]
+) -> Role | None:
+    """
+    Replace what a role may do. This is an update of the role's row only; its
+    version is bumped by a trigger, and every worker reloads the roles when
+    the change is committed. Returns None if there is no such role.
+    """
+    role = session.get(Role, name)
+    if role is None:
+        return None
+    role.permissions = sorted(set(permissions))
+    session.add(role)
+    session.commit()
+    session.refresh(role)
+    # Like update_user: don't wait for our own notification.
+    role_cache.clear()
+    return role
+
+
+def claim_verification_email(
+    *, session: Session, user_id: uuid.UUID, now: datetime | None = None
+) -> datetime | None:
+    """
+    Record that a verification email is about to be sent to the user, unless
+    one was already sent in the last EMAIL_VERIFICATION_COOLDOWN_SECONDS.
+
+    Returns the issue time of the token to send: the previous one while it
+    stays valid for EMAIL_VERIFICATION_MIN_VALIDITY_HOURS more, else ``now``.
+    Returns None if the request is coalesced with the recent one. The check
+    and the update are one statement, so concurrent requests on any worker
+    send at most one email.
+    """
+    now = (now or datetime.now(timezone.utc)).replace(microsecond=0)
+    cooldown_start = now - timedelta(
+        seconds=settings.EMAIL_VERIFICATION_COOLDOWN_SECONDS
+    )
+    reissue_before = now - timedelta(
+        hours=settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS
+        - settings.EMAIL_VERIFICATION_MIN_VALIDITY_HOURS
+    )
+    statement = (
+        insert(EmailVerification)
+        .values(user_id=user_id, issued_at=now, sent_at=now)
+        .on_conflict_do_update(
+            index_elements=[col(EmailVerification.user_id)],
+            set_={
+                "sent_at": now,
+                "issued_at": case(
+                    (col(EmailVerification.issued_at) < reissue_before, now),
+                    else_=col(EmailVerification.issued_at),
+                ),
+            },
+            where=col(EmailVerification.sent_at) <= cooldown_start,
+        )
+        .returning(col(EmailVerification.issued_at))
+    )
+    issued_at: datetime | None = session.exec(statement).scalar_one_or_none()
+    session.commit()
+    return issued_at
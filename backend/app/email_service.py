@@ -1,133 +1,330 @@
+"""
+Outgoing email: one interface over SMTP, Resend and local sinks.
+
+``send_email`` hands a message to the transport picked by the settings (see
+``Settings.email_transport``). The provider call runs in a worker thread;
+transient failures are retried with exponential backoff and jitter, and a
+circuit breaker per transport stops calling a provider that keeps failing
+until ``EMAIL_BREAKER_RESET_SECONDS`` have passed, after which a single
+trial send decides whether it is healthy again. Only transient failures count
+towards opening it: a refused recipient or a rejected message means the
+provider is answering, and must not stop mail to everyone else.
+"""
+
 import logging
+import random
+import smtplib
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from email.message import EmailMessage as MIMEMessage
+from enum import IntEnum
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
 
-import resend
-from jinja2 import Template
+import anyio
+import anyio.to_thread
 
 from app.core.config import settings
+from app.core.metrics import EMAIL_BREAKER_STATE, EMAIL_SEND_DURATION
+from app.core.tracing import span
 
+logger = logging.getLogger(__name__)
 
-class EmailService:
-    def __init__(self):
-        self.resend_api_key = settings.RESEND_API_KEY
-        if self.resend_api_key:
-            resend.api_key = self.resend_api_key
-    
-    def send_email(
-        self,
-        email_to: str,
-        subject: str,
-        html_content: str,
-        from_email: str = None,
-        from_name: str = None,
-    ) -> bool:
-        """
-        Send email using Resend service.
-        """
-        if not self.resend_api_key:
-            logging.warning("RESEND_API_KEY not configured, skipping email send")
-            return False
-        
+
+class EmailError(Exception):
+    def __init__(self, message: str, *, transient: bool = True) -> None:
+        super().__init__(message)
+        self.transient = transient
+
+
+class EmailUnavailableError(EmailError):
+    """
+    The transport's circuit breaker is open; nothing was attempted.
+    """
+
+    def __init__(self, transport: str) -> None:
+        super().__init__(
+            f"Email transport {transport!r} is failing, not trying for now",
+            transient=True,
+        )
+
+
+@dataclass(frozen=True)
+class EmailMessage:
+    to: str
+    subject: str
+    html: str
+
+    def to_mime(self) -> MIMEMessage:
+        mime = MIMEMessage()
+        mime["From"] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
+        mime["To"] = self.to
+        mime["Subject"] = self.subject
+        mime.set_content(self.html, subtype="html")
+        return mime
+
+
+class EmailTransport(ABC):
+    """
+    Delivers one message, blocking. Raises ``EmailError`` on failure.
+    """
+
+    name: str
+
+    @abstractmethod
+    def send(self, message: EmailMessage) -> None: ...
+
+
+class SMTPTransport(EmailTransport):
+    name = "smtp"
+
+    def send(self, message: EmailMessage) -> None:
+        assert settings.SMTP_HOST, "SMTP_HOST is not set"
+        smtp_class = smtplib.SMTP_SSL if settings.SMTP_SSL else smtplib.SMTP
         try:
-            from_email = from_email or settings.EMAILS_FROM_EMAIL
-            from_name = from_name or settings.EMAILS_FROM_NAME
-            
-            params = {
-                "from": f"{from_name} <{from_email}>",
-                "to": [email_to],
-                "subject": subject,
-                "html": html_content,
-            }
-            
-            response = resend.Emails.send(params)
-            logging.info(f"Email sent successfully: {response}")
-            return True
-            
-        except Exception as e:
-            logging.error(f"Failed to send email: {e}")
-            return False
-    
-    def send_verification_email(self, email_to: str, username: str, token: str) -> bool:
-        """
-        Send verification email to new user.
-        """
-        subject = f"{settings.PROJECT_NAME} - Verify Your Account"
-        
-        # Create verification link
-        verification_url = f"{settings.SERVER_HOST}/api/v1/verify-email?token={token}"
-        
-        # Simple HTML template (you can enhance this)
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Verify Your Account</title>
-        </head>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #007bff;">Welcome to {settings.PROJECT_NAME}, {username}!</h2>
-                
-                <p>Thank you for registering. To complete your registration and verify your email address, please click the button below.</p>
-                
-                <p>This link is valid for {settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS} hours.</p>
-                
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="{verification_url}" 
-                       style="background-color: #007bff; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">
-                        Verify Your Account
-                    </a>
-                </div>
-                
-                <p>If you did not create an account, no further action is required.</p>
-                
-                <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
-                
-                <p style="font-size: 14px; color: #666;">
-                    If you're having trouble clicking the button, copy and paste the URL below into your web browser:
-                </p>
-                <p style="font-size: 14px; color: #666; word-break: break-all;">
-                    <a href="{verification_url}">{verification_url}</a>
-                </p>
-            </div>
-        </body>
-        </html>
+            with smtp_class(
+                settings.SMTP_HOST, settings.SMTP_PORT, timeout=10
+            ) as connection:
+                if settings.SMTP_TLS and not settings.SMTP_SSL:
+                    connection.starttls()
+                if settings.SMTP_USER and settings.SMTP_PASSWORD:
+                    connection.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+                connection.send_message(message.to_mime())
+        except smtplib.SMTPResponseException as e:
+            # 4xx replies are temporary, 5xx ones are not worth retrying.
+            raise EmailError(
+                f"SMTP {e.smtp_code}: {e.smtp_error!r}", transient=e.smtp_code < 500
+            ) from e
+        except smtplib.SMTPRecipientsRefused as e:
+            raise EmailError(f"Recipient refused: {e}", transient=False) from e
+        except (smtplib.SMTPException, OSError) as e:
+            raise EmailError(f"SMTP: {e}") from e
+
+
+class ResendTransport(EmailTransport):
+    name = "resend"
+
+    def __init__(self) -> None:
+        import resend
+
+        resend.api_key = settings.RESEND_API_KEY
+
+    def send(self, message: EmailMessage) -> None:
+        import resend
+
+        params: resend.Emails.SendParams = {
+            "from": f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>",
+            "to": [message.to],
+            "subject": message.subject,
+            "html": message.html,
+        }
+        try:
+            resend.Emails.send(params)
+        except resend.exceptions.ResendError as e:
+            code = int(e.code) if str(e.code).isdigit() else 0
+            raise EmailError(
+                f"Resend {e.code}: {e.message}",
+                transient=code == 429 or code >= 500 or code == 0,
+            ) from e
+        except OSError as e:
+            raise EmailError(f"Resend: {e}") from e
+
+
+class FileTransport(EmailTransport):
+    """
+    Writes each message as an .eml file, for local development.
+    """
+
+    name = "file"
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def send(self, message: EmailMessage) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{time.time_ns()}-{uuid.uuid4().hex[:8]}.eml"
+            path.write_bytes(message.to_mime().as_bytes())
+        except OSError as e:
+            raise EmailError(f"Could not write {self.directory}: {e}") from e
+
+
+class MemoryTransport(EmailTransport):
+    """
+    Keeps sent messages in ``outbox``, for tests.
+    """
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self.outbox: list[EmailMessage] = []
+
+    def send(self, message: EmailMessage) -> None:
+        self.outbox.append(message)
+
+
+class BreakerState(IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_running = False
+        self._gauge = EMAIL_BREAKER_STATE.labels(name)
+        self._gauge.set(BreakerState.CLOSED)
+
+    @property
+    def state(self) -> BreakerState:
+        if self.opened_at is None:
+            return BreakerState.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return BreakerState.OPEN
+        return BreakerState.HALF_OPEN
+
+    def allow(self) -> bool:
         """
-        
-        return self.send_email(email_to, subject, html_content)
-    
-    def send_test_email(self, email_to: str) -> bool:
+        Whether an attempt may go ahead. Once half-open, only one trial at a
+        time is let through.
         """
-        Send test email.
+        state = self.state
+        if state == BreakerState.CLOSED:
+            return True
+        if state == BreakerState.HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            self._gauge.set(BreakerState.HALF_OPEN)
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("Email transport %s recovered", self.name)
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._gauge.set(BreakerState.CLOSED)
+
+    def end_trial(self) -> None:
         """
-        subject = f"{settings.PROJECT_NAME} - Test Email"
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Test Email</title>
-        </head>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #007bff;">Test Email from {settings.PROJECT_NAME}</h2>
-                
-                <p>This is a test email to verify that the email service is working correctly.</p>
-                
-                <p>If you received this email, the email configuration is working properly!</p>
-                
-                <p style="font-size: 14px; color: #666;">
-                    Sent to: {email_to}
-                </p>
-            </div>
-        </body>
-        </html>
+        Let another trial through. A trial that ends without an outcome, e.g.
+        cancelled, would otherwise leave every later attempt refused.
         """
-        
-        return self.send_email(email_to, subject, html_content)
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_running or (
+            self.opened_at is None and self.failures >= self.failure_threshold
+        ):
+            logger.warning(
+                "Email transport %s failing, pausing sends for %.0fs",
+                self.name,
+                self.reset_timeout,
+            )
+            self.opened_at = time.monotonic()
+            self._trial_running = False
+            self._gauge.set(BreakerState.OPEN)
+
+
+class Mailer:
+    def __init__(
+        self,
+        transport: EmailTransport,
+        *,
+        max_attempts: int,
+        backoff: float,
+        breaker: CircuitBreaker,
+    ) -> None:
+        self.transport = transport
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.breaker = breaker
+
+    async def send(self, message: EmailMessage) -> None:
+        name = self.transport.name
+        for attempt in range(1, self.max_attempts + 1):
+            trial = self.breaker.state == BreakerState.HALF_OPEN
+            if not self.breaker.allow():
+                raise EmailUnavailableError(name)
+            started = time.perf_counter()
+            try:
+                with span("email.send", name, attempt=attempt):
+                    await anyio.to_thread.run_sync(self.transport.send, message)
+            except EmailError as e:
+                EMAIL_SEND_DURATION.labels(name, "failure").observe(
+                    time.perf_counter() - started
+                )
+                if not e.transient:
+                    # The provider answered; the problem is this message.
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_attempts:
+                    raise
+                delay = random.uniform(0, self.backoff * 2 ** (attempt - 1))
+                logger.info(
+                    "Email to %s failed (%s), retrying in %.2fs", message.to, e, delay
+                )
+            else:
+                EMAIL_SEND_DURATION.labels(name, "success").observe(
+                    time.perf_counter() - started
+                )
+                self.breaker.record_success()
+                return
+            finally:
+                if trial:
+                    self.breaker.end_trial()
+            await anyio.sleep(delay)
+
+
+def create_transport(name: str) -> EmailTransport:
+    if name == "smtp":
+        return SMTPTransport()
+    if name == "resend":
+        return ResendTransport()
+    if name == "file":
+        return FileTransport(Path(settings.EMAIL_FILE_DIR))
+    if name == "memory":
+        return MemoryTransport()
+    raise ValueError(f"Unknown email transport {name!r}")
+
+
+@lru_cache
+def get_mailer() -> Mailer | None:
+    """
+    Shared Mailer for the configured transport, or None if email is not
+    configured. Created on first use rather than at import.
+    """
+    name = settings.email_transport
+    if name is None:
+        return None
+    return Mailer(
+        create_transport(name),
+        max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+        backoff=settings.EMAIL_RETRY_BACKOFF_SECONDS,
+        breaker=CircuitBreaker(
+            name,
+            failure_threshold=settings.EMAIL_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.EMAIL_BREAKER_RESET_SECONDS,
+        ),
+    )
 
 
-# Global email service instance
-email_service = EmailService() 
\ No newline at end of file
+async def send_email(message: EmailMessage) -> None:
+    """
+    Deliver ``message``, retrying transient failures. Raises ``EmailError``
+    if it could not be delivered.
+    """
+    mailer = get_mailer()
+    if mailer is None:
+        raise EmailError("Email is not configured", transient=False)
+    await mailer.send(message)
+    logger.info("Email %r sent to %s", message.subject, message.to)
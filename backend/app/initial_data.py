@@ -1,12 +1,20 @@
+import logging
+
 from sqlmodel import Session
 
 from app import crud
 from app.core.config import settings
+from app.core.db import engine
 from app.schemas import UserCreate
 # This import is necessary for SQLModel to discover the User model
 # before operations are performed on it.
 from app.models import User
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ADMIN1_EMAIL = "admin1@example.com"
+
 
 def init_db(session: Session) -> None:
     """
@@ -33,7 +41,7 @@ def init_db(session: Session) -> None:
         session.commit()
     
     # Check if the admin1 user already exists.
-    admin1_email = "admin1@example.com"
+    admin1_email = ADMIN1_EMAIL
     admin1_user = crud.get_user_by_email(session=session, email=admin1_email)
     
     # If the admin1 user does not exist, create them.
@@ -51,3 +59,14 @@ def init_db(session: Session) -> None:
         admin1_user.is_verified = True
         session.add(admin1_user)
         session.commit()
+
+
+def main() -> None:
+    logger.info("Creating initial data")
+    with Session(engine) as session:
+        init_db(session)
+    logger.info("Initial data created")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,85 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
+import sentry_sdk
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import logging
+from fastapi.responses import ORJSONResponse
 
 # The obsolete 'items' router has been removed.
-from app.api.routes import login, private, users, utils
+from app.api.routes import cohorts, login, private, users, utils
+from app.core import metrics, openapi
+from app.core.admission import AdmissionControlMiddleware
+from app.core.bulkheads import configure_threadpool
+from app.core.cache import listen_for_user_changes
+from app.core.cohorts import refresh_cohort_sizes_periodically
 from app.core.config import settings
+from app.core.db import engine
+from app.core.keyring import check_worker_count
+from app.core.lifecycle import DrainingMiddleware, lifecycle
+from app.core.tracing import init_sentry
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create the FastAPI app instance
+# Before the app is created, so the integrations can instrument it.
+init_sentry()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # uvicorn --workers defaults to WEB_CONCURRENCY too.
+    check_worker_count(settings, settings.WEB_CONCURRENCY or 1)
+    openapi_document.preload()
+    configure_threadpool()
+    lifecycle.install_signal_handler()
+    # Each worker process keeps its user cache coherent via LISTEN/NOTIFY.
+    listener = asyncio.create_task(listen_for_user_changes())
+    cohort_refresher = asyncio.create_task(refresh_cohort_sizes_periodically())
+    try:
+        yield
+    finally:
+        # The server has stopped accepting connections and drained requests.
+        started = time.monotonic()
+        if lifecycle.exiting_since is not None:
+            logger.info(
+                "Requests drained in %.1f ms",
+                (started - lifecycle.exiting_since) * 1000,
+            )
+        with lifecycle.phase("background tasks"):
+            await lifecycle.wait_for_tasks(settings.SHUTDOWN_CLEANUP_TIMEOUT_SECONDS)
+        with lifecycle.phase("cache listener"):
+            listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await listener
+        with lifecycle.phase("cohort refresher"):
+            cohort_refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await cohort_refresher
+        with lifecycle.phase("sentry"):
+            await anyio.to_thread.run_sync(
+                sentry_sdk.flush, settings.SHUTDOWN_CLEANUP_TIMEOUT_SECONDS
+            )
+        with lifecycle.phase("metrics"):
+            metrics.mark_process_dead()
+        with lifecycle.phase("database"):
+            engine.dispose()
+        logger.info("Shutdown complete in %.1f ms", (time.monotonic() - started) * 1000)
+
+
+# Create the FastAPI app instance. The OpenAPI and docs routes are installed
+# below so the document can be served precomputed, see app/core/openapi.py.
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    openapi_url=None,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Set up CORS middleware - always add it, but configure origins based on environment
@@ -40,6 +106,10 @@ if settings.ENVIRONMENT != "local":
 logger.info(f"CORS Origins: {cors_origins}")
 logger.info(f"Environment: {settings.ENVIRONMENT}")
 
+# Innermost, so rejections still carry CORS headers and show up in metrics.
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -49,12 +119,18 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+app.add_middleware(DrainingMiddleware)
+
+# Outermost, so latency includes the CORS handling too.
+app.add_middleware(metrics.MetricsMiddleware)
+
 api_router = APIRouter()
 
 # Include only the necessary and active routers for the application.
 api_router.include_router(login.router, prefix="/api/v1")
 api_router.include_router(users.router, prefix="/api/v1")
 api_router.include_router(utils.router, prefix="/api/v1")
+api_router.include_router(cohorts.router, prefix="/api/v1")
 
 # Conditionally include the 'private' router for local development environments.
 if settings.ENVIRONMENT == "local":
@@ -62,3 +138,7 @@ if settings.ENVIRONMENT == "local":
 
 # Include the API router in the main app
 app.include_router(api_router)
+
+openapi_document = openapi.install(app, f"{settings.API_V1_STR}/openapi.json")
+
+app.add_route("/metrics", metrics.metrics_endpoint, include_in_schema=False)
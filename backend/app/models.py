@@ -1,27 +1,88 @@
 import uuid
-from typing import List
+from datetime import datetime
 
-from sqlalchemy import ARRAY, Column, String
-from sqlmodel import Field, SQLModel
+from sqlalchemy import ARRAY, Column, DateTime, Index, String, text
+from sqlalchemy.orm import deferred
+from sqlmodel import AutoString, Field, SQLModel
+
+from app.core.ids import uuid7
+
+# Only crud.authenticate needs the password hash, and it asks for it with
+# undefer(); everywhere else it is loaded on first access, if ever.
+_hashed_password = Column("hashed_password", AutoString, nullable=False)
 
 
 class User(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # Cohort lookups (app/core/cohorts.py) and their pages, in id order.
+    __table_args__ = (Index("ix_user_major_class_id", "major", "class_", "id"),)
+    __mapper_args__ = {"properties": {"hashed_password": deferred(_hashed_password)}}
+
+    # Time-ordered, so new rows are appended to the primary key index; the
+    # server default covers rows inserted outside the ORM. See app/core/ids.py.
+    id: uuid.UUID = Field(
+        default_factory=uuid7,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("uuid_generate_v7()")},
+    )
     id_troy: str = Field(unique=True, index=True, nullable=False)
     name: str = Field(index=True, nullable=False)
     email: str = Field(unique=True, index=True, nullable=False)
-    hashed_password: str = Field(nullable=False)
+    hashed_password: str = Field(sa_column=_hashed_password)
     major: str | None = Field(default=None)
     class_: str | None = Field(default=None, alias="class")
 
-    # Role definition: 'user', 'admin1', 'admin2'
-    role: str = Field(default="user", nullable=False)
+    # One of the rows in the role table: 'user', 'admin1', 'admin2'
+    role: str = Field(default="user", foreign_key="role.name", nullable=False)
 
-    # Granular permissions
-    permissions: List[str] = Field(
+    # Per-user overrides of the role's permissions, see app/core/permissions.py
+    permissions: list[str] = Field(
+        sa_column=Column(ARRAY(String), nullable=False, server_default="{}"),
+        default_factory=list,
+    )
+    denied_permissions: list[str] = Field(
         sa_column=Column(ARRAY(String), nullable=False, server_default="{}"),
         default_factory=list,
     )
 
     is_active: bool = Field(default=True)
     is_verified: bool = Field(default=False)
+
+
+class Permission(SQLModel, table=True):
+    """
+    A permission that can be granted to roles and users.
+    """
+
+    name: str = Field(primary_key=True, max_length=64)
+    description: str = Field(default="", nullable=False)
+
+
+class Role(SQLModel, table=True):
+    """
+    A named set of permissions. ``version`` is bumped by a trigger whenever
+    the row changes, which also tells every worker to reload the roles.
+    """
+
+    name: str = Field(primary_key=True, max_length=64)
+    permissions: list[str] = Field(
+        sa_column=Column(ARRAY(String), nullable=False, server_default="{}"),
+        default_factory=list,
+    )
+    version: int = Field(
+        default=1, nullable=False, sa_column_kwargs={"server_default": "1"}
+    )
+
+
+class EmailVerification(SQLModel, table=True):
+    """
+    The verification token last emailed to a user, by issue time, and when it
+    was sent. See crud.claim_verification_email.
+    """
+
+    __tablename__ = "email_verification"
+
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    issued_at: datetime = Field(sa_type=DateTime(timezone=True), nullable=False)
+    sent_at: datetime = Field(sa_type=DateTime(timezone=True), nullable=False)
@@ -1,5 +1,6 @@
 import uuid
-from typing import List
+from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel, EmailStr
 
@@ -31,7 +32,7 @@ class UserInDBBase(BaseModel):
     major: str | None = None
     class_: str | None = None
     role: str
-    permissions: List[str]
+    permissions: list[str]
     is_active: bool
     is_verified: bool
 
@@ -44,6 +45,32 @@ class User(UserInDBBase):
     pass
 
 
+class Role(BaseModel):
+    name: str
+    permissions: list[str]
+    version: int
+
+    class Config:
+        from_attributes = True
+
+
+class RoleUpdate(BaseModel):
+    permissions: list[str]
+
+
+class CohortSize(BaseModel):
+    major: str | None
+    class_: str | None
+    members: int
+    verified: int
+    # When the sizes were last computed.
+    refreshed_at: datetime
+
+
+class VerificationRequest(BaseModel):
+    email: EmailStr
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -55,3 +82,16 @@ class TokenPayload(BaseModel):
 
 class Message(BaseModel):
     message: str
+
+
+class ProbeResult(BaseModel):
+    ok: bool
+    critical: bool = True
+    latency_ms: float
+    error: str | None = None
+    details: dict[str, Any] = {}
+
+
+class HealthStatus(BaseModel):
+    status: str
+    probes: dict[str, ProbeResult] = {}
@@ -0,0 +1,190 @@
+"""
+Production server: gunicorn managing uvicorn workers, sized to the container.
+
+The worker count follows the CPU quota and memory limit of the container's
+cgroup rather than the host's CPU count, which inside a container usually
+overstates what the process may use. The application is imported once in
+the master before forking, so workers start fast and share the imported
+code's memory pages. Each worker is recycled after ``WEB_MAX_REQUESTS``
+requests (plus jitter, so they don't all restart together). ``SIGHUP``
+replaces the workers gracefully, without dropping connections, and re-reads
+the server options (worker count, keep-alive, ...) from the environment; the
+application itself, and with it every other setting, stays as the master
+imported it, so changing those needs a restart. Stopping workers drains them
+first, see app/core/lifecycle.py.
+
+    python -m app.server
+"""
+
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Any
+
+from gunicorn.app.base import BaseApplication  # type: ignore[import-untyped]
+from uvicorn_worker import UvicornWorker  # type: ignore[import-untyped]
+
+from app.core.config import Settings
+from app.core.keyring import check_worker_count
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+# cgroup v1 reports "no limit" as a huge page-aligned number.
+UNLIMITED_MEMORY = 1 << 60
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> float | None:
+    """
+    CPUs allowed by the cgroup's CFS quota, or None without a quota.
+    """
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = _read(root / "cpu.max")
+    if cpu_max is not None:
+        quota, _, period = cpu_max.partition(" ")
+        if quota == "max":
+            return None
+        return int(quota) / int(period or 100_000)
+    # cgroup v1
+    quota_us = _read(root / "cpu" / "cpu.cfs_quota_us") or _read(
+        root / "cpu.cfs_quota_us"
+    )
+    period_us = _read(root / "cpu" / "cpu.cfs_period_us") or _read(
+        root / "cpu.cfs_period_us"
+    )
+    if quota_us is None or period_us is None or int(quota_us) <= 0:
+        return None
+    return int(quota_us) / int(period_us)
+
+
+def cgroup_memory_limit(root: Path = CGROUP_ROOT) -> int | None:
+    """
+    Memory limit of the cgroup in bytes, or None without a limit.
+    """
+    value = _read(root / "memory.max") or _read(
+        root / "memory" / "memory.limit_in_bytes"
+    )
+    if value is None or value == "max" or int(value) >= UNLIMITED_MEMORY:
+        return None
+    return int(value)
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> float:
+    cpus = float(
+        len(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else os.cpu_count() or 1
+    )
+    quota = cgroup_cpu_limit(root)
+    return min(cpus, quota) if quota is not None else cpus
+
+
+def worker_count(settings: Settings, cpus: float, memory_bytes: int | None) -> int:
+    """
+    ``WEB_CONCURRENCY`` if set; otherwise ``WEB_WORKERS_PER_CORE`` per CPU,
+    no more than fit in the memory limit and at most ``WEB_MAX_WORKERS``.
+    """
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+    workers = math.ceil(cpus * settings.WEB_WORKERS_PER_CORE)
+    if memory_bytes is not None:
+        workers = min(workers, memory_bytes // (settings.WEB_WORKER_MEMORY_MB << 20))
+    return max(1, min(workers, settings.WEB_MAX_WORKERS))
+
+
+def _post_fork(_server: Any, _worker: Any) -> None:
+    # Connections opened in the master must not be shared with the workers.
+    from app.core.db import engine
+
+    engine.dispose(close=False)
+
+
+def _child_exit(_server: Any, worker: Any) -> None:
+    # Drop the exited worker's live gauges, including after a crash.
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)  # type: ignore[no-untyped-call]
+
+
+def request_drain_timeout(settings: Settings) -> float:
+    """
+    How long uvicorn waits for in-flight requests on shutdown: what remains
+    of the graceful timeout after the drain delay and the cleanup budget, so
+    the lifespan shutdown still runs before gunicorn kills the worker.
+    """
+    return max(
+        settings.WEB_GRACEFUL_TIMEOUT_SECONDS
+        - settings.SHUTDOWN_DRAIN_DELAY_SECONDS
+        - settings.SHUTDOWN_CLEANUP_TIMEOUT_SECONDS,
+        1.0,
+    )
+
+
+class Worker(UvicornWorker):  # type: ignore[misc]
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        from app.core.config import settings
+
+        self.config.timeout_graceful_shutdown = request_drain_timeout(settings)
+
+
+def gunicorn_options(settings: Settings) -> dict[str, Any]:
+    cpus = available_cpus()
+    memory = cgroup_memory_limit()
+    workers = worker_count(settings, cpus, memory)
+    check_worker_count(settings, workers)
+    logger.info(
+        "Starting %d workers (%.2f CPUs, memory limit %s)",
+        workers,
+        cpus,
+        f"{memory >> 20} MiB" if memory is not None else "none",
+    )
+    return {
+        "bind": settings.WEB_BIND,
+        "workers": workers,
+        "worker_class": "app.server.Worker",
+        "preload_app": True,
+        "max_requests": settings.WEB_MAX_REQUESTS,
+        "max_requests_jitter": settings.WEB_MAX_REQUESTS_JITTER,
+        "keepalive": settings.WEB_KEEPALIVE_SECONDS,
+        "backlog": settings.WEB_BACKLOG,
+        "timeout": settings.WEB_TIMEOUT_SECONDS,
+        "graceful_timeout": settings.WEB_GRACEFUL_TIMEOUT_SECONDS,
+        # TLS ends at the proxy in front of the container.
+        "forwarded_allow_ips": "*",
+        "accesslog": "-",
+        "post_fork": _post_fork,
+        "child_exit": _child_exit,
+    }
+
+
+class Server(BaseApplication):  # type: ignore[misc]
+    def load_config(self) -> None:
+        # Called again on SIGHUP: read the environment afresh so changed
+        # server options (worker count, keep-alive, ...) apply to the new
+        # workers. The preloaded app is not imported again.
+        for key, value in gunicorn_options(Settings()).items():  # type: ignore[call-arg]
+            self.cfg.set(key, value)
+
+    def load(self) -> Any:
+        from app.main import app
+
+        return app
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    Server().run()
+
+
+if __name__ == "__main__":
+    main()
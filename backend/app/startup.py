@@ -0,0 +1,157 @@
+"""
+Container startup: wait for the database, apply migrations and create the
+initial data, coordinated across replicas.
+
+Every replica runs this before starting the server. The common case (schema
+already at head, initial users present) is answered with two cheap queries
+and no locking. Otherwise one replica takes a Postgres advisory lock and does
+the work while the others wait on the lock and then find nothing left to do.
+"""
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import Connection, Engine, text
+from sqlmodel import Session, col, func, select
+
+from app.backend_pre_start import init as wait_for_db
+from app.core.config import settings
+from app.core.db import engine
+from app.initial_data import ADMIN1_EMAIL, init_db
+from app.models import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Application-wide key for pg_advisory_lock, shared by all replicas ("troy").
+STARTUP_LOCK_KEY = 0x74726F79
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+class PhaseTimer:
+    """
+    Collects the wall time of each startup phase for the summary log line.
+    """
+
+    def __init__(self) -> None:
+        self.phases: list[tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def summary(self) -> str:
+        total = sum(seconds for _, seconds in self.phases)
+        parts = ", ".join(
+            f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.phases
+        )
+        return f"Startup finished in {total * 1000:.0f}ms ({parts})"
+
+
+def get_alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "app" / "alembic"))
+    # Keep the application's logging setup instead of alembic.ini's.
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def schema_is_current(connection: Connection, config: Config) -> bool:
+    """
+    Compare the revisions stamped in the database with the script heads.
+    """
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    current = set(MigrationContext.configure(connection).get_current_heads())
+    return current == heads
+
+
+def initial_data_present(db_engine: Engine) -> bool:
+    """
+    Check for both initial users with a single query.
+    """
+    emails = [settings.FIRST_SUPERUSER, ADMIN1_EMAIL]
+    with Session(db_engine) as session:
+        statement = (
+            select(func.count()).select_from(User).where(col(User.email).in_(emails))
+        )
+        return session.exec(statement).one() == len(emails)
+
+
+@contextmanager
+def advisory_lock(db_engine: Engine) -> Iterator[None]:
+    """
+    Hold a session-level advisory lock for the duration of the block. Other
+    replicas block on the lock until it is released.
+    """
+    with db_engine.connect() as connection:
+        connection.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": STARTUP_LOCK_KEY}
+        )
+        # The lock is session level; don't sit idle in a transaction.
+        connection.commit()
+        try:
+            yield
+        finally:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": STARTUP_LOCK_KEY}
+            )
+            connection.commit()
+
+
+def is_ready(db_engine: Engine, config: Config) -> bool:
+    with db_engine.connect() as connection:
+        if not schema_is_current(connection, config):
+            return False
+    return initial_data_present(db_engine)
+
+
+def prepare(db_engine: Engine, config: Config, timer: PhaseTimer) -> None:
+    with timer.phase("check"):
+        ready = is_ready(db_engine, config)
+    if ready:
+        logger.info("Schema at head and initial data present, nothing to do")
+        return
+
+    with ExitStack() as stack:
+        with timer.phase("lock_wait"):
+            stack.enter_context(advisory_lock(db_engine))
+
+        # Another replica may have finished the work while we were waiting.
+        with db_engine.connect() as connection:
+            current = schema_is_current(connection, config)
+        if current:
+            logger.info("Schema already at head, skipping migrations")
+        else:
+            with timer.phase("migrations"):
+                command.upgrade(config, "head")
+
+        if initial_data_present(db_engine):
+            logger.info("Initial data already present")
+        else:
+            with timer.phase("initial_data"):
+                with Session(db_engine) as session:
+                    init_db(session)
+
+
+def main() -> None:
+    timer = PhaseTimer()
+    with timer.phase("db_wait"):
+        wait_for_db(engine)
+    prepare(engine, get_alembic_config(), timer)
+    logger.info(timer.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app import crud
+from app.core.cohorts import refresh_cohort_sizes
+from app.core.config import settings
+from app.schemas import UserCreate
+from app.tests.utils.utils import random_email, random_lower_string
+
+URL = f"{settings.API_V1_STR}/cohorts"
+
+
+def _create_cohort(db: Session, major: str, class_: str, size: int) -> None:
+    for _ in range(size):
+        crud.create_user(
+            session=db,
+            user_in=UserCreate(
+                email=random_email(),
+                password=random_lower_string(),
+                name=random_lower_string(),
+                major=major,
+                class_=class_,
+            ),
+        )
+
+
+def test_cohort_sizes(
+    client: TestClient, db: Session, superuser_token_headers: dict[str, str]
+) -> None:
+    major = random_lower_string()
+    _create_cohort(db, major, "Junior", 3)
+    _create_cohort(db, major, "Senior", 1)
+    # Within the test's transaction, so the rows above are counted.
+    db.connection().execute(text("REFRESH MATERIALIZED VIEW cohort_size"))
+
+    r = client.get(URL + "/", headers=superuser_token_headers, params={"major": major})
+    assert r.status_code == 200
+    sizes = {row["class_"]: row["members"] for row in r.json()}
+    assert sizes == {"Junior": 3, "Senior": 1}
+
+
+def test_cohort_members_pages(
+    client: TestClient, db: Session, superuser_token_headers: dict[str, str]
+) -> None:
+    major = random_lower_string()
+    _create_cohort(db, major, "Junior", 5)
+    _create_cohort(db, major, "Senior", 2)
+
+    params = {"major": major, "class_": "Junior", "limit": 2}
+    seen: list[str] = []
+    while True:
+        r = client.get(URL + "/members", headers=superuser_token_headers, params=params)
+        assert r.status_code == 200
+        page = r.json()
+        if not page:
+            break
+        assert all(user["class_"] == "Junior" for user in page)
+        seen += [user["id"] for user in page]
+        params["after"] = page[-1]["id"]
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+
+def test_cohorts_need_permission(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(URL + "/", headers=normal_user_token_headers)
+    assert r.status_code == 403
+
+
+def test_refresh_is_skipped_while_fresh() -> None:
+    assert refresh_cohort_sizes(max_age=0)
+    assert not refresh_cohort_sizes(max_age=3600)
@@ -1,8 +1,13 @@
+from collections.abc import Generator
+
+import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
 from app.core.config import settings
+from app.core.permissions import DOCUMENT_READ, USERS_ADMIN, role_cache
 from app.models import User
+from app.tests.utils.db import AssertMaxQueries
 
 
 def test_create_user(client: TestClient, db: Session) -> None:
@@ -24,3 +29,99 @@ def test_create_user(client: TestClient, db: Session) -> None:
     assert user
     assert user.email == "pollo@listo.com"
     assert user.full_name == "Pollo Listo"
+
+
+def test_read_users_page(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/private/users/",
+        headers=superuser_token_headers,
+        params={"limit": 2},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    users = r.json()
+    assert 1 <= len(users) <= 2
+    assert "hashed_password" not in users[0]
+    assert set(users[0]) == {
+        "id",
+        "id_troy",
+        "name",
+        "email",
+        "major",
+        "class_",
+        "role",
+        "permissions",
+        "is_active",
+        "is_verified",
+    }
+
+
+def test_read_user_by_id_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/private/user/00000000-0000-0000-0000-000000000000",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 404
+
+
+def test_read_users_query_count(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    assert_max_queries: AssertMaxQueries,
+) -> None:
+    # Resolving the current user reads their columns (none on a user cache
+    # hit) and the roles if they aren't cached yet, which the cache listener
+    # may have just cleared; then one query for the page. Extra refresh() or
+    # lazy loads would push this over, and a query per listed user would
+    # repeat.
+    with assert_max_queries(3, max_repeats=1):
+        r = client.get(
+            f"{settings.API_V1_STR}/private/users/", headers=superuser_token_headers
+        )
+    assert r.status_code == 200
+
+
+@pytest.fixture
+def restore_roles() -> Generator[None, None, None]:
+    yield
+    # Role changes are rolled back, which sends no notification.
+    role_cache.clear()
+
+
+def test_role_change_applies_to_its_users(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+    restore_roles: None,  # noqa: ARG001
+) -> None:
+    url = f"{settings.API_V1_STR}/private/users-count/"
+    assert client.get(url, headers=normal_user_token_headers).status_code == 403
+
+    roles = client.get(
+        f"{settings.API_V1_STR}/private/roles/", headers=superuser_token_headers
+    ).json()
+    version = next(role["version"] for role in roles if role["name"] == "user")
+    r = client.put(
+        f"{settings.API_V1_STR}/private/roles/user",
+        headers=superuser_token_headers,
+        json={"permissions": [DOCUMENT_READ, USERS_ADMIN]},
+    )
+    assert r.status_code == 200
+    assert r.json()["version"] == version + 1
+
+    assert client.get(url, headers=normal_user_token_headers).status_code == 200
+
+
+def test_update_role_rejects_unknown_permissions(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/private/roles/user",
+        headers=superuser_token_headers,
+        json={"permissions": ["no:such"]},
+    )
+    assert r.status_code == 400
@@ -0,0 +1,124 @@
+import threading
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import QueuePool
+
+from app.core import health
+from app.core.config import settings
+from app.core.db import engine
+
+
+def _reset_probes() -> None:
+    for probe in health.probes:
+        probe._result = None
+
+
+def _probe(name: str) -> health.CachedProbe:
+    return next(probe for probe in health.probes if probe.name == name)
+
+
+def test_liveness(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/health/live")
+    assert r.status_code == 200
+    assert r.json()["status"] == "ok"
+
+
+def test_readiness(client: TestClient) -> None:
+    _reset_probes()
+    r = client.get(f"{settings.API_V1_STR}/health/ready")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["status"] == "ok"
+    assert set(data["probes"]) == {"database", "db_pool", "threadpool", "email"}
+    assert data["probes"]["database"]["ok"] is True
+
+
+def test_readiness_database_down(client: TestClient) -> None:
+    _reset_probes()
+
+    def failing_check() -> dict[str, str]:
+        raise ConnectionError("database unreachable")
+
+    with patch.object(_probe("database"), "check", failing_check):
+        r = client.get(f"{settings.API_V1_STR}/health/ready")
+    _reset_probes()
+    assert r.status_code == 503
+    data = r.json()
+    assert data["status"] == "unavailable"
+    assert data["probes"]["database"]["error"] == "database unreachable"
+
+
+def test_readiness_is_cached(client: TestClient) -> None:
+    _reset_probes()
+    calls = []
+
+    def counting_check() -> dict[str, str]:
+        calls.append(1)
+        return {}
+
+    with patch.object(_probe("database"), "check", counting_check):
+        client.get(f"{settings.API_V1_STR}/health/ready")
+        client.get(f"{settings.API_V1_STR}/health/ready")
+    _reset_probes()
+    assert len(calls) == 1
+
+
+def test_readiness_ignores_saturation(client: TestClient) -> None:
+    _reset_probes()
+
+    def saturated_check() -> dict[str, object]:
+        return {"checked_out": 10, "capacity": 10, "saturated": True}
+
+    with patch.object(_probe("db_pool"), "check", saturated_check):
+        r = client.get(f"{settings.API_V1_STR}/health/ready")
+    _reset_probes()
+    assert r.status_code == 200
+    assert r.json()["probes"]["db_pool"]["details"]["saturated"] is True
+
+
+def test_database_probe_with_pool_exhausted() -> None:
+    pool = engine.pool
+    assert isinstance(pool, QueuePool)
+    held = []
+    try:
+        while pool.checkedout() < pool.size() + max(pool._max_overflow, 0):
+            held.append(engine.raw_connection())
+        assert health.check_database() == {}
+    finally:
+        for connection in held:
+            connection.close()
+
+
+def test_readiness_skips_check_while_previous_one_hangs(client: TestClient) -> None:
+    _reset_probes()
+    probe = _probe("database")
+    release = threading.Event()
+    calls = []
+
+    def hanging_check() -> dict[str, str]:
+        calls.append(1)
+        release.wait(5)
+        return {}
+
+    with (
+        patch.object(settings, "HEALTH_PROBE_TIMEOUT_SECONDS", 0.05),
+        patch.object(probe, "check", hanging_check),
+    ):
+        first = client.get(f"{settings.API_V1_STR}/health/ready")
+        _reset_probes()
+        second = client.get(f"{settings.API_V1_STR}/health/ready")
+        _reset_probes()
+        release.set()
+        deadline = time.monotonic() + 5
+        while probe._in_flight.is_set() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        third = client.get(f"{settings.API_V1_STR}/health/ready")
+    _reset_probes()
+    assert first.json()["probes"]["database"]["error"].startswith("timed out")
+    assert second.json()["probes"]["database"]["error"] == (
+        "previous check still running"
+    )
+    assert third.json()["probes"]["database"]["ok"] is True
+    assert len(calls) == 2
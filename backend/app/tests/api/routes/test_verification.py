@@ -0,0 +1,83 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud, email_service
+from app.core.config import settings
+from app.core.security import (
+    generate_email_verification_token,
+    verify_email_verification_token,
+)
+from app.email_service import CircuitBreaker, Mailer, MemoryTransport
+from app.tests.utils.user import create_random_user
+
+URL = f"{settings.API_V1_STR}/resend-verification"
+
+
+@pytest.fixture
+def outbox(monkeypatch: pytest.MonkeyPatch) -> Generator[MemoryTransport, None, None]:
+    transport = MemoryTransport()
+    mailer = Mailer(
+        transport,
+        max_attempts=1,
+        backoff=0,
+        breaker=CircuitBreaker("memory", failure_threshold=5, reset_timeout=1),
+    )
+    monkeypatch.setattr(settings, "EMAIL_TRANSPORT", "memory")
+    monkeypatch.setattr(email_service, "get_mailer", lambda: mailer)
+    yield transport
+
+
+def test_resend_is_coalesced_within_cooldown(
+    client: TestClient, db: Session, outbox: MemoryTransport
+) -> None:
+    user = create_random_user(db)
+    for _ in range(3):
+        r = client.post(URL, json={"email": user.email})
+        assert r.status_code == 202
+    assert [message.to for message in outbox.outbox] == [user.email]
+
+
+def test_resend_reuses_valid_token(db: Session) -> None:
+    user = create_random_user(db)
+    first = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    cooldown = timedelta(seconds=settings.EMAIL_VERIFICATION_COOLDOWN_SECONDS)
+
+    assert (
+        crud.claim_verification_email(session=db, user_id=user.id, now=first) == first
+    )
+    # Within the cooldown: coalesced.
+    later = first + cooldown / 2
+    assert crud.claim_verification_email(session=db, user_id=user.id, now=later) is None
+    # After it: sent again, with the same token.
+    later = first + cooldown * 2
+    assert (
+        crud.claim_verification_email(session=db, user_id=user.id, now=later) == first
+    )
+    # Once too little validity is left, a new token is issued.
+    later = first + timedelta(
+        hours=settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS
+        - settings.EMAIL_VERIFICATION_MIN_VALIDITY_HOURS
+        + 1
+    )
+    assert (
+        crud.claim_verification_email(session=db, user_id=user.id, now=later) == later
+    )
+
+
+def test_resend_does_not_reveal_addresses(
+    client: TestClient, outbox: MemoryTransport
+) -> None:
+    r = client.post(URL, json={"email": "nobody@troy.edu"})
+    assert r.status_code == 202
+    assert outbox.outbox == []
+
+
+def test_token_is_deterministic() -> None:
+    issued_at = datetime.now(timezone.utc).replace(microsecond=0)
+    token = generate_email_verification_token("a@troy.edu", issued_at=issued_at)
+    assert token == generate_email_verification_token("a@troy.edu", issued_at)
+    assert verify_email_verification_token(token) == "a@troy.edu"
@@ -1,27 +1,76 @@
+import os
 from collections.abc import Generator
+from contextlib import AbstractContextManager
 
-import pytest
-from fastapi.testclient import TestClient
-from sqlmodel import Session, delete
+# Settings are read and the engine is created when app modules are imported,
+# so both overrides must happen first. Hashes made in tests use the minimum
+# bcrypt cost; the template database's accounts keep their own.
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
 
-from app.core.config import settings
-from app.core.db import engine, init_db
-from app.main import app
-from app.models import Item, User
-from app.tests.utils.user import authentication_token_from_email
-from app.tests.utils.utils import get_superuser_token_headers
+from app.core.config import settings  # noqa: E402
+from app.tests.utils.db import clone_database, drop_database  # noqa: E402
 
+# Under pytest-xdist (``pytest -n auto``) each worker gets its own copy of the
+# test database, cloned from it as a template.
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+if XDIST_WORKER:
+    settings.DATABASE_URL = clone_database(  # type: ignore[assignment]
+        str(settings.SQLALCHEMY_DATABASE_URI), XDIST_WORKER
+    )
+
+import pytest  # noqa: E402
+from fastapi import Request  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import Connection  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from app.api.deps import get_session  # noqa: E402
+from app.core.cache import user_cache  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.tests.utils.db import AssertMaxQueries, RecordedQueries  # noqa: E402
+from app.tests.utils.db import assert_max_queries as _assert_max_queries  # noqa: E402
+from app.tests.utils.user import authentication_token_from_email  # noqa: E402
+from app.tests.utils.utils import get_superuser_token_headers  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def connection() -> Generator[Connection, None, None]:
+    with engine.connect() as connection:
+        yield connection
+    if XDIST_WORKER:
+        engine.dispose()
+        drop_database(str(settings.SQLALCHEMY_DATABASE_URI))
+
+
+@pytest.fixture(autouse=True)
+def db(connection: Connection) -> Generator[Session, None, None]:
+    """
+    Run each test inside a transaction that is rolled back afterwards.
+
+    The test's session and every request session share the connection and
+    turn their commits into SAVEPOINT releases, so nothing a test writes
+    reaches the database or the next test.
+    """
+    transaction = connection.begin()
 
-@pytest.fixture(scope="session", autouse=True)
-def db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
-        init_db(session)
+    def test_session(request: Request) -> Generator[Session, None, None]:
+        route = request.scope.get("route")
+        with Session(
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+            info={"route": getattr(route, "path", request.url.path)},
+        ) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = test_session
+    with Session(bind=connection, join_transaction_mode="create_savepoint") as session:
         yield session
-        statement = delete(Item)
-        session.execute(statement)
-        statement = delete(User)
-        session.execute(statement)
-        session.commit()
+    app.dependency_overrides.pop(get_session, None)
+    transaction.rollback()
+    # Rolled back rows never send a change notification.
+    user_cache.clear()
 
 
 @pytest.fixture(scope="module")
@@ -35,8 +84,26 @@ def superuser_token_headers(client: TestClient) -> dict[str, str]:
     return get_superuser_token_headers(client)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture
 def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]:
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture
+def assert_max_queries() -> AssertMaxQueries:
+    """
+    Fail the test if the block issues more SQL statements than allowed, or
+    with ``max_repeats``, repeats one (an N+1 query pattern)::
+
+        with assert_max_queries(2, max_repeats=1):
+            client.get(...)
+    """
+
+    def factory(
+        limit: int, *, max_repeats: int | None = None
+    ) -> AbstractContextManager[RecordedQueries]:
+        return _assert_max_queries(engine, limit, max_repeats=max_repeats)
+
+    return factory
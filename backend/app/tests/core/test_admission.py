@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+import anyio
+import httpx
+from fastapi import FastAPI
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionControlMiddleware,
+    Priority,
+    classify,
+)
+from app.core.config import settings
+from app.core.security import create_access_token
+
+
+def _scope(path: str, token: str | None = None) -> dict[str, object]:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {"type": "http", "path": path, "headers": headers}
+
+
+def test_classify() -> None:
+    api = settings.API_V1_STR
+    assert classify(_scope(f"{api}/health/ready")) is None
+    assert classify(_scope("/metrics")) is None
+    token = create_access_token("user", timedelta(minutes=5))
+    assert classify(_scope(f"{api}/users/me", token)) == Priority.AUTHENTICATED
+    assert classify(_scope(f"{api}/login/access-token")) == Priority.ANONYMOUS
+    assert classify(_scope(f"{api}/register")) == Priority.REGISTRATION
+
+
+def test_classify_ignores_invalid_tokens() -> None:
+    api = settings.API_V1_STR
+    expired = create_access_token("user", timedelta(minutes=-5))
+    valid = create_access_token("user", timedelta(minutes=5))
+    forged = valid[: valid.rindex(".") + 1] + "A" * 43
+    for token in ("x", expired, forged):
+        assert classify(_scope(f"{api}/users/me", token)) == Priority.ANONYMOUS
+    assert classify(_scope(f"{api}/register", "x")) == Priority.REGISTRATION
+
+
+def test_queue_admits_by_priority() -> None:
+    controller = AdmissionController(max_in_flight=1, target_delay=0.05, interval=1)
+    order: list[Priority] = []
+
+    async def request(priority: Priority) -> None:
+        assert await controller.admit(priority)
+        order.append(priority)
+        await anyio.sleep(0.01)
+        controller.release()
+
+    async def main() -> None:
+        assert await controller.admit(Priority.ANONYMOUS)
+        async with anyio.create_task_group() as group:
+            for priority in (Priority.REGISTRATION, Priority.AUTHENTICATED):
+                group.start_soon(request, priority)
+            await anyio.sleep(0.01)
+            assert controller.queued == 2
+            controller.release()
+
+    anyio.run(main)
+    assert order == [Priority.AUTHENTICATED, Priority.REGISTRATION]
+    assert controller.in_flight == 0
+    assert controller.queued == 0
+
+
+def test_sheds_anonymous_traffic_when_overloaded() -> None:
+    controller = AdmissionController(max_in_flight=1, target_delay=0.02, interval=0.1)
+
+    async def main() -> None:
+        assert await controller.admit(Priority.AUTHENTICATED)
+        async with anyio.create_task_group() as group:
+            # Keep the queue non-empty for longer than an interval; each
+            # waiter gives up after one interval.
+            for _ in range(3):
+                group.start_soon(controller.admit, Priority.AUTHENTICATED)
+                await anyio.sleep(0.06)
+            assert controller.overloaded()
+            assert not await controller.admit(Priority.REGISTRATION)
+            started = anyio.current_time()
+            assert not await controller.admit(Priority.ANONYMOUS)
+            assert anyio.current_time() - started < 0.05
+
+    anyio.run(main)
+    assert controller.rejected == 5
+    assert not controller.overloaded()
+
+
+def test_middleware_rejects_with_retry_after() -> None:
+    app = FastAPI()
+    release = anyio.Event()
+
+    @app.get("/api/v1/register")
+    async def register() -> None:
+        await release.wait()
+
+    controller = AdmissionController(max_in_flight=1, target_delay=0.01, interval=0.05)
+    shielded = AdmissionControlMiddleware(app, controller)
+    transport = httpx.ASGITransport(app=shielded)
+
+    async def main() -> list[httpx.Response]:
+        responses: list[httpx.Response] = []
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+
+            async def get() -> None:
+                responses.append(await client.get("/api/v1/register"))
+
+            async with anyio.create_task_group() as group:
+                group.start_soon(get)
+                await anyio.sleep(0.01)
+                await get()
+                release.set()
+        return responses
+
+    rejected, served = anyio.run(main)
+    assert served.status_code == 200
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == str(
+        settings.ADMISSION_RETRY_AFTER_SECONDS
+    )
+    assert controller.in_flight == 0
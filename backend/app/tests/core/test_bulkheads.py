@@ -0,0 +1,81 @@
+import threading
+import time
+
+import anyio
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+from app.core import bulkheads
+from app.core.bulkheads import Bulkhead, bulkhead_route, use_bulkhead
+from app.core.config import settings
+
+
+@pytest.fixture
+def app(monkeypatch: pytest.MonkeyPatch) -> FastAPI:
+    monkeypatch.setitem(bulkheads.bulkheads, "auth", Bulkhead("auth", 1))
+    monkeypatch.setitem(bulkheads.bulkheads, "email", Bulkhead("email", 1))
+    monkeypatch.setattr(settings, "BULKHEAD_QUEUE_TIMEOUT_SECONDS", 0.2)
+
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    router = APIRouter(route_class=bulkhead_route("auth"))
+
+    @router.get("/slow")
+    def slow() -> int:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return peak
+
+    @router.get("/very-slow")
+    @use_bulkhead("email")
+    def very_slow() -> None:
+        time.sleep(0.5)
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def _get_all(app: FastAPI, paths: list[str]) -> list[httpx.Response]:
+    responses: list[httpx.Response] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def get(path: str) -> None:
+            responses.append(await client.get(path))
+
+        async with anyio.create_task_group() as group:
+            for path in paths:
+                group.start_soon(get, path)
+    return responses
+
+
+def test_bulkhead_limits_concurrency(app: FastAPI) -> None:
+    responses = anyio.run(_get_all, app, ["/slow"] * 3)
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert max(r.json() for r in responses) == 1
+    assert bulkheads.bulkheads["auth"].stats()["in_use"] == 0
+
+
+def test_bulkhead_rejects_after_queue_timeout(app: FastAPI) -> None:
+    responses = anyio.run(_get_all, app, ["/very-slow"] * 2)
+    statuses = sorted(r.status_code for r in responses)
+    assert statuses == [200, 503]
+    rejected = next(r for r in responses if r.status_code == 503)
+    assert rejected.headers["Retry-After"] == "1"
+    assert bulkheads.bulkheads["email"].rejected == 1
+    # The other group was not involved.
+    assert bulkheads.bulkheads["auth"].rejected == 0
+
+
+def test_unknown_bulkhead() -> None:
+    with pytest.raises(KeyError):
+        bulkhead_route("nope")
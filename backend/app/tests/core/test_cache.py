@@ -0,0 +1,82 @@
+import json
+import time
+import uuid
+from typing import Any
+
+from app.core.cache import UserCache, handle_user_changed, user_cache
+
+
+def _values(email: str) -> dict[str, Any]:
+    return {
+        "id": uuid.uuid4(),
+        "email": email,
+        "permissions": [],
+        "denied_permissions": [],
+    }
+
+
+def _cache(**kwargs: Any) -> UserCache:
+    cache = UserCache(**{"max_size": 10, "ttl": 60.0, **kwargs})
+    cache.enabled = True
+    return cache
+
+
+def test_get_by_email_and_id() -> None:
+    cache = _cache()
+    values = _values("a@example.com")
+    cache.put(values, cache.generation)
+    assert cache.get_by_email("a@example.com") == values
+    assert cache.get_by_id(values["id"]) == values
+    assert cache.stats()["hits"] == 2
+
+
+def test_disabled_cache_stores_nothing() -> None:
+    cache = _cache()
+    cache.enabled = False
+    cache.put(_values("a@example.com"), cache.generation)
+    assert cache.get_by_email("a@example.com") is None
+
+
+def test_lru_eviction() -> None:
+    cache = _cache(max_size=2)
+    first, second, third = (_values(f"{i}@example.com") for i in range(3))
+    cache.put(first, cache.generation)
+    cache.put(second, cache.generation)
+    cache.get_by_id(first["id"])
+    cache.put(third, cache.generation)
+    assert cache.get_by_id(second["id"]) is None
+    assert cache.get_by_id(first["id"]) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry() -> None:
+    cache = _cache(ttl=0.0)
+    values = _values("a@example.com")
+    cache.put(values, cache.generation)
+    time.sleep(0.001)
+    assert cache.get_by_id(values["id"]) is None
+
+
+def test_put_after_invalidation_is_dropped() -> None:
+    cache = _cache()
+    values = _values("a@example.com")
+    generation = cache.generation
+    cache.invalidate(user_id=values["id"])
+    cache.put(values, generation)
+    assert cache.get_by_id(values["id"]) is None
+
+
+def test_notification_invalidates_old_and_new_email() -> None:
+    user_cache.clear(enabled=True)
+    values = _values("new@example.com")
+    user_cache.put(values, user_cache.generation)
+    payload = {
+        "id": str(values["id"]),
+        "email": "new@example.com",
+        "old_email": "old@example.com",
+        "changed_at": time.time(),
+    }
+    handle_user_changed(json.dumps(payload))
+    assert user_cache.get_by_email("new@example.com") is None
+    assert user_cache.stats()["invalidation_lag_max_seconds"] >= 0
+    user_cache.clear(enabled=False)
@@ -0,0 +1,52 @@
+import time
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core import ids
+from app.core.ids import uuid7, uuid7_from, uuid7_time
+
+
+def test_uuid7_layout() -> None:
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert abs(uuid7_time(value) - time.time()) < 1
+
+
+def test_uuid7_from() -> None:
+    value = uuid7_from(1_659_312_000_000, (1 << 74) - 1)
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert uuid7_time(value) == 1_659_312_000
+    assert str(value) == "018256b3-cc00-7fff-bfff-ffffffffffff"
+
+
+def test_uuid7_is_strictly_increasing() -> None:
+    values = [uuid7() for _ in range(10_000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_uuid7_when_clock_goes_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    first = uuid7()
+    monkeypatch.setattr(time, "time_ns", lambda: 0)
+    assert uuid7() > first
+
+
+def test_uuid7_counter_overflow(monkeypatch: pytest.MonkeyPatch) -> None:
+    first = uuid7()
+    monkeypatch.setattr(ids, "_counter", ids._MAX_COUNTER)
+    monkeypatch.setattr(time, "time_ns", lambda: 0)
+    second = uuid7()
+    assert second > first
+    assert uuid7_time(second) > uuid7_time(first)
+
+
+def test_database_default_is_uuid7(db: Session) -> None:
+    value = db.connection().execute(text("SELECT uuid_generate_v7()")).scalar_one()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert abs(uuid7_time(value) - time.time()) < 60
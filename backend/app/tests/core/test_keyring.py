@@ -0,0 +1,79 @@
+from typing import Any
+
+import pytest
+from jose import jwt
+
+from app.core.config import Settings
+from app.core.keyring import Keyring, check_worker_count
+
+OLD = "old-" + "a" * 40
+NEW = "new-" + "b" * 40
+LEGACY = "legacy-" + "c" * 40
+
+
+def _settings(monkeypatch: pytest.MonkeyPatch, **values: Any) -> Settings:
+    monkeypatch.delenv("SECRET_KEY", raising=False)
+    monkeypatch.setitem(Settings.model_config, "env_file", None)
+    return Settings(
+        PROJECT_NAME="test",
+        FIRST_SUPERUSER="admin@troy.edu",
+        FIRST_SUPERUSER_PASSWORD="a-long-enough-password",
+        **values,
+    )
+
+
+def test_rotation_keeps_old_tokens_valid() -> None:
+    before = Keyring({"2026-01": OLD}, "2026-01", LEGACY)
+    token = before.encode({"sub": "user"})
+    assert jwt.get_unverified_header(token)["kid"] == "2026-01"
+
+    after = Keyring({"2026-01": OLD, "2026-07": NEW}, "2026-07", LEGACY)
+    assert after.decode(token) == {"sub": "user"}
+    assert jwt.get_unverified_header(after.encode({}))["kid"] == "2026-07"
+
+
+def test_unknown_kid_is_rejected() -> None:
+    token = Keyring({"2026-01": OLD}, "2026-01", LEGACY).encode({"sub": "user"})
+    with pytest.raises(jwt.JWTError):
+        Keyring({"2026-07": NEW}, "2026-07", LEGACY).decode(token)
+
+
+def test_token_without_kid_uses_secret_key() -> None:
+    token = Keyring({}, None, LEGACY).encode({"sub": "user"})
+    assert "kid" not in jwt.get_unverified_header(token)
+    assert Keyring({"2026-01": OLD}, "2026-01", LEGACY).decode(token) == {"sub": "user"}
+
+
+def test_forged_kid_does_not_verify() -> None:
+    token = jwt.encode(
+        {"sub": "user"}, NEW, algorithm="HS256", headers={"kid": "2026-01"}
+    )
+    with pytest.raises(jwt.JWTError):
+        Keyring({"2026-01": OLD}, "2026-01", LEGACY).decode(token)
+
+
+def test_non_string_kid_is_rejected() -> None:
+    token = jwt.encode({"sub": "user"}, OLD, algorithm="HS256", headers={"kid": ["a"]})
+    with pytest.raises(jwt.JWTError):
+        Keyring({"2026-01": OLD}, "2026-01", LEGACY).decode(token)
+
+
+def test_signing_key_id_must_exist(monkeypatch: pytest.MonkeyPatch) -> None:
+    with pytest.raises(ValueError):
+        _settings(monkeypatch, SIGNING_KEYS={"2026-01": OLD}, SIGNING_KEY_ID="x")
+    with pytest.raises(ValueError):
+        _settings(monkeypatch, SIGNING_KEY_ID="2026-01")
+
+
+def test_refuses_workers_with_ephemeral_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    ephemeral = _settings(monkeypatch)
+    assert ephemeral.signing_key_is_ephemeral
+    check_worker_count(ephemeral, 1)
+    with pytest.raises(RuntimeError):
+        check_worker_count(ephemeral, 4)
+
+    check_worker_count(_settings(monkeypatch, SECRET_KEY=LEGACY), 4)
+    keys = _settings(
+        monkeypatch, SIGNING_KEYS={"2026-01": OLD}, SIGNING_KEY_ID="2026-01"
+    )
+    check_worker_count(keys, 4)
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.lifecycle import DrainingMiddleware, Lifecycle, lifecycle
+
+
+def test_wait_for_tasks_cancels_stragglers() -> None:
+    state = Lifecycle()
+    finished: list[str] = []
+
+    async def work(name: str, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+        finished.append(name)
+
+    async def main() -> int:
+        state.create_task(work("fast", 0.01))
+        slow = state.create_task(work("slow", 10))
+        cancelled = await state.wait_for_tasks(0.1)
+        await asyncio.sleep(0)
+        assert slow.cancelled()
+        return cancelled
+
+    assert asyncio.run(main()) == 1
+    assert finished == ["fast"]
+
+
+def test_phase_logs_and_continues(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.INFO)
+    state = Lifecycle()
+    with state.phase("database"):
+        raise RuntimeError("boom")
+    assert "Shutdown phase database failed" in caplog.text
+    assert "Shutdown phase database took" in caplog.text
+
+
+def test_draining_closes_connections(monkeypatch: pytest.MonkeyPatch) -> None:
+    app = FastAPI()
+
+    @app.get("/")
+    def root() -> None:
+        return None
+
+    async def get() -> httpx.Response:
+        transport = httpx.ASGITransport(app=DrainingMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.get("/")
+
+    assert "connection" not in asyncio.run(get()).headers
+    monkeypatch.setattr(lifecycle, "draining_since", 1.0)
+    assert asyncio.run(get()).headers["connection"] == "close"
@@ -0,0 +1,30 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_metrics_endpoint_reports_requests(client: TestClient) -> None:
+    client.get(f"{settings.API_V1_STR}/health/live")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert 'http_requests_total{method="GET",route="' in body
+    assert "http_request_duration_seconds_bucket" in body
+    assert "db_queries_per_request_bucket" in body
+
+
+def test_metrics_count_db_queries(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    client.get(
+        f"{settings.API_V1_STR}/private/users-count/", headers=superuser_token_headers
+    )
+    body = client.get("/metrics").text
+    lines = [
+        line
+        for line in body.splitlines()
+        if line.startswith("db_queries_per_request_sum") and "users-count" in line
+    ]
+    assert lines
+    assert float(lines[0].rsplit(" ", 1)[1]) >= 1
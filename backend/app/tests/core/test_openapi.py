@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_openapi_served_with_etag(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/openapi.json")
+    assert r.status_code == 200
+    assert r.json()["info"]["title"] == settings.PROJECT_NAME
+    etag = r.headers["etag"]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/openapi.json", headers={"If-None-Match": etag}
+    )
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+
+
+def test_docs_available(client: TestClient) -> None:
+    assert client.get("/docs").status_code == 200
+    assert client.get("/redoc").status_code == 200
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from app.core import permissions
+from app.core.permissions import (
+    ALL,
+    RoleCache,
+    effective_permissions,
+    handle_role_changed,
+    has_permissions,
+)
+
+ROWS = [
+    ("user", 1, ["document:read"]),
+    ("admin2", 3, [ALL]),
+]
+
+
+def _cache(**kwargs: float) -> RoleCache:
+    cache = RoleCache(**{"ttl": 60.0, **kwargs})
+    cache.enabled = True
+    return cache
+
+
+def test_effective_permissions_apply_overrides() -> None:
+    role = frozenset({"document:read", "document:write"})
+    assert effective_permissions(role, ["users:admin"], ["document:write"]) == {
+        "document:read",
+        "users:admin",
+    }
+
+
+def test_wildcard_grants_everything() -> None:
+    assert has_permissions(frozenset({ALL}), ["users:admin", "anything"])
+    assert has_permissions(frozenset({"a", "b"}), ["a"])
+    assert not has_permissions(frozenset({"a"}), ["a", "b"])
+
+
+def test_lookup_needs_loaded_roles() -> None:
+    cache = _cache()
+    assert cache.lookup("user") is None
+    cache.load(ROWS, cache.generation)
+    assert cache.lookup("user") == frozenset({"document:read"})
+    assert cache.lookup("user", denied=["document:read"]) == frozenset()
+    assert cache.lookup("unknown") == frozenset()
+
+
+def test_effective_sets_are_memoized() -> None:
+    cache = _cache()
+    cache.load(ROWS, cache.generation)
+    assert cache.lookup("user", ["x"]) is cache.lookup("user", ["x"])
+
+
+def test_role_change_drops_roles() -> None:
+    cache = _cache()
+    cache.load(ROWS, cache.generation)
+    cache.clear()
+    assert cache.lookup("user") is None
+
+
+def test_load_after_invalidation_is_dropped() -> None:
+    cache = _cache()
+    generation = cache.generation
+    cache.clear()
+    roles = cache.load(ROWS, generation)
+    assert roles["admin2"].version == 3
+    assert cache.lookup("user") is None
+
+
+def test_ttl_applies_without_listener() -> None:
+    cache = _cache(ttl=0.0)
+    cache.load(ROWS, cache.generation)
+    time.sleep(0.001)
+    assert cache.lookup("user") is not None
+    cache.enabled = False
+    assert cache.lookup("user") is None
+
+
+def test_handle_role_changed(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = _cache()
+    cache.load(ROWS, cache.generation)
+    monkeypatch.setattr(permissions, "role_cache", cache)
+    handle_role_changed('{"name": "user", "version": 2, "op": "UPDATE"}')
+    assert cache.lookup("user") is None
+    cache.load(ROWS, cache.generation)
+    handle_role_changed("not json")
+    assert cache.lookup("user") is None
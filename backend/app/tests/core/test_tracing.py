@@ -0,0 +1,118 @@
+from collections.abc import Generator
+from typing import Any
+
+import anyio
+import pytest
+import sentry_sdk
+from sentry_sdk.envelope import Envelope
+from sentry_sdk.transport import Transport
+from sqlalchemy import text
+
+from app.core import security
+from app.core.db import engine
+from app.core.tracing import init_sentry, span, traced, traces_sampler
+
+
+class CapturingTransport(Transport):
+    """
+    Stand-in for the HTTP transport that keeps envelopes in memory.
+    """
+
+    def __init__(self, options: dict[str, Any] | None = None) -> None:
+        super().__init__(options)
+        self.transactions: list[dict[str, Any]] = []
+
+    def capture_envelope(self, envelope: Envelope) -> None:
+        for item in envelope.items:
+            if item.type == "transaction" and item.payload.json is not None:
+                self.transactions.append(item.payload.json)
+
+
+@pytest.fixture
+def transport() -> Generator[CapturingTransport, None, None]:
+    transport = CapturingTransport()
+    init_sentry(
+        dsn="https://public@sentry.invalid/1",
+        transport=transport,
+        traces_sampler=None,
+        traces_sample_rate=1.0,
+    )
+    yield transport
+    sentry_sdk.init()
+
+
+def span_ops(transaction: dict[str, Any]) -> list[str]:
+    return [span["op"] for span in transaction["spans"]]
+
+
+def test_password_and_jwt_spans(transport: CapturingTransport) -> None:
+    with sentry_sdk.start_transaction(op="test", name="security"):
+        hashed = security.get_password_hash("secret")
+        assert security.verify_password("secret", hashed)
+        token = security.generate_email_verification_token("a@troy.edu")
+        assert security.verify_email_verification_token(token) == "a@troy.edu"
+    sentry_sdk.flush()
+
+    (transaction,) = transport.transactions
+    ops = span_ops(transaction)
+    assert "password.hash" in ops
+    assert "password.verify" in ops
+    assert "jwt.decode" in ops
+
+
+def test_sql_spans(transport: CapturingTransport) -> None:
+    with sentry_sdk.start_transaction(op="test", name="sql"):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    sentry_sdk.flush()
+
+    (transaction,) = transport.transactions
+    assert any(
+        span["op"] == "db" and span["description"] == "SELECT 1"
+        for span in transaction["spans"]
+    )
+
+
+def test_traced_task_continues_trace(transport: CapturingTransport) -> None:
+    def job() -> None:
+        security.get_password_hash("secret")
+
+    with sentry_sdk.start_transaction(op="http.server", name="request") as request:
+        task = traced(job)
+    task()
+    sentry_sdk.flush()
+
+    by_op = {
+        transaction["contexts"]["trace"]["op"]: transaction
+        for transaction in transport.transactions
+    }
+    assert set(by_op) == {"http.server", "task"}
+    task_trace = by_op["task"]["contexts"]["trace"]
+    assert task_trace["trace_id"] == request.trace_id
+    assert task_trace["parent_span_id"] == request.span_id
+    assert "password.hash" in span_ops(by_op["task"])
+
+
+def test_traced_async_task(transport: CapturingTransport) -> None:
+    async def job() -> None:
+        with span("email.send", "memory"):
+            await anyio.sleep(0)
+
+    with sentry_sdk.start_transaction(op="http.server", name="request") as request:
+        task = traced(job)
+    anyio.run(task)
+    sentry_sdk.flush()
+
+    [task_transaction] = [
+        transaction
+        for transaction in transport.transactions
+        if transaction["contexts"]["trace"]["op"] == "task"
+    ]
+    assert task_transaction["contexts"]["trace"]["trace_id"] == request.trace_id
+    assert "email.send" in span_ops(task_transaction)
+
+
+def test_probes_are_not_sampled() -> None:
+    assert traces_sampler({"asgi_scope": {"path": "/api/v1/health/ready"}}) == 0.0
+    assert traces_sampler({"asgi_scope": {"path": "/metrics"}}) == 0.0
+    assert traces_sampler({"parent_sampled": True}) == 1.0
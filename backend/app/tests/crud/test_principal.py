@@ -0,0 +1,57 @@
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app import crud
+from app.api.deps import get_current_user
+from app.core.keyring import keyring
+from app.core.permissions import DOCUMENT_READ
+from app.schemas import UserCreate
+from app.tests.utils.db import RecordedQueries
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def test_principal_leaves_out_password_hash(
+    db: Session,
+    assert_max_queries: Callable[[int], AbstractContextManager[RecordedQueries]],
+) -> None:
+    user = create_random_user(db)
+    email, user_id = user.email, user.id
+    # The user's columns, and the roles if they aren't cached yet.
+    with assert_max_queries(2) as queries:
+        principal = crud.get_principal(session=db, email=email)
+    assert principal is not None
+    assert principal.id == user_id
+    assert DOCUMENT_READ in principal.permissions
+    assert not any("hashed_password" in sql for sql in queries.statements)
+    assert not hasattr(principal, "__dict__")
+
+
+def test_principal_of_unknown_email(db: Session) -> None:
+    assert crud.get_principal(session=db, email=random_email()) is None
+
+
+def test_authenticate_loads_password_hash_up_front(
+    db: Session,
+    assert_max_queries: Callable[[int], AbstractContextManager[RecordedQueries]],
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    crud.create_user(
+        session=db, user_in=UserCreate(email=email, password=password, name="Student")
+    )
+    db.expunge_all()
+    with assert_max_queries(1):
+        assert crud.authenticate(session=db, email=email, password=password)
+
+
+def test_token_without_subject_is_rejected(db: Session) -> None:
+    token = keyring.encode({"exp": datetime.now(timezone.utc) + timedelta(minutes=5)})
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(db, token)
+    assert exc_info.value.status_code == 403
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+from app import server
+from app.core.config import settings
+
+
+def test_cgroup_v2_limits(tmp_path: Path) -> None:
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    (tmp_path / "memory.max").write_text(f"{1 << 30}\n")
+    assert server.cgroup_cpu_limit(tmp_path) == 1.5
+    assert server.cgroup_memory_limit(tmp_path) == 1 << 30
+
+
+def test_cgroup_v2_unlimited(tmp_path: Path) -> None:
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    (tmp_path / "memory.max").write_text("max\n")
+    assert server.cgroup_cpu_limit(tmp_path) is None
+    assert server.cgroup_memory_limit(tmp_path) is None
+
+
+def test_cgroup_v1_limits(tmp_path: Path) -> None:
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("200000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text("9223372036854771712\n")
+    assert server.cgroup_cpu_limit(tmp_path) == 2.0
+    assert server.cgroup_memory_limit(tmp_path) is None
+
+
+def test_no_cgroup(tmp_path: Path) -> None:
+    assert server.cgroup_cpu_limit(tmp_path) is None
+    assert server.cgroup_memory_limit(tmp_path) is None
+
+
+def test_worker_count() -> None:
+    sized = settings.model_copy(
+        update={
+            "WEB_CONCURRENCY": None,
+            "WEB_WORKERS_PER_CORE": 1.0,
+            "WEB_WORKER_MEMORY_MB": 256,
+            "WEB_MAX_WORKERS": 8,
+        }
+    )
+    assert server.worker_count(sized, cpus=1.5, memory_bytes=None) == 2
+    assert server.worker_count(sized, cpus=32, memory_bytes=None) == 8
+    # Three workers fit in 800 MiB, not four.
+    assert server.worker_count(sized, cpus=4, memory_bytes=800 << 20) == 3
+    assert server.worker_count(sized, cpus=4, memory_bytes=100 << 20) == 1
+
+    fixed = sized.model_copy(update={"WEB_CONCURRENCY": 5})
+    assert server.worker_count(fixed, cpus=1, memory_bytes=None) == 5
+
+
+def test_request_drain_timeout() -> None:
+    timeouts = settings.model_copy(
+        update={
+            "WEB_GRACEFUL_TIMEOUT_SECONDS": 30,
+            "SHUTDOWN_DRAIN_DELAY_SECONDS": 5.0,
+            "SHUTDOWN_CLEANUP_TIMEOUT_SECONDS": 5.0,
+        }
+    )
+    assert server.request_drain_timeout(timeouts) == 20.0
+    short = timeouts.model_copy(update={"WEB_GRACEFUL_TIMEOUT_SECONDS": 5})
+    assert server.request_drain_timeout(short) == 1.0
@@ -0,0 +1,63 @@
+from unittest.mock import MagicMock, patch
+
+from alembic import command
+
+from app import startup
+
+
+def test_prepare_skips_lock_when_ready() -> None:
+    timer = startup.PhaseTimer()
+    with (
+        patch.object(startup, "is_ready", return_value=True),
+        patch.object(startup, "advisory_lock") as lock_mock,
+        patch.object(command, "upgrade") as upgrade_mock,
+    ):
+        startup.prepare(MagicMock(), MagicMock(), timer)
+
+    lock_mock.assert_not_called()
+    upgrade_mock.assert_not_called()
+    assert [name for name, _ in timer.phases] == ["check"]
+
+
+def test_prepare_migrates_under_lock() -> None:
+    timer = startup.PhaseTimer()
+    engine_mock = MagicMock()
+    with (
+        patch.object(startup, "is_ready", return_value=False),
+        patch.object(startup, "advisory_lock") as lock_mock,
+        patch.object(startup, "schema_is_current", return_value=False),
+        patch.object(startup, "initial_data_present", return_value=True),
+        patch.object(command, "upgrade") as upgrade_mock,
+        patch.object(startup, "init_db") as init_db_mock,
+    ):
+        startup.prepare(engine_mock, MagicMock(), timer)
+
+    lock_mock.assert_called_once_with(engine_mock)
+    upgrade_mock.assert_called_once()
+    init_db_mock.assert_not_called()
+    assert [name for name, _ in timer.phases] == ["check", "lock_wait", "migrations"]
+
+
+def test_prepare_skips_work_done_by_another_replica() -> None:
+    timer = startup.PhaseTimer()
+    with (
+        patch.object(startup, "is_ready", return_value=False),
+        patch.object(startup, "advisory_lock"),
+        patch.object(startup, "schema_is_current", return_value=True),
+        patch.object(startup, "initial_data_present", return_value=True),
+        patch.object(command, "upgrade") as upgrade_mock,
+        patch.object(startup, "init_db") as init_db_mock,
+    ):
+        startup.prepare(MagicMock(), MagicMock(), timer)
+
+    upgrade_mock.assert_not_called()
+    init_db_mock.assert_not_called()
+
+
+def test_phase_timer_summary() -> None:
+    timer = startup.PhaseTimer()
+    with timer.phase("db_wait"):
+        pass
+    summary = timer.summary()
+    assert summary.startswith("Startup finished in")
+    assert "db_wait=" in summary
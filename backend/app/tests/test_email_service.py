@@ -0,0 +1,146 @@
+import asyncio
+import email
+import time
+from pathlib import Path
+
+import anyio
+import pytest
+
+from app.email_service import (
+    BreakerState,
+    CircuitBreaker,
+    EmailError,
+    EmailMessage,
+    EmailUnavailableError,
+    FileTransport,
+    Mailer,
+    MemoryTransport,
+)
+from app.utils import generate_new_account_email
+
+MESSAGE = EmailMessage(to="student@troy.edu", subject="Hello", html="<p>Hi</p>")
+
+
+class FlakyTransport(MemoryTransport):
+    name = "flaky"
+
+    def __init__(self, failures: int, transient: bool = True) -> None:
+        super().__init__()
+        self.failures = failures
+        self.transient = transient
+        self.attempts = 0
+
+    def send(self, message: EmailMessage) -> None:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise EmailError("provider down", transient=self.transient)
+        super().send(message)
+
+
+def _mailer(transport: MemoryTransport, threshold: int = 5) -> Mailer:
+    return Mailer(
+        transport,
+        max_attempts=3,
+        backoff=0.001,
+        breaker=CircuitBreaker(transport.name, threshold, reset_timeout=0.05),
+    )
+
+
+def _state(mailer: Mailer) -> BreakerState:
+    # A call, so mypy doesn't carry a narrowed state across sends.
+    return mailer.breaker.state
+
+
+def test_retries_transient_failures() -> None:
+    transport = FlakyTransport(failures=2)
+    anyio.run(_mailer(transport).send, MESSAGE)
+    assert transport.attempts == 3
+    assert transport.outbox == [MESSAGE]
+
+
+def test_permanent_failure_is_not_retried() -> None:
+    transport = FlakyTransport(failures=1, transient=False)
+    with pytest.raises(EmailError):
+        anyio.run(_mailer(transport).send, MESSAGE)
+    assert transport.attempts == 1
+
+
+def test_breaker_opens_and_recovers() -> None:
+    transport = FlakyTransport(failures=3)
+    mailer = _mailer(transport, threshold=3)
+    with pytest.raises(EmailError):
+        anyio.run(mailer.send, MESSAGE)
+    assert _state(mailer) == BreakerState.OPEN
+
+    # Open: fails fast without calling the provider.
+    with pytest.raises(EmailUnavailableError):
+        anyio.run(mailer.send, MESSAGE)
+    assert transport.attempts == 3
+
+    # After the reset timeout one trial goes through and closes it.
+    anyio.run(anyio.sleep, 0.06)
+    assert _state(mailer) == BreakerState.HALF_OPEN
+    anyio.run(mailer.send, MESSAGE)
+    assert _state(mailer) == BreakerState.CLOSED
+    assert transport.outbox == [MESSAGE]
+
+
+def test_permanent_failures_do_not_open_breaker() -> None:
+    transport = FlakyTransport(failures=5, transient=False)
+    mailer = _mailer(transport, threshold=3)
+    for _ in range(5):
+        with pytest.raises(EmailError) as exc_info:
+            anyio.run(mailer.send, MESSAGE)
+        assert not isinstance(exc_info.value, EmailUnavailableError)
+    assert _state(mailer) == BreakerState.CLOSED
+    anyio.run(mailer.send, MESSAGE)
+    assert transport.outbox == [MESSAGE]
+
+
+def test_half_open_allows_one_trial() -> None:
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.opened_at is not None
+
+
+def test_cancelled_trial_lets_the_next_one_through() -> None:
+    class SlowTransport(MemoryTransport):
+        def send(self, message: EmailMessage) -> None:
+            time.sleep(0.05)
+            super().send(message)
+
+    mailer = _mailer(SlowTransport(), threshold=1)
+    mailer.breaker.record_failure()
+    anyio.run(anyio.sleep, 0.06)
+
+    async def cancelled_send() -> None:
+        # Like a request task cancelled when the client goes away.
+        task = asyncio.ensure_future(mailer.send(MESSAGE))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled_send())
+    assert _state(mailer) == BreakerState.HALF_OPEN
+    anyio.run(mailer.send, MESSAGE)
+    assert _state(mailer) == BreakerState.CLOSED
+
+
+def test_file_transport(tmp_path: Path) -> None:
+    FileTransport(tmp_path / "outbox").send(MESSAGE)
+    [path] = (tmp_path / "outbox").iterdir()
+    parsed = email.message_from_bytes(path.read_bytes())
+    assert parsed["To"] == MESSAGE.to
+    assert parsed["Subject"] == MESSAGE.subject
+
+
+def test_new_account_email_renders() -> None:
+    message = generate_new_account_email(
+        "student@troy.edu", username="<Student>", token="abc"
+    )
+    assert "verify-email?token=abc" in message.html
+    assert "&lt;Student&gt;" in message.html
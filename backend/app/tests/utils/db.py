@@ -0,0 +1,135 @@
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from sqlalchemy import Engine, create_engine, event, func, make_url, select, text
+from sqlalchemy.pool import NullPool
+
+# Serializes CREATE DATABASE ... TEMPLATE across pytest-xdist workers.
+CLONE_LOCK_KEY = 0x74657374
+# Statements the test transaction issues around every commit, which repeat
+# without being a sign of anything.
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@contextmanager
+def _maintenance_connection(url: str) -> Iterator[Any]:
+    maintenance = create_engine(
+        make_url(url).set(database="postgres"),
+        isolation_level="AUTOCOMMIT",
+        poolclass=NullPool,
+    )
+    try:
+        with maintenance.connect() as connection:
+            yield connection
+    finally:
+        maintenance.dispose()
+
+
+def clone_database(url: str, suffix: str) -> str:
+    """
+    Create ``<database>_<suffix>`` as a copy of the database in ``url`` (which
+    must be migrated and seeded, and have no open connections) and return its
+    URL. An existing copy from an earlier run is replaced.
+    """
+    template = make_url(url)
+    name = f"{template.database}_{suffix}"
+    with _maintenance_connection(url) as connection:
+        connection.execute(select(func.pg_advisory_lock(CLONE_LOCK_KEY)))
+        try:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+            connection.execute(
+                text(f'CREATE DATABASE "{name}" TEMPLATE "{template.database}"')
+            )
+        finally:
+            connection.execute(select(func.pg_advisory_unlock(CLONE_LOCK_KEY)))
+    return template.set(database=name).render_as_string(hide_password=False)
+
+
+def drop_database(url: str) -> None:
+    name = make_url(url).database
+    with _maintenance_connection(url) as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+
+
+@dataclass
+class RecordedQueries:
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def queries(self) -> list[str]:
+        """
+        The recorded statements other than savepoint handling.
+        """
+        return [
+            statement
+            for statement in self.statements
+            if not statement.lstrip().upper().startswith(TRANSACTION_CONTROL)
+        ]
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def repeated(self, threshold: int = 2) -> dict[str, int]:
+        """
+        Statements, whitespace normalized, issued at least ``threshold``
+        times. The same SELECT once per row of an earlier result is what an
+        N+1 query pattern looks like.
+        """
+        counts = Counter(" ".join(statement.split()) for statement in self.queries)
+        return {sql: n for sql, n in counts.items() if n >= threshold}
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[RecordedQueries]:
+    """
+    Record every statement executed on ``engine`` inside the block, from any
+    thread (TestClient runs the app in its own thread).
+    """
+    recorded = RecordedQueries()
+
+    def after_cursor_execute(
+        conn: Any,  # noqa: ARG001
+        cursor: Any,  # noqa: ARG001
+        statement: str,
+        *args: Any,  # noqa: ARG001
+    ) -> None:
+        recorded.statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield recorded
+    finally:
+        event.remove(engine, "after_cursor_execute", after_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(
+    engine: Engine, limit: int, *, max_repeats: int | None = None
+) -> Iterator[RecordedQueries]:
+    """
+    Fail if the block issues more than ``limit`` statements, not counting
+    savepoint handling, or, with ``max_repeats``, any one statement more than
+    that many times.
+    """
+    with count_queries(engine) as recorded:
+        yield recorded
+    statements = "\n".join(f"  {statement}" for statement in recorded.queries)
+    assert recorded.count <= limit, (
+        f"Expected at most {limit} queries, got {recorded.count}:\n{statements}"
+    )
+    if max_repeats is not None:
+        repeated = recorded.repeated(max_repeats + 1)
+        assert not repeated, (
+            f"Expected no statement more than {max_repeats} times, got:\n"
+            + "\n".join(f"  {n}x {sql}" for sql, n in repeated.items())
+        )
+
+
+class AssertMaxQueries(Protocol):
+    def __call__(
+        self, limit: int, *, max_repeats: int | None = None
+    ) -> AbstractContextManager[RecordedQueries]: ...
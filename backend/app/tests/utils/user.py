@@ -3,7 +3,8 @@ from sqlmodel import Session
 
 from app import crud
 from app.core.config import settings
-from app.models import User, UserCreate, UserUpdate
+from app.models import User
+from app.schemas import UserCreate, UserUpdate
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -22,8 +23,8 @@ def user_authentication_headers(
 def create_random_user(db: Session) -> User:
     email = random_email()
     password = random_lower_string()
-    user_in = UserCreate(email=email, password=password)
-    user = crud.create_user(session=db, user_create=user_in)
+    user_in = UserCreate(email=email, password=password, name=random_lower_string())
+    user = crud.create_user(session=db, user_in=user_in)
     return user
 
 
@@ -38,8 +39,13 @@ def authentication_token_from_email(
     password = random_lower_string()
     user = crud.get_user_by_email(session=db, email=email)
     if not user:
-        user_in_create = UserCreate(email=email, password=password)
-        user = crud.create_user(session=db, user_create=user_in_create)
+        user_in_create = UserCreate(
+            email=email, password=password, name=random_lower_string()
+        )
+        user = crud.create_user(session=db, user_in=user_in_create)
+        user.is_verified = True
+        db.add(user)
+        db.commit()
     else:
         user_in_update = UserUpdate(password=password)
         if not user.id:
@@ -1,75 +1,56 @@
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any
 
-import emails
-from emails.template import JinjaTemplate
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from app.core.config import settings
+from app.email_service import EmailError, EmailMessage, send_email
 
+logger = logging.getLogger(__name__)
 
-def send_email(
-    email_to: str,
-    subject_template: str = "",
-    html_template: str = "",
-    environment: Dict[str, Any] = {},
-) -> None:
-    """
-    Sends an email using the configured SMTP server.
-    """
-    assert settings.emails_enabled, "Emailing is not enabled in the settings."
-    message = emails.Message(
-        subject=JinjaTemplate(subject_template),
-        html=JinjaTemplate(html_template),
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+TEMPLATES_DIR = Path(__file__).parent / "email-templates" / "src"
+
+
+@lru_cache
+def _templates() -> Environment:
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape()
     )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, render=environment, smtp=smtp_options)
-    logging.info(f"Send email result: {response}")
-
-
-def generate_test_email(email_to: str) -> Dict[str, str]:
+
+
+def render_email_template(template_name: str, context: dict[str, Any]) -> str:
+    return _templates().get_template(template_name).render(context)
+
+
+def generate_test_email(email_to: str) -> EmailMessage:
     """
     Generates test email data using the test_email template.
     """
     subject = f"{settings.PROJECT_NAME} - Test Email"
-    
-    # Read the test email HTML template
-    template_path = Path(__file__).parent / "email-templates" / "src" / "test_email.html"
-    with open(template_path) as f:
-        html_template = f.read()
-    
-    return {
-        "subject": subject,
-        "html_content": html_template,
-    }
-
-
-def send_new_account_email(email_to: str, username: str, token: str) -> None:
+    html = render_email_template(
+        "test_email.html",
+        {"project_name": settings.PROJECT_NAME, "email": email_to},
+    )
+    return EmailMessage(to=email_to, subject=subject, html=html)
+
+
+def generate_new_account_email(
+    email_to: str, username: str, token: str
+) -> EmailMessage:
     """
-    Sends a verification email to a new user.
+    Generates the verification email for a new user.
     """
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - New account verification"
-    
+
     # Construct the verification link
     link = f"{settings.SERVER_HOST}/api/v1/verify-email?token={token}"
-    
-    template_path = Path(__file__).parent / "email-templates" / "src" / "new_account_verification.html"
-    with open(template_path) as f:
-        html_template = f.read()
-
-    send_email(
-        email_to=email_to,
-        subject_template=subject,
-        html_template=html_template,
-        environment={
+
+    html = render_email_template(
+        "new_account_verification.html",
+        {
             "project_name": settings.PROJECT_NAME,
             "username": username,
             "email": email_to,
@@ -77,3 +58,15 @@ def send_new_account_email(email_to: str, username: str, token: str) -> None:
             "link": link,
         },
     )
+    return EmailMessage(to=email_to, subject=subject, html=html)
+
+
+async def send_new_account_email(email_to: str, username: str, token: str) -> None:
+    """
+    Sends a verification email to a new user. Runs after the response, so
+    failures are only logged.
+    """
+    try:
+        await send_email(generate_new_account_email(email_to, username, token))
+    except EmailError as e:
+        logger.error("Verification email to %s not sent: %s", email_to, e)
@@ -0,0 +1,167 @@
+"""
+Latency under overload, with and without admission control.
+
+Simulates a backend that can serve ``--workers`` requests at once, each
+taking ``--service-ms``, and sends it Poisson arrivals at ``--overload``
+times that capacity: authenticated reads, anonymous logins and sign-ups.
+The ASGI app is driven directly, so only queueing is measured. Without
+admission control every request is eventually served but the queue, and so
+the latency, grows for as long as the overload lasts; with it, the excess is
+rejected early and the p99 of the requests that are served stays bounded.
+
+    python -m benchmarks.admission [--duration S] [--overload X]
+
+To see the same against a deployed instance, run the load generator in
+open-loop mode above its capacity, e.g.
+``python -m benchmarks.load --scenario mixed --rate 400``.
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+import anyio
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionControlMiddleware,
+    Priority,
+)
+from app.core.config import settings
+from benchmarks.load.report import percentile
+
+TRAFFIC = (
+    # priority, path, share of the arrivals
+    (Priority.AUTHENTICATED, f"{settings.API_V1_STR}/users/me", 0.4),
+    (Priority.ANONYMOUS, f"{settings.API_V1_STR}/login/access-token", 0.3),
+    (Priority.REGISTRATION, f"{settings.API_V1_STR}/register", 0.3),
+)
+
+
+def make_app(workers: int, service_time: float) -> ASGIApp:
+    limiter: anyio.CapacityLimiter | None = None
+
+    async def endpoint(_request: Request) -> Response:
+        nonlocal limiter
+        if limiter is None:
+            limiter = anyio.CapacityLimiter(workers)
+        async with limiter:
+            await anyio.sleep(service_time)
+        return Response(b"ok")
+
+    return Starlette(routes=[Route("/{path:path}", endpoint)])
+
+
+async def run(
+    app: ASGIApp, rate: float, duration: float, seed: int
+) -> dict[Priority, list[tuple[int, float]]]:
+    """
+    (status, seconds) per request, by priority.
+    """
+    rng = random.Random(seed)
+    results: dict[Priority, list[tuple[int, float]]] = defaultdict(list)
+    weights = [share for _, _, share in TRAFFIC]
+
+    async def request(priority: Priority, path: str, scheduled: float) -> None:
+        headers = [(b"authorization", b"Bearer x")] if priority == 0 else []
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        status = 0
+
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await app(scope, receive, send)
+        results[priority].append((status, time.perf_counter() - scheduled))
+
+    async with anyio.create_task_group() as group:
+        started = time.perf_counter()
+        scheduled = started
+        while scheduled - started < duration:
+            scheduled += rng.expovariate(rate)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await anyio.sleep(delay)
+            priority, path, _ = rng.choices(TRAFFIC, weights)[0]
+            group.start_soon(request, priority, path, scheduled)
+    return results
+
+
+def report(label: str, results: dict[Priority, list[tuple[int, float]]]) -> None:
+    print(label)
+    print(
+        f"  {'priority':<14}{'requests':>9}{'served':>8}{'shed':>7}{'p50 ms':>9}{'p99 ms':>9}"
+    )
+    for priority in Priority:
+        samples = results.get(priority, [])
+        served = sorted(seconds for status, seconds in samples if status == 200)
+        shed = sum(1 for status, _ in samples if status == 503)
+        print(
+            f"  {priority.name.lower():<14}{len(samples):>9}{len(served):>8}"
+            f"{shed:>7}{percentile(served, 50) * 1000:>9.0f}"
+            f"{percentile(served, 99) * 1000:>9.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--service-ms", type=float, default=20.0)
+    parser.add_argument("--overload", type=float, default=2.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    service_time = args.service_ms / 1000
+    capacity = args.workers / service_time
+    rate = capacity * args.overload
+    print(
+        f"capacity {capacity:.0f} req/s, offered {rate:.0f} req/s "
+        f"for {args.duration:.0f}s"
+    )
+
+    backend = make_app(args.workers, service_time)
+    report(
+        "without admission control",
+        anyio.run(run, backend, rate, args.duration, args.seed),
+    )
+
+    controller = AdmissionController(
+        max_in_flight=args.workers,
+        target_delay=settings.ADMISSION_TARGET_DELAY_MS / 1000,
+        interval=settings.ADMISSION_INTERVAL_MS / 1000,
+    )
+    shielded = AdmissionControlMiddleware(
+        make_app(args.workers, service_time), controller
+    )
+    report(
+        "with admission control",
+        anyio.run(run, shielded, rate, args.duration, args.seed),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Import-time profile of the application.
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter and
+reports the total, which is roughly what each uvicorn worker pays before it
+can serve a request, split by top-level package (time spent in the package's
+own modules, so the rows add up to the total).
+
+    python -m benchmarks.import_time [--module app.main] [--top 20]
+"""
+
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+
+
+def profile(module: str) -> list[tuple[int, int, str]]:
+    """
+    (self_us, cumulative_us, name) for every module imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        entries.append((int(self_us), int(cumulative_us), name))
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    entries = profile(args.module)
+    by_package: dict[str, int] = defaultdict(int)
+    modules: dict[str, int] = defaultdict(int)
+    for self_us, _, name in entries:
+        package = name.strip().split(".")[0]
+        by_package[package] += self_us
+        modules[package] += 1
+    total_us = sum(by_package.values())
+
+    print(f"import {args.module}: {total_us / 1000:.1f} ms, {len(entries)} modules")
+    print(f"{'package':<32}{'modules':>8}{'self ms':>10}{'share':>8}")
+    for package, self_us in sorted(
+        by_package.items(), key=lambda item: item[1], reverse=True
+    )[: args.top]:
+        print(
+            f"{package:<32}{modules[package]:>8}{self_us / 1000:>10.1f}"
+            f"{self_us / total_us:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+End-to-end load tests against a running API.
+
+Seed a local database, start the server the way production does and drive it
+with ``python -m benchmarks.load``:
+
+    python -m benchmarks.load.seed --users 2000
+    python -m benchmarks.load --scenario mixed --duration 60 --concurrency 50 \\
+        --output results/mixed.json
+    python -m benchmarks.load --scenario mixed --duration 60 --concurrency 50 \\
+        --baseline results/mixed.json --threshold 0.10
+
+Closed-loop mode (``--concurrency``) keeps N virtual users busy, each sending
+its next request as soon as the previous one finishes. Open-loop mode
+(``--rate``) starts requests on a fixed schedule whether or not earlier ones
+have finished and measures latency from the scheduled start, so a slow server
+shows up as queueing instead of a lower request rate.
+"""
@@ -0,0 +1,140 @@
+"""
+Run a load-test scenario against a running API.
+
+The private admin routes are only mounted with ENVIRONMENT=local, and the
+seeded accounts from ``benchmarks.load.seed`` must exist.
+
+    python -m benchmarks.load --scenario mixed --concurrency 50 --duration 60
+    python -m benchmarks.load --scenario login --rate 20 --duration 60
+"""
+
+import argparse
+import contextlib
+import random
+import sys
+import time
+from pathlib import Path
+
+import anyio
+import httpx
+
+from benchmarks.load import report
+from benchmarks.load.scenarios import SCENARIOS, Flow, LoadTestError, Run, pick, prepare
+
+
+async def closed_loop(
+    run: Run, flows: list[tuple[Flow, int]], concurrency: int, deadline: float
+) -> None:
+    async def virtual_user() -> None:
+        while time.perf_counter() < deadline:
+            with contextlib.suppress(LoadTestError):
+                await pick(flows)(run, None)
+
+    async with anyio.create_task_group() as group:
+        for _ in range(concurrency):
+            group.start_soon(virtual_user)
+
+
+async def open_loop(
+    run: Run, flows: list[tuple[Flow, int]], rate: float, deadline: float
+) -> None:
+    """
+    Start flows as a Poisson process at ``rate`` per second, independent of
+    how quickly earlier ones complete.
+    """
+
+    async def start(flow: Flow, scheduled: float) -> None:
+        with contextlib.suppress(LoadTestError):
+            await flow(run, scheduled)
+
+    async with anyio.create_task_group() as group:
+        scheduled = time.perf_counter()
+        while True:
+            scheduled += random.expovariate(rate)
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await anyio.sleep(delay)
+            group.start_soon(start, pick(flows), scheduled)
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    flows = SCENARIOS[args.scenario]
+    # Open loop must not be throttled by the client's own pool.
+    connections = args.concurrency if args.rate is None else 1000
+    limits = httpx.Limits(
+        max_connections=connections, max_keepalive_connections=connections
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        run = Run(client=client, students=args.students)
+        await prepare(run)
+        if args.warmup:
+            await closed_loop(
+                run, flows, args.concurrency, time.perf_counter() + args.warmup
+            )
+            run.samples.clear()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        if args.rate is None:
+            await closed_loop(run, flows, args.concurrency, deadline)
+        else:
+            await open_loop(run, flows, args.rate, deadline)
+        duration = time.perf_counter() - started
+
+    result = report.summarize(run.samples, duration)
+    result["config"] = {
+        "scenario": args.scenario,
+        "mode": "closed" if args.rate is None else "open",
+        "concurrency": args.concurrency if args.rate is None else None,
+        "rate": args.rate,
+        "duration": args.duration,
+        "base_url": args.base_url,
+    }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument(
+        "--concurrency", type=int, default=20, help="virtual users (closed loop)"
+    )
+    parser.add_argument(
+        "--rate", type=float, help="arrivals per second (open loop instead)"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--students", type=int, default=1000, help="accounts created by the seed"
+    )
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    parser.add_argument("--baseline", type=Path, help="report to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed regression against the baseline (0.10 = 10%%)",
+    )
+    args = parser.parse_args()
+
+    result = anyio.run(main_async, args)
+    report.print_report(result)
+    if args.output:
+        report.save(result, args.output)
+    if args.baseline:
+        regressions = report.compare(result, report.load(args.baseline), args.threshold)
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Summaries of a run, saved as JSON, and the comparison against a baseline.
+"""
+
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from benchmarks.load.scenarios import Sample
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: list[Sample], duration: float) -> dict[str, Any]:
+    by_endpoint: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+
+    def stats(group: list[Sample]) -> dict[str, Any]:
+        latencies = sorted(sample.seconds for sample in group)
+        errors = sum(
+            1 for sample in group if sample.status == 0 or sample.status >= 500
+        )
+        statuses: dict[str, int] = defaultdict(int)
+        for sample in group:
+            statuses[str(sample.status)] += 1
+        return {
+            "requests": len(group),
+            "throughput_rps": len(group) / duration if duration else 0.0,
+            "error_rate": errors / len(group) if group else 0.0,
+            "statuses": dict(sorted(statuses.items())),
+            "latency_ms": {
+                "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+                **{f"p{p}": percentile(latencies, p) * 1000 for p in PERCENTILES},
+                "max": latencies[-1] * 1000 if latencies else 0.0,
+            },
+        }
+
+    return {
+        "duration_seconds": duration,
+        "total": stats(samples),
+        "endpoints": {
+            endpoint: stats(group) for endpoint, group in sorted(by_endpoint.items())
+        },
+    }
+
+
+def save(report: dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def load(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """
+    Regressions of more than ``threshold`` (0.1 = 10%) against the baseline:
+    higher p95/p99 latency, lower throughput or a higher error rate, per
+    endpoint and in total. Endpoints missing from either run are skipped.
+    """
+    regressions = []
+    sections = {"total": (current["total"], baseline["total"])}
+    for endpoint, before in baseline["endpoints"].items():
+        if endpoint in current["endpoints"]:
+            sections[endpoint] = (current["endpoints"][endpoint], before)
+
+    for name, (now, before) in sections.items():
+        for p in ("p95", "p99"):
+            was, latency = before["latency_ms"][p], now["latency_ms"][p]
+            if was and latency > was * (1 + threshold):
+                regressions.append(
+                    f"{name}: {p} {latency:.1f} ms vs {was:.1f} ms "
+                    f"(+{(latency / was - 1) * 100:.0f}%)"
+                )
+        was, rps = before["throughput_rps"], now["throughput_rps"]
+        if was and rps < was * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {rps:.1f} rps vs {was:.1f} rps "
+                f"(-{(1 - rps / was) * 100:.0f}%)"
+            )
+        # Absolute, so a baseline without errors still allows a few.
+        was, error_rate = before["error_rate"], now["error_rate"]
+        if error_rate > was + threshold / 10:
+            regressions.append(f"{name}: error rate {error_rate:.2%} vs {was:.2%}")
+    return regressions
+
+
+def print_report(report: dict[str, Any]) -> None:
+    header = f"{'endpoint':32} {'reqs':>7} {'rps':>8} {'err':>6} " + " ".join(
+        f"{f'p{p} ms':>8}" for p in PERCENTILES
+    )
+    print(header)
+    print("-" * len(header))
+    rows = [*report["endpoints"].items(), ("total", report["total"])]
+    for name, stats in rows:
+        latency = stats["latency_ms"]
+        print(
+            f"{name:32} {stats['requests']:7d} {stats['throughput_rps']:8.1f} "
+            f"{stats['error_rate']:6.1%} "
+            + " ".join(f"{latency[f'p{p}']:8.1f}" for p in PERCENTILES)
+        )
@@ -0,0 +1,221 @@
+"""
+Scenario definitions.
+
+A scenario is a weighted set of flows; each iteration of a virtual user
+picks one flow at random and runs it. Flows issue requests through
+``Run.request``, which records the latency under a stable endpoint
+name (the route template, not the URL with ids in it).
+"""
+
+import itertools
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import generate_email_verification_token
+from benchmarks.load.seed import ADMIN_EMAIL, LOAD_TEST_PASSWORD, student_email
+
+API = settings.API_V1_STR
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    started: float
+    seconds: float
+    status: int
+
+
+@dataclass
+class Run:
+    """
+    State shared by all virtual users of one run.
+    """
+
+    client: httpx.AsyncClient
+    students: int
+    samples: list[Sample] = field(default_factory=list)
+    admin_headers: dict[str, str] = field(default_factory=dict)
+    user_ids: list[str] = field(default_factory=list)
+    # Unique registration emails; the digits become the users' id_troy.
+    _registrations: itertools.count = field(
+        default_factory=lambda: itertools.count(int(time.time()) * 1_000_000)
+    )
+
+    async def request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        *,
+        scheduled: float | None = None,
+        **kwargs: object,
+    ) -> httpx.Response:
+        """
+        Send a request and record its latency. ``scheduled`` is the time the
+        request should have started (open-loop mode); waiting for a free
+        connection or a late event loop then counts as latency too.
+        """
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)  # type: ignore[arg-type]
+            status = response.status_code
+        except httpx.HTTPError:
+            response = None
+            status = 0
+        finished = time.perf_counter()
+        origin = scheduled if scheduled is not None else started
+        self.samples.append(Sample(endpoint, origin, finished - origin, status))
+        if response is None:
+            raise LoadTestError(f"{method} {url} failed")
+        return response
+
+    def random_student(self) -> str:
+        return student_email(random.randrange(self.students))
+
+    def next_registration_email(self) -> str:
+        return f"loadtest-reg-{next(self._registrations)}@troy.edu"
+
+
+class LoadTestError(Exception):
+    pass
+
+
+Flow = Callable[[Run, float | None], Awaitable[None]]
+
+
+async def login(run: Run, scheduled: float | None) -> None:
+    await run.request(
+        "POST /login/access-token",
+        "POST",
+        f"{API}/login/access-token",
+        scheduled=scheduled,
+        data={"username": run.random_student(), "password": LOAD_TEST_PASSWORD},
+    )
+
+
+async def register(run: Run, scheduled: float | None) -> None:
+    await run.request(
+        "POST /register",
+        "POST",
+        f"{API}/register",
+        scheduled=scheduled,
+        json={
+            "email": run.next_registration_email(),
+            "password": LOAD_TEST_PASSWORD,
+            "name": "Load Test Registration",
+        },
+    )
+
+
+async def register_and_verify(run: Run, scheduled: float | None) -> None:
+    email = run.next_registration_email()
+    response = await run.request(
+        "POST /register",
+        "POST",
+        f"{API}/register",
+        scheduled=scheduled,
+        json={"email": email, "password": LOAD_TEST_PASSWORD, "name": "Load Test"},
+    )
+    if response.status_code != 201:
+        return
+    # The server and the load generator read the same .env, so the token
+    # can be minted here instead of fetched from a mailbox.
+    await run.request(
+        "GET /verify-email",
+        "GET",
+        f"{API}/verify-email",
+        params={"token": generate_email_verification_token(email)},
+    )
+
+
+async def admin_users_count(run: Run, scheduled: float | None) -> None:
+    await run.request(
+        "GET /private/users-count/",
+        "GET",
+        f"{API}/private/users-count/",
+        scheduled=scheduled,
+        headers=run.admin_headers,
+    )
+
+
+async def admin_users_page(run: Run, scheduled: float | None) -> None:
+    skip = random.randrange(max(run.students - 100, 1))
+    await run.request(
+        "GET /private/users/",
+        "GET",
+        f"{API}/private/users/",
+        scheduled=scheduled,
+        params={"skip": skip, "limit": 100},
+        headers=run.admin_headers,
+    )
+
+
+async def admin_user_by_id(run: Run, scheduled: float | None) -> None:
+    user_id = random.choice(run.user_ids) if run.user_ids else str(uuid.uuid4())
+    await run.request(
+        "GET /private/user/{user_id}",
+        "GET",
+        f"{API}/private/user/{user_id}",
+        scheduled=scheduled,
+        headers=run.admin_headers,
+    )
+
+
+async def health(run: Run, scheduled: float | None) -> None:
+    await run.request(
+        "GET /health/live", "GET", f"{API}/health/live", scheduled=scheduled
+    )
+
+
+SCENARIOS: dict[str, list[tuple[Flow, int]]] = {
+    "login": [(login, 1)],
+    "register": [(register_and_verify, 1)],
+    "admin-reads": [
+        (admin_users_count, 1),
+        (admin_users_page, 2),
+        (admin_user_by_id, 7),
+    ],
+    "health": [(health, 1)],
+    # Rough shape of production traffic: mostly authenticated reads, logins
+    # at the start of sessions and the occasional sign-up.
+    "mixed": [
+        (admin_user_by_id, 50),
+        (admin_users_page, 10),
+        (admin_users_count, 5),
+        (login, 25),
+        (register, 5),
+        (register_and_verify, 5),
+    ],
+}
+
+
+def pick(flows: list[tuple[Flow, int]]) -> Flow:
+    return random.choices(
+        [flow for flow, _ in flows], weights=[weight for _, weight in flows]
+    )[0]
+
+
+async def prepare(run: Run) -> None:
+    """
+    Log the admin in and collect user ids for the by-id reads. Not recorded.
+    """
+    response = await run.client.post(
+        f"{API}/login/access-token",
+        data={"username": ADMIN_EMAIL, "password": LOAD_TEST_PASSWORD},
+    )
+    response.raise_for_status()
+    token = response.json()["access_token"]
+    run.admin_headers = {"Authorization": f"Bearer {token}"}
+    response = await run.client.get(
+        f"{API}/private/users/",
+        params={"limit": 1000},
+        headers=run.admin_headers,
+    )
+    response.raise_for_status()
+    run.user_ids = [user["id"] for user in response.json()]
@@ -0,0 +1,85 @@
+"""
+Seed the database configured in ``.env`` with load-test accounts.
+
+Creates ``--users`` verified students and one ``admin2`` account, all with
+``LOAD_TEST_PASSWORD``. Earlier load-test accounts (and users registered by
+the ``register`` scenario) are removed first, so the data set is the same on
+every run. Only one bcrypt hash is computed.
+
+    python -m benchmarks.load.seed [--users N]
+"""
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import insert
+from sqlmodel import Session, col, delete
+
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.models import User
+
+LOAD_TEST_PASSWORD = "load-test-password"
+ADMIN_EMAIL = "loadtest-admin@troy.edu"
+EMAIL_PREFIX = "loadtest"
+
+
+def student_email(i: int) -> str:
+    return f"{EMAIL_PREFIX}-student-{i}@troy.edu"
+
+
+def seed(users: int) -> None:
+    hashed_password = get_password_hash(LOAD_TEST_PASSWORD)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "id_troy": f"lt{i:08d}",
+            "name": f"Load Test Student {i}",
+            "email": student_email(i),
+            "hashed_password": hashed_password,
+            "major": "Computer Science",
+            "class_": "Senior",
+            "role": "user",
+            "permissions": ["document:read"],
+            "is_active": True,
+            "is_verified": True,
+        }
+        for i in range(users)
+    ]
+    rows.append(
+        {
+            "id": uuid.uuid4(),
+            "id_troy": "lt-admin",
+            "name": "Load Test Admin",
+            "email": ADMIN_EMAIL,
+            "hashed_password": hashed_password,
+            "major": None,
+            "class_": None,
+            "role": "admin2",
+            "permissions": [],
+            "is_active": True,
+            "is_verified": True,
+        }
+    )
+    with Session(engine) as session:
+        session.exec(delete(User).where(col(User.email).startswith(EMAIL_PREFIX)))
+        for start in range(0, len(rows), 1000):
+            session.execute(insert(User), rows[start : start + 1000])
+        session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    seed(args.users)
+    print(
+        f"Seeded {args.users} students and {ADMIN_EMAIL} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Per-request overhead of MetricsMiddleware.
+
+Drives a minimal ASGI app directly (no sockets, no HTTP parsing) with and
+without the middleware and reports the difference per request, so only the
+instrumentation itself is measured. Set PROMETHEUS_MULTIPROC_DIR to an empty
+directory to measure the multi-worker (mmap file) mode used in production.
+
+    python -m benchmarks.metrics_overhead [--requests N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message
+
+from app.core.metrics import MetricsMiddleware
+
+
+async def endpoint(_request: object) -> Response:
+    return Response(b"ok")
+
+
+def make_app(instrumented: bool) -> ASGIApp:
+    app = Starlette(routes=[Route("/items/{item_id}", endpoint)])
+    return MetricsMiddleware(app) if instrumented else app
+
+
+async def run(app: ASGIApp, requests: int) -> float:
+    """
+    Microseconds per request.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/items/42",
+        "raw_path": b"/items/42",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message: Message) -> None:
+        pass
+
+    for _ in range(1000):
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+async def main_async(requests: int) -> None:
+    plain = min([await run(make_app(False), requests) for _ in range(3)])
+    instrumented = min([await run(make_app(True), requests) for _ in range(3)])
+    print(f"without middleware: {plain:8.2f} us/request")
+    print(f"with middleware:    {instrumented:8.2f} us/request")
+    print(f"overhead:           {instrumented - plain:8.2f} us/request")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
+
+
+if __name__ == "__main__":
+    main()
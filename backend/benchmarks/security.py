@@ -0,0 +1,168 @@
+"""
+Throughput of the primitives in app/core/security.py.
+
+* bcrypt hash and verify at several cost factors (the app uses passlib's
+  default of 12).
+* JWT encode/decode of access tokens with growing ``permissions`` claims, and
+  of email verification tokens.
+* Scaling of each primitive across 1..N threads and processes, to see which
+  ones release the GIL and what a container with N cores can sustain.
+
+Runs locally, no database or network needed. Numbers are operations per
+second; "per core" divides by the number of workers or of usable CPUs,
+whichever is smaller.
+
+    python -m benchmarks.security [--seconds S] [--workers 1,2,4] [--costs 10,12]
+"""
+
+import argparse
+import functools
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+from app.core import security
+
+PASSWORD = "correct horse battery staple"
+PERMISSION_COUNTS = (0, 10, 100)
+
+
+def bcrypt_hash(cost: int) -> Callable[[], object]:
+    context = security.pwd_context.copy(bcrypt__rounds=cost)
+    return lambda: context.hash(PASSWORD)
+
+
+def bcrypt_verify(cost: int) -> Callable[[], object]:
+    context = security.pwd_context.copy(bcrypt__rounds=cost)
+    hashed = context.hash(PASSWORD)
+    return lambda: context.verify(PASSWORD, hashed)
+
+
+def access_token_claims(permissions: int) -> dict[str, object]:
+    return {
+        "role": "user",
+        "permissions": [f"document:perm{i}" for i in range(permissions)],
+    }
+
+
+def jwt_encode(permissions: int) -> Callable[[], object]:
+    claims = access_token_claims(permissions)
+    return lambda: security.create_access_token(
+        "student@troy.edu", timedelta(minutes=5), additional_claims=claims
+    )
+
+
+def jwt_decode(permissions: int) -> Callable[[], object]:
+    token = jwt_encode(permissions)()
+    return lambda: security.decode_token(token)
+
+
+def email_token_encode() -> Callable[[], object]:
+    return lambda: security.generate_email_verification_token("student@troy.edu")
+
+
+def email_token_verify() -> Callable[[], object]:
+    token = security.generate_email_verification_token("student@troy.edu")
+    return lambda: security.verify_email_verification_token(token)
+
+
+def cases(costs: list[int]) -> dict[str, Callable[[], Callable[[], object]]]:
+    """
+    Name -> factory. The factories, not the operations they build, are sent
+    to worker processes, so they are partials of module-level functions.
+    """
+    table: dict[str, Callable[[], Callable[[], object]]] = {}
+    for cost in costs:
+        table[f"bcrypt hash (cost {cost})"] = functools.partial(bcrypt_hash, cost)
+        table[f"bcrypt verify (cost {cost})"] = functools.partial(bcrypt_verify, cost)
+    for count in PERMISSION_COUNTS:
+        table[f"jwt encode ({count} permissions)"] = functools.partial(
+            jwt_encode, count
+        )
+        table[f"jwt decode ({count} permissions)"] = functools.partial(
+            jwt_decode, count
+        )
+    table["email token encode"] = functools.partial(email_token_encode)
+    table["email token verify"] = functools.partial(email_token_verify)
+    return table
+
+
+def count_ops(factory: Callable[[], Callable[[], object]], seconds: float) -> int:
+    """
+    Run the operation for ``seconds`` and return how many calls completed.
+    """
+    operation = factory()
+    operation()
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        operation()
+        done += 1
+    return done
+
+
+def ops_per_second(
+    executor: Executor,
+    factory: Callable[[], Callable[[], object]],
+    workers: int,
+    seconds: float,
+) -> float:
+    futures = [executor.submit(count_ops, factory, seconds) for _ in range(workers)]
+    return sum(future.result() for future in futures) / seconds
+
+
+def main() -> None:
+    # CPUs this process may run on, which a container's cpuset can limit.
+    cpus = (
+        len(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else (os.cpu_count() or 1)
+    )
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument(
+        "--workers",
+        default=",".join(str(n) for n in sorted({1, min(2, cpus), cpus})),
+        help="comma-separated worker counts",
+    )
+    parser.add_argument("--costs", default="10,12,14", help="bcrypt cost factors")
+    parser.add_argument(
+        "--only", help="run only cases whose name contains this substring"
+    )
+    args = parser.parse_args()
+    worker_counts = [int(n) for n in args.workers.split(",")]
+    costs = [int(n) for n in args.costs.split(",")]
+    table = {
+        name: factory
+        for name, factory in cases(costs).items()
+        if not args.only or args.only in name
+    }
+    print(f"{cpus} CPUs visible, {args.seconds:.1f}s per measurement\n")
+
+    header = f"{'case':32} {'mode':8} {'workers':>7} {'ops/s':>11} {'ops/s/core':>11}"
+    print(header)
+    print("-" * len(header))
+    largest = max(worker_counts)
+    with (
+        ThreadPoolExecutor(largest) as threads,
+        ProcessPoolExecutor(largest) as processes,
+    ):
+        # Start the worker processes (and import the app in them) up front.
+        list(processes.map(abs, range(largest)))
+        for name, factory in table.items():
+            for mode, executor in (("threads", threads), ("procs", processes)):
+                for workers in worker_counts:
+                    if mode == "procs" and workers == 1:
+                        continue
+                    rate = ops_per_second(executor, factory, workers, args.seconds)
+                    print(
+                        f"{name:32} {mode:8} {workers:7d} {rate:11.1f} "
+                        f"{rate / min(workers, cpus):11.1f}"
+                    )
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Per-response CPU cost of the user read paths.
+
+Compares, for a single user and for a page of 1,000 users:
+
+* ``default``: ORM object -> schemas.User (from_attributes) ->
+  jsonable_encoder -> json.dumps, which is what FastAPI does for a route with
+  a ``response_model`` and the stock JSONResponse.
+* ``orjson``: the same validation and encoding, rendered by FastAPI's
+  ORJSONResponse, the app-wide default.
+* ``rows``: result mappings straight to bytes with ``json_rows``, the path
+  used by the read-heavy private endpoints.
+
+No database is needed; rows are built in memory.
+
+    python -m benchmarks.serialization [--iterations N]
+"""
+
+import argparse
+import json
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+from app.api.responses import json_rows
+from app.models import User as UserModel
+from app.schemas import User
+
+
+def make_user(i: int) -> UserModel:
+    return UserModel(
+        id=uuid.uuid4(),
+        id_troy=f"{100000 + i}",
+        name=f"Student {i}",
+        email=f"student{i}@troy.edu",
+        hashed_password="$2b$12$" + "x" * 53,
+        major="Computer Science",
+        class_="2027",
+        role="user",
+        permissions=["document:read"],
+        is_active=True,
+        is_verified=True,
+    )
+
+
+def as_mapping(user: UserModel) -> dict[str, Any]:
+    return {name: getattr(user, name) for name in User.model_fields}
+
+
+def default_path(users: list[UserModel]) -> bytes:
+    content = jsonable_encoder([User.model_validate(user) for user in users])
+    return json.dumps(content, separators=(",", ":")).encode()
+
+
+def orjson_path(users: list[UserModel]) -> bytes:
+    content = jsonable_encoder([User.model_validate(user) for user in users])
+    return ORJSONResponse(content).body
+
+
+def rows_path(rows: list[dict[str, Any]]) -> bytes:
+    return json_rows(rows).body
+
+
+def measure(func: Callable[[], bytes], iterations: int) -> float:
+    """
+    CPU microseconds per call.
+    """
+    func()
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    for size in (1, 1000):
+        users = [make_user(i) for i in range(size)]
+        rows = [as_mapping(user) for user in users]
+        iterations = max(args.iterations // size, 5)
+        cases = {
+            "default": lambda users=users: default_path(users),
+            "orjson": lambda users=users: orjson_path(users),
+            "rows": lambda rows=rows: rows_path(rows),
+        }
+        baseline = None
+        print(f"{size} user(s), {iterations} iterations")
+        for name, func in cases.items():
+            micros = measure(func, iterations)
+            baseline = baseline or micros
+            print(f"  {name:<8} {micros:12.1f} us/response  {baseline / micros:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Generate production-sized user tables for benchmarks.
+
+Rows are built from a seeded random generator, so the same ``--seed`` and
+``--users`` always produce the same ids, names, emails and attributes (only
+the bcrypt salts differ between runs). Every row shares one of a handful of
+precomputed password hashes and the whole set is streamed to PostgreSQL with
+``COPY``, so a million users load in seconds rather than the hours bcrypt
+would take per row.
+
+Synthetic users have ``@synthetic.troy.edu`` emails; ``--replace`` deletes
+the ones from an earlier run first. All of them can log in with
+``SYNTHETIC_PASSWORD``.
+
+Every inserted row fires the ``user_changed`` trigger. ``--skip-notify``
+disables it for the load, saving a notification per row, but ``ALTER TABLE
+... DISABLE TRIGGER`` holds an ACCESS EXCLUSIVE lock on the user table until
+the load commits, blocking every read and write of it meanwhile: only use it
+against a database nothing else is using.
+
+The load uses psycopg 3's ``COPY`` support whatever driver the configured
+URL names.
+
+    python -m benchmarks.synthetic_data --users 1000000 [--seed 42] [--replace]
+        [--skip-notify]
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Iterator
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.core.db import engine
+from app.core.ids import uuid7_from
+from app.core.security import get_password_hash
+
+SYNTHETIC_PASSWORD = "synthetic-password"
+EMAIL_DOMAIN = "synthetic.troy.edu"
+# Hashes of the same password with different salts, shared round-robin. Logins
+# cost the same as in production; only generating them is cheap.
+HASH_POOL_SIZE = 4
+BATCH_ROWS = 10_000
+# Ids are UUIDv7 like real ones, as if a user registered every minute since
+# 2022-08-01 (UTC), so the primary key index is shaped as in production.
+FIRST_REGISTRATION_MS = 1_659_312_000_000
+REGISTRATION_INTERVAL_MS = 60_000
+
+COLUMNS = (
+    "id",
+    "id_troy",
+    "name",
+    "email",
+    "hashed_password",
+    "major",
+    "class_",
+    "role",
+    "permissions",
+    "is_active",
+    "is_verified",
+)
+
+FIRST_NAMES = (
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael",
+    "Linda", "David", "Elizabeth", "William", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen", "Wei", "Priya",
+    "Mohammed", "Sofia", "Kenji", "Amara", "Diego", "Fatima", "Olga", "Tariq",
+)  # fmt: skip
+LAST_NAMES = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Nguyen", "Patel", "Kim", "Chen", "Okafor", "Ivanova", "Haddad",
+)  # fmt: skip
+# (value, weight) pairs, roughly the shape of the real user table.
+MAJORS = (
+    ("Computer Science", 18), ("Nursing", 14), ("Business Administration", 14),
+    ("Psychology", 9), ("Biology", 8), ("Criminal Justice", 7),
+    ("Accounting", 6), ("Education", 6), ("Communication", 5),
+    ("Cyber Security", 5), ("Mathematics", 3), (None, 5),
+)  # fmt: skip
+CLASSES = (
+    ("Freshman", 28), ("Sophomore", 24), ("Junior", 21), ("Senior", 19),
+    ("Graduate", 6), (None, 2),
+)  # fmt: skip
+ROLES = (("user", 975), ("admin1", 20), ("admin2", 5))
+VERIFIED_RATIO = 0.85
+ACTIVE_RATIO = 0.98
+VERIFIED_PERMISSIONS = (
+    ("{document:read}", 80),
+    ("{document:read,document:write}", 15),
+    ("{document:read,document:write,document:upload}", 5),
+)
+
+# COPY FROM STDIN needs psycopg 3, while a plain postgresql:// URL would pick
+# psycopg2.
+copy_engine = create_engine(
+    engine.url.set(drivername="postgresql+psycopg"), poolclass=NullPool
+)
+
+
+def _weighted(
+    rng: random.Random, pairs: tuple[tuple[str | None, int], ...], k: int
+) -> list[str | None]:
+    values = [value for value, _ in pairs]
+    weights = [weight for _, weight in pairs]
+    return rng.choices(values, weights=weights, k=k)
+
+
+def _copy_text(value: str | None) -> str:
+    # Generated values never contain tabs, newlines or backslashes.
+    return "\\N" if value is None else value
+
+
+def generate_rows(users: int, seed: int, hashes: list[str]) -> Iterator[str]:
+    """
+    Yield rows in COPY text format, one line each, in ``COLUMNS`` order.
+    """
+    rng = random.Random(seed)
+    for start in range(0, users, BATCH_ROWS):
+        n = min(BATCH_ROWS, users - start)
+        majors = _weighted(rng, MAJORS, n)
+        classes = _weighted(rng, CLASSES, n)
+        roles = _weighted(rng, ROLES, n)
+        permissions = _weighted(rng, VERIFIED_PERMISSIONS, n)
+        for offset in range(n):
+            i = start + offset
+            first = rng.choice(FIRST_NAMES)
+            last = rng.choice(LAST_NAMES)
+            verified = rng.random() < VERIFIED_RATIO
+            yield (
+                "\t".join(
+                    (
+                        str(
+                            uuid7_from(
+                                FIRST_REGISTRATION_MS + i * REGISTRATION_INTERVAL_MS,
+                                rng.getrandbits(74),
+                            )
+                        ),
+                        f"syn{i:09d}",
+                        f"{first} {last}",
+                        f"{first.lower()}.{last.lower()}.{i}@{EMAIL_DOMAIN}",
+                        hashes[i % len(hashes)],
+                        _copy_text(majors[offset]),
+                        _copy_text(classes[offset]),
+                        _copy_text(roles[offset]),
+                        _copy_text(permissions[offset]) if verified else "{}",
+                        "t" if rng.random() < ACTIVE_RATIO else "f",
+                        "t" if verified else "f",
+                    )
+                )
+                + "\n"
+            )
+
+
+def load(users: int, seed: int, *, replace: bool, skip_notify: bool = False) -> None:
+    hashes = [get_password_hash(SYNTHETIC_PASSWORD) for _ in range(HASH_POOL_SIZE)]
+    with copy_engine.begin() as connection:
+        if replace:
+            connection.execute(
+                text('DELETE FROM "user" WHERE email LIKE :pattern'),
+                {"pattern": f"%@{EMAIL_DOMAIN}"},
+            )
+        if skip_notify:
+            # New rows can't be in any worker's user cache, so skip a million
+            # user_changed notifications. Re-enabled before commit.
+            connection.execute(
+                text('ALTER TABLE "user" DISABLE TRIGGER user_changed_notify')
+            )
+        cursor = connection.connection.driver_connection.cursor()
+        columns = ", ".join(COLUMNS)
+        with cursor.copy(f'COPY "user" ({columns}) FROM STDIN') as copy:
+            batch: list[str] = []
+            for line in generate_rows(users, seed, hashes):
+                batch.append(line)
+                if len(batch) == BATCH_ROWS:
+                    copy.write("".join(batch))
+                    batch.clear()
+            if batch:
+                copy.write("".join(batch))
+        if skip_notify:
+            connection.execute(
+                text('ALTER TABLE "user" ENABLE TRIGGER user_changed_notify')
+            )
+    with copy_engine.connect() as connection:
+        connection.execute(text('ANALYZE "user"'))
+        connection.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help=f"delete existing @{EMAIL_DOMAIN} users first",
+    )
+    parser.add_argument(
+        "--skip-notify",
+        action="store_true",
+        help="disable the user_changed trigger during the load (locks the table)",
+    )
+    args = parser.parse_args()
+    started = time.perf_counter()
+    load(args.users, args.seed, replace=args.replace, skip_notify=args.skip_notify)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Loaded {args.users} users in {elapsed:.1f}s "
+        f"({args.users / elapsed:,.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
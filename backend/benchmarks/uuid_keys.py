@@ -0,0 +1,115 @@
+"""
+Bulk insert throughput and primary key index size, uuid4 versus UUIDv7 keys.
+
+For each kind of key a scratch table with a uuid primary key and a
+user-row-sized payload is filled in committed batches, the way registrations
+arrive. Random uuid4 keys touch a different index leaf on nearly every
+insert, so throughput drops once the index no longer fits in shared buffers,
+pages are split half full and every first touch of a page after a checkpoint
+writes a full page image to the WAL. UUIDv7 keys (app/core/ids.py) append to
+the rightmost leaf instead.
+
+Reported per kind: rows/s over the whole load and over its last tenth, the
+size of the primary key index and of the table, and the WAL written. Needs
+the database from the settings, reached through psycopg 3 for its ``COPY``
+support; the scratch tables are dropped afterwards.
+
+    python -m benchmarks.uuid_keys [--rows 1000000] [--batch 1000]
+"""
+
+import argparse
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.db import engine
+from app.core.ids import uuid7
+
+# COPY FROM STDIN needs psycopg 3, while a plain postgresql:// URL would pick
+# psycopg2.
+copy_engine = create_engine(
+    engine.url.set(drivername="postgresql+psycopg"), poolclass=NullPool
+)
+KEYS: dict[str, Callable[[], uuid.UUID]] = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+# About what the non-key columns of a user row take.
+PAYLOAD = "student.name.123456@troy.edu\tStudent Name\tComputer Science\tJunior"
+
+
+def _scalar(cursor: Any, sql: str) -> Any:
+    cursor.execute(sql)
+    return cursor.fetchone()[0]
+
+
+def load(kind: str, rows: int, batch: int) -> dict[str, float]:
+    new_key = KEYS[kind]
+    table = f"bench_{kind}_keys"
+    connection = copy_engine.raw_connection()
+    try:
+        cursor = connection.driver_connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(f"CREATE TABLE {table} (id uuid PRIMARY KEY, payload text)")
+        connection.commit()
+        wal_start = _scalar(cursor, "SELECT pg_current_wal_lsn()")
+
+        batches: list[tuple[int, float]] = []
+        for start in range(0, rows, batch):
+            count = min(batch, rows - start)
+            # Keys are generated outside the timed part.
+            data = "".join(f"{new_key()}\t{PAYLOAD}\n" for _ in range(count))
+            started = time.perf_counter()
+            with cursor.copy(f"COPY {table} (id, payload) FROM STDIN") as copy:
+                copy.write(data)
+            connection.commit()
+            batches.append((count, time.perf_counter() - started))
+
+        wal_bytes = _scalar(
+            cursor, f"SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '{wal_start}')"
+        )
+        index_bytes = _scalar(cursor, f"SELECT pg_relation_size('{table}_pkey')")
+        table_bytes = _scalar(cursor, f"SELECT pg_relation_size('{table}')")
+        cursor.execute(f"DROP TABLE {table}")
+        connection.commit()
+    finally:
+        connection.close()
+
+    tail = batches[-max(len(batches) // 10, 1) :]
+    return {
+        "rows_per_second": rows / sum(seconds for _, seconds in batches),
+        "tail_rows_per_second": (
+            sum(count for count, _ in tail) / sum(seconds for _, seconds in tail)
+        ),
+        "index_mib": index_bytes / (1 << 20),
+        "table_mib": table_bytes / (1 << 20),
+        "wal_mib": float(wal_bytes) / (1 << 20),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument(
+        "--keys", default=",".join(KEYS), help="comma-separated, of uuid4,uuid7"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'keys':<6} {'rows/s':>10} {'last 10%':>10} "
+        f"{'index MiB':>10} {'table MiB':>10} {'WAL MiB':>10}"
+    )
+    for kind in args.keys.split(","):
+        result = load(kind, args.rows, args.batch)
+        print(
+            f"{kind:<6} {result['rows_per_second']:>10,.0f} "
+            f"{result['tail_rows_per_second']:>10,.0f} "
+            f"{result['index_mib']:>10.1f} {result['table_mib']:>10.1f} "
+            f"{result['wal_mib']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,18 @@ set -e
 # Set Python path to include current directory
 export PYTHONPATH=$(pwd):$PYTHONPATH
 
-# Run migrations
-echo "--- Running database migrations ---"
-alembic upgrade head
+# Wait for the database, run migrations and create initial data. Replicas
+# coordinate through an advisory lock and skip work that is already done.
+echo "--- Preparing database ---"
+python -m app.startup
 
-# Create initial data in database
-echo "--- Creating initial data ---"
-python -m app.initial_data
+# Workers write metrics to this directory so /metrics can aggregate them.
+# Start from an empty directory: files left by a previous run would be summed in.
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
 
-# Start the application server
-echo "--- Starting Uvicorn server ---"
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 4
\ No newline at end of file
+# Start the application server. Workers are sized to the container's CPU and
+# memory limits unless WEB_CONCURRENCY is set; see app/server.py.
+echo "--- Starting server ---"
+exec python -m app.server
\ No newline at end of file